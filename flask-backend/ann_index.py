@@ -0,0 +1,463 @@
+"""
+Approximate Nearest-Neighbour Index for Samadhan AI
+==================================================
+
+Retrieval backends for large corpora of historical resolved complaints:
+
+- exact:     brute-force inner product (reference / small corpora)
+- faiss-ivf: FAISS IndexIVFFlat, tuned with nprobe
+- faiss-hnsw: FAISS IndexHNSWFlat, tuned with efSearch
+- numpy-ivf: pure-NumPy inverted-file index, used when faiss-cpu is missing
+
+All vectors are L2-normalized so inner product equals cosine similarity.
+
+Usage:
+    python ann_index.py build --documents complaints.jsonl --out indexes/historical --backend faiss-ivf
+    python ann_index.py build --vectors vectors.npy --out indexes/historical --backend numpy-ivf
+    python ann_index.py load indexes/historical --query "no water supply for 3 days" --nprobe 16
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_store import normalize_rows, score_matrix
+
+# FAISS is optional; the NumPy IVF backend covers its absence
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+DOCUMENTS_FILE = 'documents.jsonl'
+OFFSETS_FILE = 'documents.offsets.npy'
+VECTORS_FILE = 'vectors.npy'
+
+
+def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k (ids, scores) of a 1-D score array, sorted descending and padded with -1"""
+    out_ids = np.full(k, -1, dtype=np.int64)
+    out_scores = np.full(k, -np.inf, dtype=np.float32)
+    if scores.size == 0:
+        return out_ids, out_scores
+    n = min(k, scores.size)
+    top = np.argpartition(-scores, n - 1)[:n] if n < scores.size else np.arange(scores.size)
+    top = top[np.argsort(-scores[top])]
+    out_ids[:n] = ids[top]
+    out_scores[:n] = scores[top]
+    return out_ids, out_scores
+
+
+class ExactIndex:
+    """Brute-force inner-product search over a (memory-mapped, optionally quantized) matrix"""
+
+    backend = 'exact'
+
+    def __init__(self, vectors: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.vectors = vectors
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, scores), both shaped (n_queries, k), sorted by score descending"""
+        queries = normalize_rows(queries)
+        k = max(1, min(k, len(self)))
+        scores = score_matrix(self.vectors, queries, self.scales)
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        """Stored vectors of the given ids as float32 rows"""
+        rows = np.asarray(self.vectors[ids], dtype=np.float32)
+        return rows * self.scales[ids][:, None] if self.scales is not None else rows
+
+    def save(self, path: Path):
+        np.save(path / VECTORS_FILE, np.ascontiguousarray(self.vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: Path, manifest: Dict[str, Any]) -> 'ExactIndex':
+        return cls(np.load(path / VECTORS_FILE, mmap_mode='r'))
+
+    def params(self) -> Dict[str, Any]:
+        return {}
+
+
+class NumpyIVFIndex:
+    """Inverted-file index in pure NumPy: spherical k-means lists, probe the nprobe closest"""
+
+    backend = 'numpy-ivf'
+
+    def __init__(self, centroids: np.ndarray, vectors: np.ndarray, ids: np.ndarray,
+                 offsets: np.ndarray, nprobe: int = 8):
+        self.centroids = centroids
+        self.vectors = vectors      # rows grouped by list
+        self.ids = ids              # original id of each grouped row
+        self.offsets = offsets      # list i spans rows offsets[i]:offsets[i + 1]
+        self.nprobe = nprobe
+        self._rows = None           # grouped row of each original id, built on first reconstruct()
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, nlist: Optional[int] = None, iterations: int = 10,
+              sample_size: int = 100000, seed: int = 42) -> 'NumpyIVFIndex':
+        vectors = normalize_rows(vectors)
+        n = vectors.shape[0]
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(seed)
+
+        sample = vectors[rng.choice(n, size=min(n, max(sample_size, nlist)), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = np.bincount(assignment, minlength=nlist) == 0
+            # Re-seed empty lists from random sample points
+            sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+            centroids = normalize_rows(sums)
+
+        assignment = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 65536):
+            assignment[start:start + 65536] = np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignment, minlength=nlist))
+        return cls(centroids, vectors[order], order.astype(np.int64), offsets)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize_rows(queries)
+        nprobe = max(1, min(self.nprobe, self.centroids.shape[0]))
+        probe = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        all_ids = np.empty((queries.shape[0], k), dtype=np.int64)
+        all_scores = np.empty((queries.shape[0], k), dtype=np.float32)
+        for row, query in enumerate(queries):
+            rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe[row]])
+            scores = np.asarray(self.vectors[rows]) @ query
+            all_ids[row], all_scores[row] = _top_k(scores, self.ids[rows], k)
+        return all_ids, all_scores
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        """Stored vectors of the given ids as float32 rows"""
+        if self._rows is None:
+            rows = np.empty(len(self), dtype=np.int64)
+            rows[self.ids] = np.arange(len(self))
+            self._rows = rows
+        return np.asarray(self.vectors[self._rows[ids]], dtype=np.float32)
+
+    def save(self, path: Path):
+        np.save(path / 'ivf_centroids.npy', self.centroids)
+        np.save(path / 'ivf_vectors.npy', np.ascontiguousarray(self.vectors, dtype=np.float32))
+        np.save(path / 'ivf_ids.npy', self.ids)
+        np.save(path / 'ivf_offsets.npy', self.offsets)
+
+    @classmethod
+    def load(cls, path: Path, manifest: Dict[str, Any]) -> 'NumpyIVFIndex':
+        return cls(
+            np.load(path / 'ivf_centroids.npy'),
+            np.load(path / 'ivf_vectors.npy', mmap_mode='r'),
+            np.load(path / 'ivf_ids.npy', mmap_mode='r'),
+            np.load(path / 'ivf_offsets.npy'),
+            manifest.get('params', {}).get('nprobe', 8)
+        )
+
+    def params(self) -> Dict[str, Any]:
+        return {'nlist': int(self.centroids.shape[0]), 'nprobe': self.nprobe}
+
+
+class FaissIndex:
+    """FAISS IVF-Flat or HNSW-Flat index using inner-product metric"""
+
+    def __init__(self, index, backend: str):
+        self.index = index
+        self.backend = backend
+        self._direct_map_lock = threading.Lock()
+        self._direct_map = False
+
+    def __len__(self) -> int:
+        return int(self.index.ntotal)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, backend: str = 'faiss-ivf', nlist: Optional[int] = None,
+              hnsw_m: int = 32, ef_construction: int = 200) -> 'FaissIndex':
+        if not FAISS_AVAILABLE:
+            raise RuntimeError('faiss-cpu is not installed')
+        vectors = np.ascontiguousarray(normalize_rows(vectors))
+        n, dim = vectors.shape
+
+        if backend == 'faiss-hnsw':
+            index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = ef_construction
+        else:
+            nlist = min(nlist or max(1, int(4 * np.sqrt(n))), n)
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors[np.random.default_rng(42).choice(n, size=min(n, max(256 * nlist, 100000)), replace=False)])
+        index.add(vectors)
+        return cls(index, backend)
+
+    @property
+    def nprobe(self) -> Optional[int]:
+        return int(self.index.nprobe) if self.backend == 'faiss-ivf' else None
+
+    @nprobe.setter
+    def nprobe(self, value: int):
+        if self.backend == 'faiss-ivf':
+            self.index.nprobe = int(value)
+
+    @property
+    def ef_search(self) -> Optional[int]:
+        return int(self.index.hnsw.efSearch) if self.backend == 'faiss-hnsw' else None
+
+    @ef_search.setter
+    def ef_search(self, value: int):
+        if self.backend == 'faiss-hnsw':
+            self.index.hnsw.efSearch = int(value)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores, ids = self.index.search(np.ascontiguousarray(normalize_rows(queries)), k)
+        return ids.astype(np.int64), scores
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        """Stored vectors of the given ids as float32 rows"""
+        if self.backend == 'faiss-ivf' and not self._direct_map:
+            # IVF lists don't know where an id lives until the id -> list map exists
+            with self._direct_map_lock:
+                if not self._direct_map:
+                    self.index.make_direct_map()
+                    self._direct_map = True
+        return self.index.reconstruct_batch(np.ascontiguousarray(ids, dtype=np.int64))
+
+    def save(self, path: Path):
+        faiss.write_index(self.index, str(path / 'index.faiss'))
+
+    @classmethod
+    def load(cls, path: Path, manifest: Dict[str, Any]) -> 'FaissIndex':
+        if not FAISS_AVAILABLE:
+            raise RuntimeError('faiss-cpu is not installed')
+        # Memory-map the index file so gunicorn workers share its pages
+        index = faiss.read_index(str(path / 'index.faiss'), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        return cls(index, manifest['backend'])
+
+    def params(self) -> Dict[str, Any]:
+        if self.backend == 'faiss-hnsw':
+            return {'efSearch': self.ef_search}
+        return {'nlist': int(self.index.nlist), 'nprobe': self.nprobe}
+
+
+BACKENDS = {
+    'exact': ExactIndex,
+    'numpy-ivf': NumpyIVFIndex,
+    'faiss-ivf': FaissIndex,
+    'faiss-hnsw': FaissIndex
+}
+
+
+def build_index(vectors: np.ndarray, backend: str = 'faiss-ivf', **kwargs):
+    """Build an index, falling back to numpy-ivf when FAISS is unavailable"""
+    if backend.startswith('faiss') and not FAISS_AVAILABLE:
+        logger.warning(f'⚠️ faiss-cpu not installed, building numpy-ivf instead of {backend}')
+        backend = 'numpy-ivf'
+    if backend == 'exact':
+        return ExactIndex(normalize_rows(vectors))
+    if backend == 'numpy-ivf':
+        return NumpyIVFIndex.build(vectors, nlist=kwargs.get('nlist'))
+    return FaissIndex.build(vectors, backend, nlist=kwargs.get('nlist'),
+                            hnsw_m=kwargs.get('hnsw_m', 32),
+                            ef_construction=kwargs.get('ef_construction', 200))
+
+
+def configure_search(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Apply query-time accuracy/latency knobs where the backend supports them"""
+    if nprobe and hasattr(index, 'nprobe'):
+        index.nprobe = nprobe
+    if ef_search and hasattr(index, 'ef_search'):
+        index.ef_search = ef_search
+    return index
+
+
+class IndexedDocument:
+    """Document read back from the index's JSONL store"""
+    __slots__ = ('page_content', 'metadata')
+
+    def __init__(self, page_content: str, metadata: dict = None):
+        self.page_content = page_content
+        self.metadata = metadata or {}
+
+
+class JsonlDocuments:
+    """Random access to documents.jsonl through a byte-offset table"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offsets = np.load(path.with_name(OFFSETS_FILE), mmap_mode='r')
+        self._file = open(path, 'rb')
+
+    def __len__(self) -> int:
+        return int(self.offsets.shape[0])
+
+    def __getitem__(self, i: int) -> IndexedDocument:
+        # os.pread keeps concurrent readers from racing on a shared file position
+        start = int(self.offsets[i])
+        end = int(self.offsets[i + 1]) if i + 1 < len(self) else os.fstat(self._file.fileno()).st_size
+        record = json.loads(os.pread(self._file.fileno(), end - start, start))
+        return IndexedDocument(record.get('content', ''), record.get('metadata', {}))
+
+    def __iter__(self) -> Iterator[IndexedDocument]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def write_documents(path: Path, documents: List[Dict[str, Any]]):
+    """Write documents as JSONL plus the byte-offset table used by JsonlDocuments"""
+    offsets = []
+    with open(path / DOCUMENTS_FILE, 'wb') as f:
+        for doc in documents:
+            offsets.append(f.tell())
+            f.write(json.dumps({'content': doc.get('content', ''), 'metadata': doc.get('metadata', {})},
+                               ensure_ascii=False).encode('utf-8') + b'\n')
+    np.save(path / OFFSETS_FILE, np.asarray(offsets, dtype=np.int64))
+
+
+class ComplaintIndex:
+    """ANN index plus its document store, saved together in one directory"""
+
+    def __init__(self, index, documents, manifest: Dict[str, Any]):
+        self.index = index
+        self.documents = documents
+        self.manifest = manifest
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.index.search(queries, k)
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        return self.index.reconstruct(ids)
+
+    def save(self, path: str, documents: Optional[List[Dict[str, Any]]] = None):
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+        self.index.save(out)
+        if documents is not None:
+            write_documents(out, documents)
+        self.manifest.update({'backend': self.index.backend, 'count': len(self.index),
+                              'params': self.index.params()})
+        with open(out / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+             require_documents: bool = True) -> 'ComplaintIndex':
+        """Load an index directory; without require_documents a vector-only index (built from --vectors) is fine"""
+        root = Path(path)
+        with open(root / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if require_documents and not (root / DOCUMENTS_FILE).exists():
+            # The kNN tier labels neighbours from their documents; vectors alone can't vote
+            raise FileNotFoundError(f'{root} has no {DOCUMENTS_FILE}; rebuild it with '
+                                    f'`python ann_index.py build --documents ...`')
+        index = BACKENDS[manifest['backend']].load(root, manifest)
+        configure_search(index, nprobe, ef_search)
+        documents = JsonlDocuments(root / DOCUMENTS_FILE) if (root / DOCUMENTS_FILE).exists() else None
+        if documents is not None and len(documents) != len(index):
+            raise ValueError(f'{root}: {len(documents)} documents for {len(index)} vectors')
+        logger.info(f"✅ Loaded {manifest['backend']} index with {len(index)} vectors from {root}")
+        return cls(index, documents, manifest)
+
+
+def _read_jsonl(path: str) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _encode_texts(texts: List[str], model_name: str, batch_size: int = 256) -> np.ndarray:
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name)
+    return normalize_rows(model.encode(texts, batch_size=batch_size, show_progress_bar=True))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Build or load the Samadhan AI historical complaint ANN index')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help='Build an index directory')
+    build.add_argument('--documents', help='JSONL of {"content": ..., "metadata": {...}} records')
+    build.add_argument('--vectors', help='Precomputed .npy embeddings (row i matches document i)')
+    build.add_argument('--out', required=True, help='Output index directory')
+    build.add_argument('--backend', default='faiss-ivf', choices=sorted(BACKENDS))
+    build.add_argument('--model', default=os.getenv('SENTENCE_MODEL_NAME', 'all-MiniLM-L6-v2'))
+    build.add_argument('--nlist', type=int, help='IVF list count (default 4*sqrt(N))')
+    build.add_argument('--hnsw-m', type=int, default=32)
+    build.add_argument('--ef-construction', type=int, default=200)
+
+    load = sub.add_parser('load', help='Load an index and optionally run a query')
+    load.add_argument('path')
+    load.add_argument('--query', help='Complaint text to search for')
+    load.add_argument('--k', type=int, default=5)
+    load.add_argument('--nprobe', type=int)
+    load.add_argument('--ef-search', type=int)
+    load.add_argument('--model', default=os.getenv('SENTENCE_MODEL_NAME', 'all-MiniLM-L6-v2'))
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    if args.command == 'build':
+        if not args.documents and not args.vectors:
+            parser.error('build needs --documents and/or --vectors')
+        documents = _read_jsonl(args.documents) if args.documents else None
+        if args.vectors:
+            vectors = np.load(args.vectors, mmap_mode='r')
+        else:
+            vectors = _encode_texts([d.get('content', '') for d in documents], args.model)
+        if documents is not None and len(documents) != vectors.shape[0]:
+            parser.error(f'{len(documents)} documents but {vectors.shape[0]} vectors')
+
+        started = time.perf_counter()
+        index = build_index(vectors, args.backend, nlist=args.nlist,
+                            hnsw_m=args.hnsw_m, ef_construction=args.ef_construction)
+        manifest = {'model_name': args.model, 'dimension': int(vectors.shape[1])}
+        ComplaintIndex(index, None, manifest).save(args.out, documents)
+        print(f'✅ Built {index.backend} index with {len(index)} vectors in {time.perf_counter() - started:.1f}s -> {args.out}')
+        return
+
+    complaint_index = ComplaintIndex.load(args.path, args.nprobe, args.ef_search, require_documents=False)
+    print(json.dumps(complaint_index.manifest, indent=2))
+    if args.query:
+        query = _encode_texts([args.query], args.model)
+        started = time.perf_counter()
+        ids, scores = complaint_index.search(query, args.k)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for doc_id, score in zip(ids[0], scores[0]):
+            if doc_id < 0:
+                continue
+            content = complaint_index.documents[int(doc_id)].page_content if complaint_index.documents else ''
+            print(f'{score:.4f}  #{doc_id}  {content[:100]}')
+        print(f'⏱️ Search took {elapsed_ms:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,19 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
 import logging
 from datetime import datetime
 import json
+import hashlib
+import hmac
 import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 import time
 import traceback
 import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -26,6 +31,21 @@ from samadhan_dataset.load_dataset import (
     get_district_info,
     get_dataset_stats
 )
+from keyword_engine import KeywordEngine
+from text_normalizer import TextNormalizer
+from district_extractor import DistrictExtractor
+from http_sessions import ProviderSessions
+from urllib.parse import urlsplit
+from linear_classifier import SKLEARN_AVAILABLE, load_linear_classifier
+from speculation import SpeculationStats
+from hedging import PRIMARY, SECONDARY, HedgePolicy
+from circuit_breaker import CircuitBreaker, CircuitOpenError, ProviderError, provider_retry
+from response_cache import REDIS_AVAILABLE, MemoryTier, RedisTier, ResponseCache, SQLiteTier, response_cache_key
+from semantic_cache import SemanticResponseCache, fill_template
+from streaming import SSE_HEADERS, StreamingCleaner, sse_event
+from sse_parser import iter_sse_deltas
+from iam_tokens import IAMTokenManager
+from one_shot import CATEGORIES, DEPARTMENTS, PRIORITIES, SENTIMENTS, OneShotStats, validate_one_shot
 
 # LangChain imports with error handling (no OpenAI)
 try:
@@ -37,18 +57,29 @@ except ImportError as e:
     print(f"⚠️ LangChain not available: {e}")
     LANGCHAIN_AVAILABLE = False
 
-# Sentence transformers for embeddings fallback
+# Sentence encoder backends for embeddings fallback (PyTorch is only imported when used)
 try:
-    from sentence_transformers import SentenceTransformer
     import numpy as np
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-    print("✅ Sentence transformers available")
+    from embedding_store import EmbeddingStore
+    from knn_classifier import KNNVotingClassifier
+    from ann_index import ExactIndex, ComplaintIndex
+    from hybrid_retriever import HybridRetriever
+    from index_segments import SegmentedIndex
+    from embedding_cache import EmbeddingCache, CachedEncoder
+    from micro_batcher import MicroBatcher
+    from encoder_backends import load_encoder, ONNX_RUNTIME_AVAILABLE, SENTENCE_TRANSFORMERS_AVAILABLE
 except ImportError:
-    print("⚠️ Sentence transformers not available")
+    ONNX_RUNTIME_AVAILABLE = False
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
+if SENTENCE_TRANSFORMERS_AVAILABLE or ONNX_RUNTIME_AVAILABLE:
+    print("✅ Sentence transformers available")
+else:
+    print("⚠️ Sentence transformers not available")
+
 app = Flask(__name__)
-CORS(app, origins=["http://localhost:5173", "https://eclectic-centaur-42bbfd.netlify.app"])
+CORS_ORIGINS = ["http://localhost:5173", "https://eclectic-centaur-42bbfd.netlify.app"]
+CORS(app, origins=CORS_ORIGINS)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -74,10 +105,124 @@ class Config:
     
     # OpenRouter Configuration (DeepSeek) - FROM ENVIRONMENT VARIABLES
     OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
+    OPENROUTER_API_URL = os.getenv('OPENROUTER_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
     
     # Server Configuration - FROM ENVIRONMENT VARIABLES
     PORT = int(os.getenv('PORT', 5000))
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
+    
+    # Pooled keep-alive connections to WatsonX, IAM and OpenRouter (per provider, per worker)
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+    HTTP_PREWARM = os.getenv('HTTP_PREWARM', 'true').lower() == 'true'
+    HTTP_PREWARM_CONNECTIONS = int(os.getenv('HTTP_PREWARM_CONNECTIONS', 1))
+    
+    # IBM IAM token renewed in the background ahead of expiry, shared by the workers on a host
+    IAM_BACKGROUND_REFRESH = os.getenv('IAM_BACKGROUND_REFRESH', 'true').lower() == 'true'
+    IAM_REFRESH_AHEAD_SECONDS = float(os.getenv('IAM_REFRESH_AHEAD_SECONDS', 600))
+    IAM_TOKEN_SHARED = os.getenv('IAM_TOKEN_SHARED', 'true').lower() == 'true'
+    IAM_TOKEN_PATH = os.getenv('IAM_TOKEN_PATH')  # default .cache/iam_token.json
+    
+    # Serving mode: sync (Flask on gunicorn threads) | async (asgi.py on uvicorn workers)
+    SERVING_MODE = os.getenv('SERVING_MODE', 'sync')
+    ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', 200))
+    ASYNC_MAX_KEEPALIVE = int(os.getenv('ASYNC_MAX_KEEPALIVE', 20))
+    
+    # Speculative response generation (start the response from the local guess during the LLM analysis).
+    # Off by default: every wrong guess is an extra, partly paid WatsonX / OpenRouter call
+    SPECULATIVE_RESPONSE_ENABLED = os.getenv('SPECULATIVE_RESPONSE_ENABLED', 'false').lower() == 'true'
+    SPECULATIVE_RESPONSE_WORKERS = int(os.getenv('SPECULATIVE_RESPONSE_WORKERS', 8))
+    
+    # Hedged responses (fire OpenRouter when WatsonX is slower than usual to its first token)
+    HEDGING_ENABLED = os.getenv('HEDGING_ENABLED', 'false').lower() == 'true'
+    HEDGE_DELAY_PERCENTILE = float(os.getenv('HEDGE_DELAY_PERCENTILE', 95))
+    HEDGE_INITIAL_DELAY_MS = float(os.getenv('HEDGE_INITIAL_DELAY_MS', 2000))
+    HEDGE_MIN_DELAY_MS = float(os.getenv('HEDGE_MIN_DELAY_MS', 250))
+    HEDGE_MAX_DELAY_MS = float(os.getenv('HEDGE_MAX_DELAY_MS', 10000))
+    HEDGE_WORKERS = int(os.getenv('HEDGE_WORKERS', 16))
+    
+    # Provider circuit breakers, adaptive timeouts and retries
+    BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', 50))
+    BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', 10))
+    BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', 0.5))
+    BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', 30))
+    BREAKER_PROBE = os.getenv('BREAKER_PROBE', 'true').lower() == 'true'
+    ADAPTIVE_TIMEOUT_PERCENTILE = float(os.getenv('ADAPTIVE_TIMEOUT_PERCENTILE', 99))
+    ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.getenv('ADAPTIVE_TIMEOUT_MULTIPLIER', 3))
+    ADAPTIVE_TIMEOUT_MIN_SECONDS = float(os.getenv('ADAPTIVE_TIMEOUT_MIN_SECONDS', 5))
+    PROVIDER_RETRY_ATTEMPTS = int(os.getenv('PROVIDER_RETRY_ATTEMPTS', 2))
+    
+    # LLM response cache: per-worker LRU, plus an optional tier shared by workers (none | sqlite | redis)
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', 1024))
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', 86400))
+    LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'none')
+    LLM_CACHE_SQLITE_PATH = os.getenv('LLM_CACHE_SQLITE_PATH')  # default .cache/llm_responses.sqlite3
+    LLM_CACHE_SHARED_MAX_SIZE = int(os.getenv('LLM_CACHE_SHARED_MAX_SIZE', 100000))
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Semantic response cache: reuse the response to a near-duplicate complaint (same category, priority, language).
+    # Off until SEMANTIC_CACHE_THRESHOLD is tuned on real traffic (/health reports the similarity distribution)
+    SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'false').lower() == 'true'
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.9))
+    SEMANTIC_CACHE_SIZE = int(os.getenv('SEMANTIC_CACHE_SIZE', 2048))
+    SEMANTIC_CACHE_TTL = float(os.getenv('SEMANTIC_CACHE_TTL', 21600))
+    
+    # One-shot mode: a single OpenRouter call returns the analysis and the citizen response together
+    ONE_SHOT_ENABLED = os.getenv('ONE_SHOT_ENABLED', 'false').lower() == 'true'
+    ONE_SHOT_MAX_TOKENS = int(os.getenv('ONE_SHOT_MAX_TOKENS', 600))
+    
+    # Model/index warm-up: background (thread per worker) | sync (e.g. gunicorn preload_app) | off
+    # Started by the server entry point (start_warmup), never on import
+    WARMUP_MODE = os.getenv('WARMUP_MODE', 'background')
+    
+    # Embedding Configuration - FROM ENVIRONMENT VARIABLES
+    SENTENCE_MODEL_NAME = os.getenv('SENTENCE_MODEL_NAME', 'all-MiniLM-L6-v2')
+    ENCODER_BACKEND = os.getenv('ENCODER_BACKEND', 'torch')  # torch | onnx
+    ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR')  # default .cache/onnx/<model>
+    ONNX_QUANTIZED = os.getenv('ONNX_QUANTIZED', 'false').lower() == 'true'
+    ENCODER_NUM_THREADS = int(os.getenv('ENCODER_NUM_THREADS', 0)) or None
+    EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR')
+    EMBEDDING_STORE_DTYPE = os.getenv('EMBEDDING_STORE_DTYPE', 'float32')  # float32 | float16 | int8
+    QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', 4096))
+    QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', 3600))
+    
+    # Micro-batching of concurrent encode() calls
+    ENCODE_MICRO_BATCHING = os.getenv('ENCODE_MICRO_BATCHING', 'true').lower() == 'true'
+    ENCODE_BATCH_MAX_SIZE = int(os.getenv('ENCODE_BATCH_MAX_SIZE', 32))
+    ENCODE_BATCH_MAX_WAIT_MS = float(os.getenv('ENCODE_BATCH_MAX_WAIT_MS', 5))
+    
+    # Local kNN classifier - answers without OpenRouter when the vote is decisive
+    KNN_CLASSIFIER_ENABLED = os.getenv('KNN_CLASSIFIER_ENABLED', 'true').lower() == 'true'
+    KNN_TOP_K = int(os.getenv('KNN_TOP_K', 7))
+    KNN_MIN_VOTE_SHARE = float(os.getenv('KNN_MIN_VOTE_SHARE', 0.6))
+    KNN_MIN_SIMILARITY = float(os.getenv('KNN_MIN_SIMILARITY', 0.45))
+    
+    # Historical complaint ANN index (built with `python ann_index.py build`)
+    ANN_INDEX_DIR = os.getenv('ANN_INDEX_DIR')
+    ANN_NPROBE = int(os.getenv('ANN_NPROBE', 16))
+    ANN_EF_SEARCH = int(os.getenv('ANN_EF_SEARCH', 64))
+    
+    # Hybrid retrieval - BM25 keyword ranking fused with the embedding ranking (RRF)
+    # Off: on the training corpus it beats BM25-only but loses to dense-only (benchmarks/hybrid_benchmark.py)
+    HYBRID_RETRIEVAL_ENABLED = os.getenv('HYBRID_RETRIEVAL_ENABLED', 'false').lower() == 'true'
+    HYBRID_DEPTH = int(os.getenv('HYBRID_DEPTH', 50))
+    HYBRID_RRF_K = int(os.getenv('HYBRID_RRF_K', 60))
+    
+    # Hashing-vectorizer linear classifier (train with `python linear_classifier.py train`)
+    LINEAR_CLASSIFIER_ENABLED = os.getenv('LINEAR_CLASSIFIER_ENABLED', 'true').lower() == 'true'
+    LINEAR_CLASSIFIER_PATH = os.getenv('LINEAR_CLASSIFIER_PATH')  # default models/complaint_linear.npz
+    LINEAR_MIN_CONFIDENCE = float(os.getenv('LINEAR_MIN_CONFIDENCE', 0.5))
+    
+    # Hindi / Hinglish transliteration and synonym glossing in front of the local tiers
+    TEXT_NORMALIZATION_ENABLED = os.getenv('TEXT_NORMALIZATION_ENABLED', 'true').lower() == 'true'
+    
+    # Append-only segments for resolved complaints posted to /api/ingest/complaints
+    # Ingested labels steer the kNN vote, so writes need INGEST_TOKEN in the X-Ingest-Token header
+    INGEST_ENABLED = os.getenv('INGEST_ENABLED', 'false').lower() == 'true'
+    INGEST_TOKEN = os.getenv('INGEST_TOKEN')
+    INGEST_SEGMENTS_DIR = os.getenv('INGEST_SEGMENTS_DIR')  # default .cache/segments/<model>
+    INGEST_MAX_SEGMENTS = int(os.getenv('INGEST_MAX_SEGMENTS', 8))
+    INGEST_MAX_DOCUMENTS = int(os.getenv('INGEST_MAX_DOCUMENTS', 1000))
 
 config = Config()
 
@@ -87,8 +232,131 @@ token_cache = {
     'expiry': 0
 }
 
+# Keep-alive sessions for the external providers (handshake once, reuse per call)
+provider_sessions = ProviderSessions(pool_maxsize=config.HTTP_POOL_MAXSIZE)
+
+IAM_TOKEN_URL = 'https://iam.cloud.ibm.com/identity/token'
+OPENROUTER_MODEL = 'deepseek/deepseek-r1-0528-qwen3-8b:free'
+
+# Tiny generations the background probes send while a breaker is open
+WATSONX_PROBE_REQUEST = {"messages": [{"role": "user", "content": "ping"}], "max_tokens": 1}
+
+def create_provider_breaker(name: str, max_timeout: float, probe: Callable[[], Any]) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        max_timeout=max_timeout,
+        min_timeout=config.ADAPTIVE_TIMEOUT_MIN_SECONDS,
+        window=config.BREAKER_WINDOW,
+        min_calls=config.BREAKER_MIN_CALLS,
+        failure_rate=config.BREAKER_FAILURE_RATE,
+        open_seconds=config.BREAKER_OPEN_SECONDS,
+        timeout_percentile=config.ADAPTIVE_TIMEOUT_PERCENTILE,
+        timeout_multiplier=config.ADAPTIVE_TIMEOUT_MULTIPLIER,
+        probe=probe if config.BREAKER_PROBE else None
+    )
+
+# Per-provider breakers; the old static timeouts are now the ceilings of the adaptive ones
+provider_breakers = {
+    'iam': create_provider_breaker('iam', 30, lambda: fetch_ibm_cloud_token()),
+    'watsonx': create_provider_breaker('watsonx', 60, lambda: call_watsonx_streaming(WATSONX_PROBE_REQUEST)),
+    'openrouter': create_provider_breaker('openrouter', 30, lambda: call_openrouter_api('ping', max_tokens=1))
+}
+
+def create_iam_token_manager() -> IAMTokenManager:
+    """Token manager over token_cache; the token file is keyed to the API key it was issued for"""
+    path = None
+    if config.IAM_TOKEN_SHARED:
+        path = config.IAM_TOKEN_PATH or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache',
+                                                     'iam_token.json')
+    return IAMTokenManager(
+        lambda: fetch_ibm_cloud_token(),
+        token_cache,
+        shared_path=path,
+        owner=hashlib.sha256((config.WATSONX_API_KEY or '').encode('utf-8')).hexdigest()[:16],
+        background=config.IAM_BACKGROUND_REFRESH and bool(config.WATSONX_API_KEY),
+        refresh_ahead=config.IAM_REFRESH_AHEAD_SECONDS
+    )
+
+# The IAM token behind every WatsonX call; see iam_tokens.py
+iam_tokens = create_iam_token_manager()
+
+# Connection failures (nothing reached the model), 429 and 5xx are retried with jittered backoff
+retry_transient = provider_retry(config.PROVIDER_RETRY_ATTEMPTS, (requests.ConnectionError,))
+
+# Speculative responses run here; a request with no free slot runs serially
+speculation_executor = ThreadPoolExecutor(max_workers=config.SPECULATIVE_RESPONSE_WORKERS,
+                                          thread_name_prefix='samadhan-speculation')
+speculation_slots = threading.BoundedSemaphore(config.SPECULATIVE_RESPONSE_WORKERS)
+speculation_stats = SpeculationStats()
+
+# Hedged provider calls run here so the request thread can wait on whichever finishes first
+hedge_executor = ThreadPoolExecutor(max_workers=config.HEDGE_WORKERS, thread_name_prefix='samadhan-hedge')
+hedge_policy = HedgePolicy(
+    percentile=config.HEDGE_DELAY_PERCENTILE,
+    initial_delay_ms=config.HEDGE_INITIAL_DELAY_MS,
+    min_delay_ms=config.HEDGE_MIN_DELAY_MS,
+    max_delay_ms=config.HEDGE_MAX_DELAY_MS
+)
+
+def create_response_cache() -> ResponseCache:
+    """Memory tier, in front of the configured shared tier when it can be opened"""
+    memory = MemoryTier(max_size=config.LLM_CACHE_SIZE, ttl_seconds=config.LLM_CACHE_TTL)
+    shared = None
+    try:
+        if config.LLM_CACHE_BACKEND == 'sqlite':
+            path = config.LLM_CACHE_SQLITE_PATH or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                '.cache', 'llm_responses.sqlite3')
+            shared = SQLiteTier(path, max_size=config.LLM_CACHE_SHARED_MAX_SIZE, ttl_seconds=config.LLM_CACHE_TTL)
+        elif config.LLM_CACHE_BACKEND == 'redis':
+            if REDIS_AVAILABLE:
+                shared = RedisTier(config.REDIS_URL, ttl_seconds=config.LLM_CACHE_TTL)
+            else:
+                logger.warning('⚠️ LLM_CACHE_BACKEND=redis but the redis package is not installed')
+    except Exception as e:
+        logger.warning(f'⚠️ Shared LLM response cache unavailable, using memory only: {e}')
+    return ResponseCache(memory, shared)
+
+# Provider answers keyed on (provider, model, prompt, params); see response_cache.py
+response_cache = create_response_cache()
+
+# Responses to near-duplicate complaints, matched on the complaint embedding; see semantic_cache.py
+semantic_cache = SemanticResponseCache(
+    max_entries=config.SEMANTIC_CACHE_SIZE,
+    ttl_seconds=config.SEMANTIC_CACHE_TTL,
+    threshold=config.SEMANTIC_CACHE_THRESHOLD
+)
+
+# Outcomes of one-shot calls (complete answers, per-field fallbacks)
+one_shot_stats = OneShotStats()
+
 # Initialize components 
 sentence_model = None
+embedding_store = None
+knn_classifier = None
+complaint_encoder = None
+segmented_index = None
+linear_classifier = None
+
+# Warm-up state reported by /ready
+warmup_state = {
+    'status': 'pending',
+    'started_at': None,
+    'finished_at': None,
+    'duration_seconds': None,
+    'error': None
+}
+warmup_lock = threading.Lock()
+
+# The dataset is static, so /health reports precomputed stats instead of rebuilding documents
+DATASET_STATS = get_dataset_stats()
+
+# Department, priority and sentiment keywords compiled once for the rule-based analysis
+keyword_engine = KeywordEngine(
+    SAMADHAN_AI_COMPLETE_DATASET['government_data']['departments'],
+    get_priority_keywords()
+)
+text_normalizer = TextNormalizer()
+district_extractor = DistrictExtractor.from_dataset()
 
 class SimpleDocument:
     """Simple document class for when LangChain is not available"""
@@ -122,80 +390,191 @@ def create_samadhan_ai_rag_documents():
     
     return documents
 
-def initialize_sentence_transformers():
-    """Initialize sentence transformers for embeddings"""
-    global sentence_model
+def initialize_sentence_transformers() -> bool:
+    """Initialize sentence encoder, corpus embeddings and kNN classifier"""
+    global sentence_model, embedding_store, knn_classifier, complaint_encoder, segmented_index
     
     try:
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
-            sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("✅ RAG system initialized with comprehensive Samadhan AI dataset")
+        backend_available = {'torch': SENTENCE_TRANSFORMERS_AVAILABLE, 'onnx': ONNX_RUNTIME_AVAILABLE}
+        if not backend_available.get(config.ENCODER_BACKEND):
+            logger.warning(f"⚠️ Using rule-based analysis ({config.ENCODER_BACKEND} encoder backend not available)")
+            return False
+        
+        model = load_encoder(
+            config.ENCODER_BACKEND,
+            config.SENTENCE_MODEL_NAME,
+            config.ONNX_MODEL_DIR,
+            config.ONNX_QUANTIZED,
+            config.ENCODER_NUM_THREADS
+        )
+        encoder = model
+        if config.ENCODE_MICRO_BATCHING:
+            encoder = MicroBatcher(model, config.ENCODE_BATCH_MAX_SIZE, config.ENCODE_BATCH_MAX_WAIT_MS)
+        cached_encoder = CachedEncoder(
+            encoder,
+            EmbeddingCache(config.QUERY_CACHE_SIZE, config.QUERY_CACHE_TTL)
+        )
+        # int8 ONNX weights shift embeddings slightly, so they get their own corpus cache
+        encoder_id = config.SENTENCE_MODEL_NAME
+        if config.ENCODER_BACKEND == 'onnx' and config.ONNX_QUANTIZED:
+            encoder_id += '+onnx-int8'
+        store = EmbeddingStore.load_or_build(
+            model,
+            create_samadhan_ai_rag_documents(),
+            encoder_id,
+            config.EMBEDDING_CACHE_DIR,
+            config.EMBEDDING_STORE_DTYPE
+        )
+        if config.ANN_INDEX_DIR:
+            # Vote over historical resolved complaints instead of the training corpus
+            complaint_index = ComplaintIndex.load(config.ANN_INDEX_DIR, config.ANN_NPROBE, config.ANN_EF_SEARCH)
+            index, documents = complaint_index, complaint_index.documents
         else:
-            logger.warning("⚠️ Using rule-based analysis (sentence transformers not available)")
+            index, documents = ExactIndex(store.embeddings, store.scales), store.documents
+        segments = None
+        if config.INGEST_ENABLED:
+            # Ingested complaints are searched alongside the base corpus without a rebuild
+            segments_dir = config.INGEST_SEGMENTS_DIR or os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), '.cache', 'segments', re.sub(r'[^A-Za-z0-9_.-]+', '_', encoder_id))
+            segments = SegmentedIndex(segments_dir, index, documents, max_segments=config.INGEST_MAX_SEGMENTS)
+            index, documents = segments, segments.documents
+        if config.HYBRID_RETRIEVAL_ENABLED:
+            index = HybridRetriever.build(index, documents, config.HYBRID_DEPTH, config.HYBRID_RRF_K)
+        classifier = KNNVotingClassifier(index, documents, config.KNN_TOP_K)
+        
+        # Publish together so concurrent requests never see a half-built tier
+        sentence_model, complaint_encoder, embedding_store, knn_classifier = model, cached_encoder, store, classifier
+        segmented_index = segments
+        logger.info("✅ RAG system initialized with comprehensive Samadhan AI dataset")
+        return True
     except Exception as e:
         logger.error(f"❌ Error initializing RAG system: {e}")
+        warmup_state['error'] = str(e)
+        return False
 
-def get_ibm_cloud_token():
-    """Get IBM Cloud IAM token with caching"""
-    global token_cache
+def initialize_linear_classifier() -> bool:
+    """Load the CPU-only linear classifier tier (no model download)"""
+    global linear_classifier
+    
+    if not (config.LINEAR_CLASSIFIER_ENABLED and SKLEARN_AVAILABLE):
+        return False
+    try:
+        linear_classifier = load_linear_classifier(config.LINEAR_CLASSIFIER_PATH)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error loading linear classifier: {e}")
+        return False
+
+def prewarm_provider_connections():
+    """Open pooled TCP/TLS connections to the configured providers before the first complaint"""
+    if not config.HTTP_PREWARM:
+        return
+    targets = []
+    if config.WATSONX_API_KEY:
+        targets.append(('iam', IAM_TOKEN_URL))
+        if config.WATSONX_STREAMING_URL:
+            parts = urlsplit(config.WATSONX_STREAMING_URL)
+            targets.append(('watsonx', f'{parts.scheme}://{parts.netloc}/'))
+    if config.OPENROUTER_API_KEY:
+        parts = urlsplit(config.OPENROUTER_API_URL)
+        targets.append(('openrouter', f'{parts.scheme}://{parts.netloc}/'))
+    for provider, url in targets:
+        opened = provider_sessions.prewarm(provider, url, config.HTTP_PREWARM_CONNECTIONS)
+        logger.info(f'🔥 Pre-warmed {opened}/{config.HTTP_PREWARM_CONNECTIONS} {provider} connection(s)')
+
+def run_warmup():
+    """Load classifiers, encoder and indexes, then mark this process ready"""
+    started = time.time()
+    warmup_state['started_at'] = datetime.now().isoformat()
+    logger.info(f'🔥 Warming up embedding tier (pid {os.getpid()})...')
     
-    # Check if we have a valid cached token
-    if token_cache['token'] and time.time() < token_cache['expiry']:
-        return token_cache['token']
+    # Network handshakes overlap with model loading
+    threading.Thread(target=prewarm_provider_connections, name='samadhan-prewarm', daemon=True).start()
+    initialize_linear_classifier()
+    loaded = initialize_sentence_transformers()
     
+    warmup_state['finished_at'] = datetime.now().isoformat()
+    warmup_state['duration_seconds'] = round(time.time() - started, 2)
+    # Degraded still serves traffic through the LLM and rule-based tiers
+    warmup_state['status'] = 'ready' if loaded else 'degraded'
+    logger.info(f'✅ Warm-up finished in {warmup_state["duration_seconds"]}s ({warmup_state["status"]})')
+
+def start_warmup(mode: str = None):
+    """Start warm-up once per process: in a background thread, inline, or not at all"""
+    mode = mode or config.WARMUP_MODE
+    with warmup_lock:
+        if warmup_state['status'] != 'pending':
+            return
+        warmup_state['status'] = 'warming'
+    
+    if mode == 'sync':
+        run_warmup()
+    elif mode == 'background':
+        iam_tokens.start()
+        threading.Thread(target=run_warmup, name='samadhan-warmup', daemon=True).start()
+    else:
+        warmup_state['status'] = 'degraded'
+        logger.warning('⚠️ Warm-up disabled (WARMUP_MODE=off), embedding tier inactive')
+
+def get_ibm_cloud_token():
+    """Get IBM Cloud IAM token (renewed ahead of expiry in the background; see iam_tokens.py)"""
+    return iam_tokens.get()
+
+@retry_transient
+def fetch_ibm_cloud_token() -> Tuple[str, float]:
+    """Request a new IBM Cloud IAM token: (access token, expires_in seconds)"""
     try:
         if not config.WATSONX_API_KEY:
             raise Exception("WatsonX API key not configured in environment variables")
         
-        logger.info('🔄 Getting IBM Cloud token...')
-        
-        response = requests.post(
-            'https://iam.cloud.ibm.com/identity/token',
-            headers={
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'application/json',
-            },
-            data=f'grant_type=urn:ibm:params:oauth:grant-type:apikey&apikey={config.WATSONX_API_KEY}'
-        )
-        
-        if response.status_code != 200:
-            logger.error(f'❌ IBM Cloud error: {response.status_code}')
-            raise Exception(f'IBM Cloud authentication failed: {response.status_code}')
-        
-        token_data = response.json()
+        breaker = provider_breakers['iam']
+        with breaker.guard():
+            response = provider_sessions.get('iam').post(
+                IAM_TOKEN_URL,
+                headers={
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                    'Accept': 'application/json',
+                },
+                data=f'grant_type=urn:ibm:params:oauth:grant-type:apikey&apikey={config.WATSONX_API_KEY}',
+                timeout=breaker.timeout()
+            )
+            
+            if response.status_code != 200:
+                logger.error(f'❌ IBM Cloud error: {response.status_code}')
+                raise ProviderError(f'IBM Cloud authentication failed: {response.status_code}', response.status_code)
+            
+            token_data = response.json()
         
         if not token_data.get('access_token'):
             raise Exception('Failed to obtain access token')
         
-        # Cache the token (expire 5 minutes before actual expiry)
-        token_cache['token'] = token_data['access_token']
-        token_cache['expiry'] = time.time() + (token_data.get('expires_in', 3600) - 300)
-        
-        logger.info('✅ IBM Cloud token obtained')
-        return token_data['access_token']
+        return token_data['access_token'], token_data.get('expires_in', 3600)
         
     except Exception as e:
         logger.error(f'❌ Token error: {e}')
         raise
 
-def call_watsonx_streaming(request_body: dict) -> str:
-    """Call WatsonX streaming API"""
-    try:
-        if not config.WATSONX_API_KEY:
-            raise Exception("WatsonX API key not configured")
-        
-        if not config.WATSONX_STREAMING_URL:
-            raise Exception("WatsonX URL not configured")
-        
-        logger.info('🤖 Calling WatsonX...')
-        
-        # Get IBM Cloud token
-        access_token = get_ibm_cloud_token()
-        
-        # Use the streaming URL from config
-        scoring_url = config.WATSONX_STREAMING_URL
-        
-        response = requests.post(
+def stream_watsonx(request_body: dict) -> Iterator[str]:
+    """WatsonX content deltas as they are generated
+    
+    Closing the generator early closes the upstream stream; the breaker then counts the call as
+    cancelled rather than as a success or failure.
+    """
+    if not config.WATSONX_API_KEY:
+        raise Exception("WatsonX API key not configured")
+    
+    if not config.WATSONX_STREAMING_URL:
+        raise Exception("WatsonX URL not configured")
+    
+    # Get IBM Cloud token
+    access_token = get_ibm_cloud_token()
+    
+    # Use the streaming URL from config
+    scoring_url = config.WATSONX_STREAMING_URL
+    
+    breaker = provider_breakers['watsonx']
+    with breaker.guard() as call:
+        response = provider_sessions.get('watsonx').post(
             scoring_url,
             headers={
                 'Authorization': f'Bearer {access_token}',
@@ -204,79 +583,65 @@ def call_watsonx_streaming(request_body: dict) -> str:
             },
             json=request_body,
             stream=True,
-            timeout=60
+            timeout=breaker.timeout()
         )
-
-        if response.status_code != 200:
-            logger.error(f'❌ WatsonX error: {response.status_code}')
-            raise Exception(f'WatsonX API error: {response.status_code}')
-
-        # Process the streaming response
-        response_text = ""
-        buffer = ""
-
+        call.first_byte()
+        
         try:
-            for chunk in response.iter_content(chunk_size=1024, decode_unicode=True):
-                if chunk:
-                    chunk_str = str(chunk)
-
-                    # Append chunk to buffer
-                    buffer += chunk_str
-
-                    # Split buffer by newlines and process complete lines
-                    lines = buffer.split('\n')
-                    buffer = lines.pop() if lines else ""
-
-                    for line in lines:
-                        if line.startswith('data:'):
-                            data_str = line[5:].strip()
-                            if data_str and data_str != '[DONE]':
-                                try:
-                                    json_data = json.loads(data_str)
-                                    choices = json_data.get('choices', [])
-                                    if choices and len(choices) > 0:
-                                        delta = choices[0].get('delta', {})
-                                        content = delta.get('content')
-                                        if content:
-                                            response_text += content
-                                except json.JSONDecodeError:
-                                    continue
-                                except (IndexError, KeyError):
-                                    continue
-
-            # Process any remaining buffer content
-            if buffer and buffer.startswith('data:'):
-                data_str = buffer[5:].strip()
-                if data_str and data_str != '[DONE]':
-                    try:
-                        json_data = json.loads(data_str)
-                        choices = json_data.get('choices', [])
-                        if choices and len(choices) > 0:
-                            delta = choices[0].get('delta', {})
-                            content = delta.get('content')
-                            if content:
-                                response_text += content
-                    except (json.JSONDecodeError, IndexError, KeyError):
-                        pass
-
-        except Exception as stream_error:
-            logger.error(f'❌ WatsonX streaming error: {stream_error}')
-            raise Exception(f'WatsonX streaming error: {stream_error}')
-        
-        if not response_text.strip():
-            raise Exception('No response from WatsonX')
+            if response.status_code != 200:
+                logger.error(f'❌ WatsonX error: {response.status_code}')
+                raise ProviderError(f'WatsonX API error: {response.status_code}', response.status_code)
+            
+            produced = False
+            try:
+                for content in iter_sse_deltas(response.iter_content(chunk_size=1024)):
+                    produced = produced or bool(content.strip())
+                    yield content
+            except Exception as stream_error:
+                logger.error(f'❌ WatsonX streaming error: {stream_error}')
+                raise Exception(f'WatsonX streaming error: {stream_error}')
+            
+            if not produced:
+                raise ProviderError('No response from WatsonX')
+        finally:
+            response.close()
 
+@retry_transient
+def call_watsonx_streaming(request_body: dict, on_first_token: Optional[Callable[[], None]] = None,
+                           cancel: Optional[threading.Event] = None) -> str:
+    """Call WatsonX streaming API and join the streamed deltas
+    
+    on_first_token is called when the first content delta arrives; setting cancel stops reading
+    the stream at the next chunk (a hedged call that lost, a speculative response that guessed
+    wrong) and returns ''.
+    """
+    try:
+        logger.info('🤖 Calling WatsonX...')
+        
+        parts = []
+        with closing(stream_watsonx(request_body)) as deltas:
+            for content in deltas:
+                if cancel is not None and cancel.is_set():
+                    logger.info('🔀 WatsonX stream cancelled, its response is no longer needed')
+                    return ''
+                if on_first_token and not parts:
+                    on_first_token()
+                parts.append(content)
+        
         # Clean up response
-        cleaned_text = clean_ai_response(response_text)
+        cleaned_text = clean_ai_response(''.join(parts))
         
         logger.info('✅ WatsonX response generated')
         return cleaned_text
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f'❌ WatsonX failed: {e}')
         raise
 
-def call_openrouter_api(prompt: str, model: str = "deepseek/deepseek-r1-0528-qwen3-8b:free") -> str:
+@retry_transient
+def call_openrouter_api(prompt: str, model: str = OPENROUTER_MODEL, max_tokens: int = 500) -> str:
     """Call OpenRouter API with DeepSeek model (fallback when WatsonX fails)"""
     try:
         if not config.OPENROUTER_API_KEY:
@@ -284,38 +649,42 @@ def call_openrouter_api(prompt: str, model: str = "deepseek/deepseek-r1-0528-qwe
         
         logger.info(f'🤖 Using OpenRouter DeepSeek (fallback)...')
         
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {config.OPENROUTER_API_KEY}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": config.FRONTEND_URL,
-                "X-Title": "Samadhan AI"
-            },
-            json={
-                "model": model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 500,
-                "temperature": 0.7
-            },
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            logger.error(f'❌ OpenRouter error: {response.status_code}')
-            raise Exception(f'OpenRouter API error: {response.status_code}')
-        
-        data = response.json()
-        content = data['choices'][0]['message']['content']
+        breaker = provider_breakers['openrouter']
+        with breaker.guard():
+            response = provider_sessions.get('openrouter').post(
+                config.OPENROUTER_API_URL,
+                headers={
+                    "Authorization": f"Bearer {config.OPENROUTER_API_KEY}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": config.FRONTEND_URL,
+                    "X-Title": "Samadhan AI"
+                },
+                json={
+                    "model": model,
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    "max_tokens": max_tokens,
+                    "temperature": 0.7
+                },
+                timeout=breaker.timeout()
+            )
+            
+            if response.status_code != 200:
+                logger.error(f'❌ OpenRouter error: {response.status_code}')
+                raise ProviderError(f'OpenRouter API error: {response.status_code}', response.status_code)
+            
+            data = response.json()
+            content = data['choices'][0]['message']['content']
         
         logger.info('✅ OpenRouter response generated')
         return content
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f'❌ OpenRouter failed: {e}')
         raise
@@ -340,22 +709,25 @@ def clean_ai_response(text: str) -> str:
     
     return text
 
+# LLM analysis categories -> dataset departments (the local tiers answer with department names)
+CATEGORY_DEPARTMENTS = {
+    'Infrastructure': 'Public Works',
+    'Utilities': 'Water Supply',
+    'Traffic': 'Traffic Police',
+    'Environment': 'Environment',
+    'Healthcare': 'Healthcare',
+    'Education': 'Education'
+}
+
+def response_department(category: str) -> str:
+    """Department whose contacts a response for this category quotes"""
+    if get_department_info(category):
+        return category
+    return CATEGORY_DEPARTMENTS.get(category, 'Public Works')
+
 def get_up_government_info(category: str, district: str = None) -> Dict[str, Any]:
     """Get real UP government information based on category"""
-    dept_info = get_department_info(category)
-    
-    if not dept_info:
-        # Try to map category to department
-        category_mapping = {
-            'Infrastructure': 'Public Works',
-            'Utilities': 'Water Supply',
-            'Traffic': 'Traffic Police',
-            'Environment': 'Environment',
-            'Healthcare': 'Healthcare',
-            'Education': 'Education'
-        }
-        dept_name = category_mapping.get(category, 'Public Works')
-        dept_info = get_department_info(dept_name)
+    dept_info = get_department_info(response_department(category))
     
     info = {
         'department': category,
@@ -368,28 +740,340 @@ def get_up_government_info(category: str, district: str = None) -> Dict[str, Any
         'address': dept_info.get('address', 'Government Office, Lucknow')
     }
     
-    # Add district specific info if provided
+    # Add district specific info if provided (any spelling the gazetteer knows)
     if district:
-        district_info = get_district_info(district)
+        district_info = district_extractor.district_info(district)
         if district_info:
-            info['district_dm'] = district_info.get('dm_contact')
-            info['district_email'] = district_info.get('collectorate')
+            info['district'] = district_info['district']
+            info['division'] = district_info.get('division')
+            if district_info.get('dm_contact'):
+                info['district_dm'] = district_info.get('dm_contact')
+                info['district_email'] = district_info.get('collectorate')
     
     return info
 
-def analyze_complaint_with_rag(complaint_text: str, language: str = 'en') -> Dict[str, Any]:
-    """Analyze complaint using RAG system trained on comprehensive Samadhan AI dataset"""
+def analyze_complaint_with_rag(complaint_text: str, language: str = 'en',
+                               on_local_guess: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Analyze complaint using RAG system trained on comprehensive Samadhan AI dataset
+    
+    on_local_guess receives the local tiers' analysis just before the OpenRouter call, so the
+    caller can start work on it while the LLM answers.
+    """
     try:
-        # Try OpenRouter first for analysis
+        # Local kNN vote first; a decisive vote skips the OpenRouter round trip
+        local_analysis, decisive = local_tier_analysis(complaint_text)
+        if decisive:
+            return local_analysis
+        
+        # Try OpenRouter for analysis
         if config.OPENROUTER_API_KEY:
-            analysis_prompt = f"""
+            prompt = build_analysis_prompt(complaint_text, language)
+            cache_key = analysis_cache_key(prompt)
+            cached = cache_lookup(cache_key)
+            if cached:
+                return parse_analysis_response(cached, complaint_text)
+            
+            if on_local_guess:
+                on_local_guess(local_analysis)
+            try:
+                openrouter_response = call_openrouter_api(prompt)
+                parsed = parse_analysis_response(openrouter_response, complaint_text)
+                if parsed:
+                    cache_store(cache_key, openrouter_response)
+                    return parsed
+            except Exception as e:
+                logger.warning(f"⚠️ OpenRouter analysis failed, using fallback: {e}")
+        
+        return local_analysis
+        
+    except Exception as e:
+        logger.error(f"❌ RAG analysis error: {e}")
+        return get_fallback_analysis(normalize_complaint(complaint_text))
+
+# The helpers below are shared by the sync (Flask) and async (asgi.py) serving paths
+
+def speculation_matches(guess: Dict[str, Any], analysis: Dict[str, Any]) -> bool:
+    """A response generated for the guess can be served for the final analysis
+    
+    The response quotes the department's contacts and, when urgent, its emergency line, so the
+    guess must resolve to the same department and carry the same priority.
+    """
+    return (response_department(guess['category']) == response_department(analysis['category'])
+            and guess['priority'] == analysis['priority'])
+
+def analyze_and_respond(complaint_text: str, language: str = 'en') -> Tuple[Dict[str, Any], str]:
+    """analyze_complaint_with_rag, then generate_ai_response - overlapped when the LLM analysis runs"""
+    if config.ONE_SHOT_ENABLED and config.OPENROUTER_API_KEY:
+        return analyze_and_respond_one_shot(complaint_text, language)
+    
+    speculation = {}
+    
+    def start_speculative_response(guess: Dict[str, Any]):
+        if not acquire_speculation_slot():
+            return
+        
+        def timed_response():
+            started = time.perf_counter()
+            response = generate_ai_response(complaint_text, guess['category'], guess['priority'], language, cancel)
+            return response, (time.perf_counter() - started) * 1000
+        
+        cancel = threading.Event()
+        speculation['guess'] = guess
+        speculation['cancel'] = cancel
+        speculation['future'] = speculation_executor.submit(timed_response)
+        speculation['future'].add_done_callback(lambda _: speculation_slots.release())
+    
+    started = time.perf_counter()
+    analysis = analyze_complaint_with_rag(complaint_text, language, on_local_guess=start_speculative_response)
+    if not speculation:
+        return analysis, generate_ai_response(complaint_text, analysis['category'], analysis['priority'], language)
+    
+    analysis_ms = (time.perf_counter() - started) * 1000
+    if speculation_matches(speculation['guess'], analysis):
+        ai_response, response_ms = speculation['future'].result()
+        record_speculation(speculation['guess'], analysis, started, analysis_ms, response_ms)
+        return analysis, ai_response
+    
+    # The guess was wrong: stop the speculative response (its WatsonX stream ends at the next chunk and
+    # no further provider is called; an OpenRouter request already sent still completes)
+    speculation['cancel'].set()
+    speculation['future'].cancel()
+    regenerate_started = time.perf_counter()
+    ai_response = generate_ai_response(complaint_text, analysis['category'], analysis['priority'], language)
+    response_ms = (time.perf_counter() - regenerate_started) * 1000
+    record_speculation(speculation['guess'], analysis, started, analysis_ms, response_ms)
+    return analysis, ai_response
+
+def acquire_speculation_slot() -> bool:
+    """Whether a speculative response may start; on True the caller releases speculation_slots when it ends"""
+    if not config.SPECULATIVE_RESPONSE_ENABLED:
+        return False
+    if not speculation_slots.acquire(blocking=False):
+        speculation_stats.record_skipped()
+        return False
+    return True
+
+def record_speculation(guess: Dict[str, Any], analysis: Dict[str, Any], started: float, analysis_ms: float,
+                       response_ms: float):
+    """Outcome of a speculative request; response_ms is the kept or the regenerated response's time"""
+    matched = speculation_matches(guess, analysis)
+    if not matched:
+        logger.info(f"🔄 Speculative response dropped ({guess['category']}/{guess['priority']} -> {analysis['category']}/{analysis['priority']})")
+    speculation_stats.record(matched, analysis_ms, response_ms, (time.perf_counter() - started) * 1000)
+
+def cache_lookup(*keys: str) -> Optional[str]:
+    """First cached provider answer among keys (None when caching is off)"""
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    return response_cache.get(*keys)
+
+def cache_store(key: str, text: str):
+    if config.LLM_CACHE_ENABLED and text:
+        response_cache.put(key, text)
+
+def analysis_cache_key(prompt: str) -> str:
+    return response_cache_key('openrouter', OPENROUTER_MODEL, prompt, {'max_tokens': 500})
+
+def response_cache_keys(watson_request: Dict[str, Any], openrouter_prompt: str) -> Dict[str, str]:
+    """Cache key of each provider's citizen-facing response (the WatsonX deployment URL names its model)"""
+    return {
+        'watsonx': response_cache_key('watsonx', config.WATSONX_STREAMING_URL, watson_request),
+        'openrouter': response_cache_key('openrouter', OPENROUTER_MODEL, openrouter_prompt, {'max_tokens': 500})
+    }
+
+def response_fields(complaint_text: str, up_info: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Request-specific values a semantically cached response is re-filled with"""
+    return {
+        'district': district_extractor.extract(complaint_text),
+        'contact': up_info['contact'],
+        'emergency': up_info['emergency'],
+        'email': up_info['email'],
+        'head': up_info['head'],
+        'response_time': up_info['response_time']
+    }
+
+def cached_response(complaint_text: str, category: str, priority: str, language: str, up_info: Dict[str, Any],
+                    cache_keys: Dict[str, str]) -> Optional[str]:
+    """Same prompt answered recently by either provider, else a near-duplicate complaint's response"""
+    return (cache_lookup(cache_keys['watsonx'], cache_keys['openrouter'])
+            or semantic_cache_lookup(complaint_text, category, priority, language, up_info))
+
+def response_recorder(complaint_text: str, category: str, priority: str, language: str, up_info: Dict[str, Any],
+                      cache_keys: Dict[str, str]) -> Callable[[str, str], None]:
+    """remember(provider, response): store a provider's response in the exact and the semantic cache"""
+    def remember(provider: str, response: str):
+        cache_store(cache_keys[provider], response)
+        semantic_cache_store(complaint_text, category, priority, language, up_info, response)
+    return remember
+
+def semantic_cache_lookup(complaint_text: str, category: str, priority: str, language: str,
+                          up_info: Dict[str, Any]) -> Optional[str]:
+    """Response to a near-duplicate complaint, re-filled for this one (None when off or before warm-up)"""
+    if not (config.SEMANTIC_CACHE_ENABLED and complaint_encoder):
+        return None
+    try:
+        vector = encode_complaint(normalize_complaint(complaint_text))
+        hit = semantic_cache.get((category, priority, language), vector, complaint_text,
+                                 response_fields(complaint_text, up_info))
+    except Exception as e:
+        logger.warning(f"⚠️ Semantic cache lookup failed: {e}")
+        return None
+    if hit:
+        logger.info(f'✅ Response reused from a similar complaint (similarity {hit[1]:.3f})')
+        return hit[0]
+    return None
+
+def semantic_cache_store(complaint_text: str, category: str, priority: str, language: str,
+                         up_info: Dict[str, Any], response: str):
+    if not (config.SEMANTIC_CACHE_ENABLED and complaint_encoder and response):
+        return
+    try:
+        vector = encode_complaint(normalize_complaint(complaint_text))
+        semantic_cache.put((category, priority, language), vector, response, complaint_text,
+                           response_fields(complaint_text, up_info))
+    except Exception as e:
+        logger.warning(f"⚠️ Semantic cache store failed: {e}")
+
+def analyze_and_respond_one_shot(complaint_text: str, language: str = 'en') -> Tuple[Dict[str, Any], str]:
+    """Analysis and response from one OpenRouter call; fields it gets wrong fall back one by one"""
+    local_analysis, decisive = local_tier_analysis(complaint_text)
+    if decisive:
+        return local_analysis, generate_ai_response(
+            complaint_text, local_analysis['category'], local_analysis['priority'], language)
+    
+    prompt = build_one_shot_prompt(complaint_text, language)
+    cache_key = one_shot_cache_key(prompt)
+    answer = cache_lookup(cache_key)
+    from_cache = bool(answer)
+    if not answer:
+        try:
+            answer = call_openrouter_api(prompt, max_tokens=config.ONE_SHOT_MAX_TOKENS)
+        except Exception as e:
+            logger.warning(f"⚠️ One-shot call failed, using fallback: {e}")
+    
+    analysis, ai_response = one_shot_result(answer, from_cache, complaint_text, local_analysis, cache_key)
+    if ai_response is None:
+        ai_response = generate_ai_response(complaint_text, analysis['category'], analysis['priority'], language)
+    return analysis, ai_response
+
+def local_tier_analysis(complaint_text: str) -> Tuple[Dict[str, Any], bool]:
+    """(best local analysis, whether it is a decisive kNN vote that needs no LLM analysis)"""
+    try:
+        local_text = normalize_complaint(complaint_text)
+        knn_analysis = None
+        if sentence_model and knn_classifier:
+            knn_analysis = classify_with_knn(local_text)
+            if is_decisive_knn(knn_analysis):
+                return knn_analysis, True
+        return local_fallback_analysis(local_text, knn_analysis), False
+    except Exception as e:
+        logger.error(f"❌ RAG analysis error: {e}")
+        return get_fallback_analysis(normalize_complaint(complaint_text)), False
+
+def build_one_shot_prompt(complaint_text: str, language: str) -> str:
+    """OpenRouter prompt asking for the analysis and the citizen response in one JSON object"""
+    return f"""
+            You are Samadhan AI, an expert system for UP government complaints trained on comprehensive real data.
+            
+            Analyze this complaint for Uttar Pradesh CM Helpline 1076 and write the reply to the citizen:
+            Complaint: {complaint_text}
+            Language: {language}
+            
+            Provide JSON response:
+            {{
+                "category": "{'|'.join(CATEGORIES)}",
+                "priority": "{'|'.join(PRIORITIES)}",
+                "department": "{'|'.join(DEPARTMENTS)}",
+                "sentiment": "{'|'.join(SENTIMENTS)}",
+                "district": "if mentioned, else null",
+                "confidence": 0.8,
+                "response": "2-3 sentence empathetic reply with a realistic timeline, no markdown"
+            }}
+            
+            In "response" write {{department}}, {{contact}}, {{response_time}} and, if urgent, {{emergency}} as
+            placeholders; they are filled in afterwards.
+            
+            Only respond with valid JSON.
+            """
+
+def one_shot_cache_key(prompt: str) -> str:
+    return response_cache_key('openrouter', OPENROUTER_MODEL, prompt, {'max_tokens': config.ONE_SHOT_MAX_TOKENS})
+
+def one_shot_result(answer: Optional[str], from_cache: bool, complaint_text: str, local_analysis: Dict[str, Any],
+                    cache_key: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """(analysis, response) from a one-shot answer; invalid analysis fields come from local_analysis
+    
+    The response is None when it is missing or invalid (the caller generates one the usual way). Only
+    fully valid answers are cached.
+    """
+    payload = extract_json_object(answer) if answer else None
+    if payload is None:
+        one_shot_stats.record_failed()
+        return local_analysis, None
+    
+    fields, invalid = validate_one_shot(payload)
+    category = fields.get('category', local_analysis['category'])
+    department = fields.get('department', local_analysis['department'])
+    district = district_extractor.extract(complaint_text) or fields.get('district')
+    up_info = get_up_government_info(category, district)
+    analysis = {
+        'category': category,
+        'priority': fields.get('priority', local_analysis['priority']),
+        'department': department,
+        'sentiment': fields.get('sentiment', local_analysis['sentiment']),
+        'suggested_response': f"Thank you for your {category.lower()} complaint. We will address it promptly.",
+        'timeline': up_info['response_time'],
+        'confidence': fields.get('confidence', local_analysis['confidence']),
+        'source': 'samadhan_ai_one_shot',
+        'up_info': up_info,
+        'district': up_info.get('district')
+    }
+    
+    ai_response = None
+    if 'response' in fields:
+        ai_response = fill_template(clean_ai_response(fields['response']), {
+            'department': department,
+            'contact': up_info['contact'],
+            'emergency': up_info['emergency'],
+            'response_time': up_info['response_time']
+        })
+        if ai_response is None or re.search(r'\{\w+\}', ai_response):
+            ai_response = None
+            invalid.append('response')
+    
+    if not from_cache:
+        one_shot_stats.record(invalid)
+        if not invalid:
+            cache_store(cache_key, answer)
+    return analysis, ai_response
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """The outermost JSON object in an LLM answer, or None"""
+    json_match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not json_match:
+        return None
+    try:
+        parsed = json.loads(json_match.group())
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+def is_decisive_knn(knn_analysis: Dict[str, Any]) -> bool:
+    """A kNN vote strong enough to skip the LLM"""
+    return (config.KNN_CLASSIFIER_ENABLED
+            and knn_analysis['confidence'] >= config.KNN_MIN_VOTE_SHARE
+            and knn_analysis['knn']['top_similarity'] >= config.KNN_MIN_SIMILARITY)
+
+def build_analysis_prompt(complaint_text: str, language: str) -> str:
+    """OpenRouter prompt asking for the complaint analysis as JSON"""
+    return f"""
             You are Samadhan AI, an expert system for UP government complaints trained on comprehensive real data.
             
             Analyze this complaint for Uttar Pradesh CM Helpline 1076:
             Complaint: {complaint_text}
             Language: {language}
             
-            Based on comprehensive Samadhan AI training data with {get_dataset_stats()['total_training_documents']} documents, provide JSON response:
+            Based on comprehensive Samadhan AI training data with {DATASET_STATS['total_training_documents']} documents, provide JSON response:
             {{
                 "category": "Infrastructure|Utilities|Environment|Traffic|Healthcare|Education|Other",
                 "priority": "low|medium|high|critical",
@@ -402,79 +1086,278 @@ def analyze_complaint_with_rag(complaint_text: str, language: str = 'en') -> Dic
             
             Only respond with valid JSON.
             """
-            
+
+def parse_analysis_response(response_text: str, complaint_text: str) -> Optional[Dict[str, Any]]:
+    """Analysis from the LLM's JSON answer, or None when it has no JSON object"""
+    # Clean and try to parse JSON from response
+    cleaned_response = clean_ai_response(response_text)
+    json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
+    if not json_match:
+        return None
+    parsed = json.loads(json_match.group())
+    
+    # Get real UP government info
+    category = parsed.get('category', 'Other')
+    district = district_extractor.extract(complaint_text) or parsed.get('district')
+    up_info = get_up_government_info(category, district)
+    
+    return {
+        'category': category,
+        'priority': parsed.get('priority', 'medium'),
+        'department': parsed.get('department', 'General Services'),
+        'sentiment': parsed.get('sentiment', 'neutral'),
+        'suggested_response': f"Thank you for your {category.lower()} complaint. We will address it promptly.",
+        'timeline': up_info['response_time'],
+        'confidence': parsed.get('confidence', 0.8),
+        'source': 'samadhan_ai_rag',
+        'up_info': up_info,
+        'district': up_info.get('district')
+    }
+
+def local_fallback_analysis(local_text: str, knn_analysis: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Best local answer when the LLM did not answer: kNN vote, then linear classifier, then rules"""
+    # Fallback to sentence transformers kNN classifier if available
+    if knn_analysis:
+        return knn_analysis
+    
+    # CPU-only linear classifier when neither the LLM nor the embedding tier answered
+    if linear_classifier:
+        linear_analysis = classify_with_linear(local_text)
+        if linear_analysis['confidence'] >= config.LINEAR_MIN_CONFIDENCE:
+            return linear_analysis
+    
+    # Final fallback to rule-based analysis
+    return get_fallback_analysis(local_text)
+
+def normalize_complaint(complaint_text: str) -> str:
+    """Complaint text for the local classifier tiers (the LLM prompt keeps the original)"""
+    if not config.TEXT_NORMALIZATION_ENABLED:
+        return complaint_text
+    return text_normalizer.normalize(complaint_text).text
+
+def encode_complaint(complaint_text: str):
+    """Embed a complaint through the shared query cache (all complaint embeddings go through here)"""
+    return complaint_encoder.encode([complaint_text])
+
+def classify_with_knn(complaint_text: str) -> Dict[str, Any]:
+    """Classify complaint by a similarity-weighted vote of its nearest training documents"""
+    complaint_embedding = encode_complaint(complaint_text)
+    query_text = complaint_text if config.HYBRID_RETRIEVAL_ENABLED else None
+    result = knn_classifier.classify(complaint_embedding, config.KNN_TOP_K, query_text)
+    
+    analysis = get_fallback_analysis(complaint_text)
+    if result['department']:
+        analysis['category'] = result['category']
+        analysis['department'] = result['department']
+    if result['priority']:
+        # Explicit urgency keywords in the complaint can only raise the voted priority
+        severity = ['low', 'medium', 'high', 'critical']
+        analysis['priority'] = max(result['priority'], analysis['priority'], key=severity.index)
+    
+    up_info = get_up_government_info(analysis['category'], analysis['district'])
+    analysis['confidence'] = result['vote_share']
+    analysis['source'] = 'samadhan_ai_knn_classifier'
+    analysis['up_info'] = up_info
+    analysis['timeline'] = up_info['response_time']
+    analysis['suggested_response'] = f'Thank you for your {analysis["category"].lower()} complaint. Contact {analysis["department"]} at {up_info["contact"]} or emergency {up_info["emergency"]}. Response time: {up_info["response_time"]}.'
+    analysis['knn'] = {
+        'top_similarity': result['top_similarity'],
+        'vote_share': result['vote_share'],
+        'neighbors': result['neighbors']
+    }
+    return analysis
+
+def classify_with_linear(complaint_text: str) -> Dict[str, Any]:
+    """Classify complaint with the hashing-vectorizer linear classifier"""
+    result = linear_classifier.predict(complaint_text)
+    
+    analysis = get_fallback_analysis(complaint_text)
+    analysis['category'] = result['category']
+    analysis['department'] = result['department']
+    # Priority stays with the keyword rules: in cross-validation no confidence threshold on the linear
+    # priority head beats them (benchmarks/linear_classifier_benchmark.py)
+    
+    up_info = get_up_government_info(analysis['category'], analysis['district'])
+    analysis['confidence'] = result['confidence']
+    analysis['source'] = 'samadhan_ai_linear_classifier'
+    analysis['up_info'] = up_info
+    analysis['timeline'] = up_info['response_time']
+    analysis['suggested_response'] = f'Thank you for your {analysis["category"].lower()} complaint. Contact {analysis["department"]} at {up_info["contact"]} or emergency {up_info["emergency"]}. Response time: {up_info["response_time"]}.'
+    return analysis
+
+def generate_ai_response(complaint_text: str, category: str, priority: str, language: str = 'en',
+                         cancel: Optional[threading.Event] = None) -> str:
+    """Generate AI response using available services (WatsonX primary, OpenRouter fallback)
+    
+    Setting cancel stops the WatsonX stream at its next chunk and skips the providers not yet called;
+    the response is then ''.
+    """
+    def cancelled() -> bool:
+        return cancel is not None and cancel.is_set()
+    
+    try:
+        # Get UP government info
+        up_info = get_up_government_info(category)
+        watson_request, openrouter_prompt = build_response_prompts(complaint_text, category, priority, language, up_info)
+        
+        # Same prompt, or a near-duplicate complaint (outages bring many), answered recently
+        cache_keys = response_cache_keys(watson_request, openrouter_prompt)
+        cached = cached_response(complaint_text, category, priority, language, up_info, cache_keys)
+        if cached:
+            return cached
+        remember = response_recorder(complaint_text, category, priority, language, up_info, cache_keys)
+        
+        # Both providers configured: race them once WatsonX is slow to its first token
+        if config.HEDGING_ENABLED and config.WATSONX_API_KEY and config.OPENROUTER_API_KEY:
+            hedged = generate_hedged_response(watson_request, openrouter_prompt, cancel)
+            if hedged:
+                provider, hedged_response = hedged
+                remember(provider, hedged_response)
+                return hedged_response
+            if cancelled():
+                return ''
+            return get_category_fallback_response(category, priority, up_info)
+        
+        # Try WatsonX streaming first for response generation
+        if config.WATSONX_API_KEY:
             try:
-                openrouter_response = call_openrouter_api(analysis_prompt)
-                
-                # Clean and try to parse JSON from response
-                cleaned_response = clean_ai_response(openrouter_response)
-                json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
-                if json_match:
-                    parsed = json.loads(json_match.group())
-                    
-                    # Get real UP government info
-                    category = parsed.get('category', 'Other')
-                    district = parsed.get('district')
-                    up_info = get_up_government_info(category, district)
-                    
-                    return {
-                        'category': category,
-                        'priority': parsed.get('priority', 'medium'),
-                        'department': parsed.get('department', 'General Services'),
-                        'sentiment': parsed.get('sentiment', 'neutral'),
-                        'suggested_response': f"Thank you for your {category.lower()} complaint. We will address it promptly.",
-                        'timeline': up_info['response_time'],
-                        'confidence': parsed.get('confidence', 0.8),
-                        'source': 'samadhan_ai_rag',
-                        'up_info': up_info
-                    }
+                watson_response = call_watsonx_streaming(watson_request, cancel=cancel)
+                if cancelled():
+                    return ''
+                logger.info('✅ WatsonX response generated')
+                remember('watsonx', watson_response)
+                return watson_response
             except Exception as e:
-                logger.warning(f"⚠️ OpenRouter analysis failed, using fallback: {e}")
+                logger.warning(f"⚠️ WatsonX failed, using OpenRouter fallback: {e}")
         
-        # Fallback to sentence transformers RAG if available
-        if sentence_model:
-            sample_docs = create_samadhan_ai_rag_documents()
-            doc_texts = [doc.page_content for doc in sample_docs]
-            
-            # Get embeddings
-            complaint_embedding = sentence_model.encode([complaint_text])
-            doc_embeddings = sentence_model.encode(doc_texts)
-            
-            # Find most similar document
-            similarities = np.dot(complaint_embedding, doc_embeddings.T)[0]
-            best_match_idx = np.argmax(similarities)
-            best_doc = sample_docs[best_match_idx]
-            
-            # Use metadata from best match
-            analysis = get_fallback_analysis(complaint_text)
-            analysis['category'] = best_doc.metadata.get('category', analysis['category'])
-            analysis['department'] = best_doc.metadata.get('department', analysis['department'])
-            analysis['confidence'] = float(similarities[best_match_idx])
-            analysis['source'] = 'samadhan_ai_sentence_transformers'
-            
-            # Add UP government info
-            up_info = get_up_government_info(analysis['category'])
-            analysis['up_info'] = up_info
-            analysis['timeline'] = up_info['response_time']
-            
-            return analysis
+        # Try OpenRouter as fallback
+        if config.OPENROUTER_API_KEY and not cancelled():
+            try:
+                openrouter_response = call_openrouter_api(openrouter_prompt)
+                cleaned_response = clean_ai_response(openrouter_response)
+                logger.info('✅ OpenRouter fallback response generated')
+                remember('openrouter', cleaned_response)
+                return cleaned_response
+            except Exception as e:
+                logger.warning(f"⚠️ OpenRouter fallback failed: {e}")
         
-        # Final fallback to rule-based analysis
-        return get_fallback_analysis(complaint_text)
+        # Final fallback to category-based response with real UP data
+        return get_category_fallback_response(category, priority, up_info)
         
     except Exception as e:
-        logger.error(f"❌ RAG analysis error: {e}")
-        return get_fallback_analysis(complaint_text)
+        logger.error(f"❌ AI response generation error: {e}")
+        up_info = get_up_government_info(category)
+        return get_category_fallback_response(category, priority, up_info)
+
+def generate_hedged_response(watson_request: Dict[str, Any], openrouter_prompt: str,
+                             cancel: Optional[threading.Event] = None) -> Optional[Tuple[str, str]]:
+    """WatsonX, plus OpenRouter once WatsonX is past the hedge delay without a first token
+    
+    The first provider to complete answers; a losing WatsonX stream stops at its next chunk, a losing
+    OpenRouter call finishes in the background and is dropped. Returns (provider, response), with
+    provider 'watsonx' or 'openrouter', or None when both fail or the caller sets cancel.
+    """
+    started = time.perf_counter()
+    progress = threading.Event()
+    if cancel is None:
+        cancel = threading.Event()
+    
+    def on_first_token():
+        hedge_policy.record_first_token((time.perf_counter() - started) * 1000)
+        progress.set()
+    
+    def call_openrouter() -> str:
+        return clean_ai_response(call_openrouter_api(openrouter_prompt))
+    
+    primary = hedge_executor.submit(call_watsonx_streaming, watson_request, on_first_token, cancel)
+    primary.add_done_callback(lambda _: progress.set())
+    pending = {primary: PRIMARY}
+    hedged = False
+    if not progress.wait(hedge_policy.delay_ms() / 1000):
+        logger.info('🔀 WatsonX slow to first token, hedging with OpenRouter')
+        pending[hedge_executor.submit(call_openrouter)] = SECONDARY
+        hedged = True
+    
+    secondary_started = hedged
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            provider = pending.pop(future)
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ {'WatsonX' if provider == PRIMARY else 'OpenRouter'} failed: {e}")
+                if not secondary_started:
+                    # WatsonX failed outright: the usual OpenRouter fallback
+                    pending[hedge_executor.submit(call_openrouter)] = SECONDARY
+                    secondary_started = True
+                continue
+            if cancel.is_set():
+                return None
+            cancel.set()
+            hedge_policy.record(hedged, provider)
+            return ('watsonx' if provider == PRIMARY else 'openrouter'), response
+    
+    hedge_policy.record(hedged)
+    return None
 
-def generate_ai_response(complaint_text: str, category: str, priority: str, language: str = 'en') -> str:
-    """Generate AI response using available services (WatsonX primary, OpenRouter fallback)"""
+def stream_ai_response(complaint_text: str, category: str, priority: str, language: str = 'en') -> Iterator[Tuple[str, str]]:
+    """generate_ai_response as ('token', text) pieces while WatsonX generates, then ('done', response)
+    
+    Cached, OpenRouter and fallback responses arrive as a single token. The done response is the one
+    to keep: when WatsonX fails midway, the tokens already sent are superseded by the fallback.
+    """
+    up_info = get_up_government_info(category)
+    streamed = False
     try:
-        # Get UP government info
-        up_info = get_up_government_info(category)
+        watson_request, openrouter_prompt = build_response_prompts(complaint_text, category, priority, language, up_info)
+        cache_keys = response_cache_keys(watson_request, openrouter_prompt)
+        remember = response_recorder(complaint_text, category, priority, language, up_info, cache_keys)
+        response = cached_response(complaint_text, category, priority, language, up_info, cache_keys)
         
-        # Try WatsonX streaming first for response generation
-        if config.WATSONX_API_KEY:
-            watson_prompt = f"""You are Samadhan AI, a helpful government assistant for Uttar Pradesh, India.
+        if not response and config.WATSONX_API_KEY:
+            cleaner = StreamingCleaner(clean_ai_response)
+            try:
+                logger.info('🤖 Streaming WatsonX...')
+                with closing(stream_watsonx(watson_request)) as deltas:
+                    for delta in deltas:
+                        piece = cleaner.feed(delta)
+                        if piece:
+                            streamed = True
+                            yield 'token', piece
+                piece = cleaner.finish()
+                if piece:
+                    streamed = True
+                    yield 'token', piece
+                response = cleaner.text
+                logger.info('✅ WatsonX response streamed')
+                remember('watsonx', response)
+            except Exception as e:
+                logger.warning(f"⚠️ WatsonX stream failed, using OpenRouter fallback: {e}")
+        
+        if not response and config.OPENROUTER_API_KEY:
+            try:
+                response = clean_ai_response(call_openrouter_api(openrouter_prompt))
+                logger.info('✅ OpenRouter fallback response generated')
+                remember('openrouter', response)
+            except Exception as e:
+                logger.warning(f"⚠️ OpenRouter fallback failed: {e}")
+        
+        if not response:
+            response = get_category_fallback_response(category, priority, up_info)
+        
+    except Exception as e:
+        logger.error(f"❌ AI response generation error: {e}")
+        response = get_category_fallback_response(category, priority, up_info)
+    
+    if not streamed:
+        yield 'token', response
+    yield 'done', response
+
+def build_response_prompts(complaint_text: str, category: str, priority: str, language: str,
+                           up_info: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """WatsonX request body and OpenRouter prompt for the citizen-facing response"""
+    watson_prompt = f"""You are Samadhan AI, a helpful government assistant for Uttar Pradesh, India.
 
 A citizen submitted this complaint to CM Helpline 1076:
 Complaint: "{complaint_text}"
@@ -497,27 +1380,18 @@ Provide a professional, empathetic response that:
 
 Keep response concise (2-3 sentences). No markdown formatting."""
 
-            try:
-                request_body = {
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": watson_prompt
-                        }
-                    ],
-                    "max_tokens": 300,
-                    "temperature": 0.7
-                }
-                
-                watson_response = call_watsonx_streaming(request_body)
-                logger.info('✅ WatsonX response generated')
-                return watson_response
-            except Exception as e:
-                logger.warning(f"⚠️ WatsonX failed, using OpenRouter fallback: {e}")
-        
-        # Try OpenRouter as fallback
-        if config.OPENROUTER_API_KEY:
-            openrouter_prompt = f"""Generate professional UP government response for Samadhan AI:
+    request_body = {
+        "messages": [
+            {
+                "role": "user",
+                "content": watson_prompt
+            }
+        ],
+        "max_tokens": 300,
+        "temperature": 0.7
+    }
+
+    openrouter_prompt = f"""Generate professional UP government response for Samadhan AI:
 
 Complaint: {complaint_text}
 Category: {category}
@@ -529,72 +1403,31 @@ Response Time: {up_info['response_time']}
 
 Professional, empathetic response with real contact info. 2-3 sentences. No markdown."""
 
-            try:
-                openrouter_response = call_openrouter_api(openrouter_prompt)
-                cleaned_response = clean_ai_response(openrouter_response)
-                logger.info('✅ OpenRouter fallback response generated')
-                return cleaned_response
-            except Exception as e:
-                logger.warning(f"⚠️ OpenRouter fallback failed: {e}")
-        
-        # Final fallback to category-based response with real UP data
-        return get_category_fallback_response(category, priority, up_info)
-        
-    except Exception as e:
-        logger.error(f"❌ AI response generation error: {e}")
-        up_info = get_up_government_info(category)
-        return get_category_fallback_response(category, priority, up_info)
+    return request_body, openrouter_prompt
 
 def get_fallback_analysis(complaint_text: str) -> Dict[str, Any]:
     """Enhanced rule-based analysis with comprehensive Samadhan AI dataset"""
-    text = complaint_text.lower()
-    
-    # Use comprehensive Samadhan AI dataset for better categorization
-    priority_keywords = get_priority_keywords()
+    # One pass over the complaint finds every department, priority and sentiment keyword
+    hits = keyword_engine.analyze(complaint_text)
     
-    category_scores = {}
-    for dept_name, dept_info in SAMADHAN_AI_COMPLETE_DATASET['government_data']['departments'].items():
-        score = sum(1 for keyword in dept_info['priority_keywords'] if keyword in text)
-        if score > 0:
-            category_scores[dept_name] = score
-    
-    if category_scores:
-        category = max(category_scores, key=category_scores.get)
-        department = category
+    department = keyword_engine.best_department(hits)
+    if department:
+        category = department
     else:
         category = 'Other'
         department = 'General Services'
     
-    # Priority detection using comprehensive keywords
-    priority = 'medium'  # default
-    for p in ['critical', 'high', 'low']:
-        if any(keyword in text for keyword in priority_keywords[p]['general']):
-            priority = p
-            break
-        # Check category-specific keywords
-        category_key = category.lower().replace(' ', '_')
-        if category_key in priority_keywords[p]:
-            if any(keyword in text for keyword in priority_keywords[p][category_key]):
-                priority = p
-                break
+    # Priority detection using comprehensive keywords (general first, then category-specific)
+    priority = hits.priority(category.lower().replace(' ', '_'))
     
     # Sentiment analysis
-    sentiment_keywords = {
-        'negative': ['angry', 'frustrated', 'terrible', 'worst', 'horrible', 'disgusted', 'furious', 'outraged', 'disappointed'],
-        'positive': ['thank', 'appreciate', 'good', 'excellent', 'satisfied', 'happy', 'pleased', 'grateful']
-    }
-    
-    sentiment = 'neutral'
-    neg_score = sum(1 for word in sentiment_keywords['negative'] if word in text)
-    pos_score = sum(1 for word in sentiment_keywords['positive'] if word in text)
+    sentiment = hits.sentiment()
     
-    if neg_score > pos_score:
-        sentiment = 'negative'
-    elif pos_score > neg_score:
-        sentiment = 'positive'
+    # District from the gazetteer (names, Hindi spellings, codes), no LLM call
+    district = district_extractor.extract(complaint_text)
     
     # Get UP government info
-    up_info = get_up_government_info(category)
+    up_info = get_up_government_info(category, district)
     
     return {
         'category': category,
@@ -605,6 +1438,7 @@ def get_fallback_analysis(complaint_text: str) -> Dict[str, Any]:
         'confidence': 0.7,
         'source': 'samadhan_ai_rule_based',
         'up_info': up_info,
+        'district': up_info.get('district'),
         'suggested_response': f'Thank you for your {category.lower()} complaint. Contact {department} at {up_info["contact"]} or emergency {up_info["emergency"]}. Response time: {up_info["response_time"]}.'
     }
 
@@ -629,7 +1463,7 @@ def get_category_fallback_response(category: str, priority: str = 'medium', up_i
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint - Welcome message"""
-    dataset_stats = get_dataset_stats()
+    dataset_stats = DATASET_STATS
     return jsonify({
         'message': 'Samadhan AI - UP Government Services',
         'status': 'running',
@@ -639,7 +1473,8 @@ def root():
         'ai_services': {
             'watson_x_streaming': bool(config.WATSONX_API_KEY),
             'openrouter_deepseek_fallback': bool(config.OPENROUTER_API_KEY),
-            'rag_system': SENTENCE_TRANSFORMERS_AVAILABLE,
+            'rag_system': SENTENCE_TRANSFORMERS_AVAILABLE or ONNX_RUNTIME_AVAILABLE,
+            'encoder_backend': config.ENCODER_BACKEND,
             'comprehensive_dataset': 'loaded'
         },
         'configuration': {
@@ -648,35 +1483,62 @@ def root():
             'deployment_id_set': bool(config.WATSONX_DEPLOYMENT_ID),
             'streaming_url_available': bool(config.WATSONX_STREAMING_URL)
         },
-        'endpoints': ['/health', '/api/ai/chat', '/api/ai/analyze', '/api/up/data', '/api/dataset/stats'],
+        'endpoints': ['/health', '/ready', '/api/ingest/complaints', '/api/ai/chat', '/api/ai/chat/stream', '/api/ai/analyze', '/api/up/data', '/api/dataset/stats'],
         'timestamp': datetime.now().isoformat()
     })
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    dataset_stats = get_dataset_stats()
+    """Health check endpoint - cheap liveness check, does not wait for warm-up"""
+    dataset_stats = DATASET_STATS
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'samadhan_ai': {
             'version': '3.0.0',
             'dataset': 'comprehensive',
+            'warmup_status': warmup_state['status'],
             'rag_trained': bool(sentence_model),
+            'document_embeddings': len(embedding_store) if embedding_store else 0,
+            'document_embeddings_dtype': embedding_store.dtype if embedding_store else None,
+            'ingested_segments': segmented_index.params() if segmented_index else None,
+            'embedding_cache': complaint_encoder.cache.stats() if complaint_encoder else None,
+            'linear_classifier': bool(linear_classifier),
+            'speculative_responses': speculation_stats.stats(),
+            'hedging': dict(hedge_policy.stats(), enabled=config.HEDGING_ENABLED),
+            'llm_response_cache': dict(response_cache.stats(), enabled=config.LLM_CACHE_ENABLED),
+            'semantic_response_cache': dict(semantic_cache.stats(), enabled=config.SEMANTIC_CACHE_ENABLED),
+            'one_shot': dict(one_shot_stats.stats(), enabled=config.ONE_SHOT_ENABLED),
+            'encode_batching': complaint_encoder.model.stats() if complaint_encoder and hasattr(complaint_encoder.model, 'stats') else None,
             'dataset_stats': dataset_stats
         },
         'watsonx': {
             'configured': bool(config.WATSONX_API_KEY),
             'deployment_id': bool(config.WATSONX_DEPLOYMENT_ID),
             'streaming_url': bool(config.WATSONX_STREAMING_URL),
-            'streaming_ready': bool(config.WATSONX_API_KEY and config.WATSONX_STREAMING_URL)
+            'streaming_ready': bool(config.WATSONX_API_KEY and config.WATSONX_STREAMING_URL),
+            'iam_token': iam_tokens.stats()
         },
         'openrouter': {
             'configured': bool(config.OPENROUTER_API_KEY),
             'fallback_ready': bool(config.OPENROUTER_API_KEY)
-        }
+        },
+        'provider_connections': provider_sessions.stats(),
+        'provider_breakers': {name: breaker.stats() for name, breaker in provider_breakers.items()}
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint - 503 until model and index warm-up has finished"""
+    ready = warmup_state['status'] in ('ready', 'degraded')
+    return jsonify({
+        'ready': ready,
+        'warmup': dict(warmup_state),
+        'embedding_tier': bool(knn_classifier),
+        'pid': os.getpid(),
+        'timestamp': datetime.now().isoformat()
+    }), 200 if ready else 503
+
 @app.route('/api/up/data', methods=['GET'])
 def get_up_data():
     """Get comprehensive Samadhan AI UP Government dataset"""
@@ -700,16 +1562,8 @@ def ai_chat():
 
         logger.info(f'💬 Samadhan AI processing: {message[:50]}...')
         
-        # Analyze with comprehensive RAG system
-        analysis = analyze_complaint_with_rag(message, language)
-        
-        # Generate response
-        ai_response = generate_ai_response(
-            message, 
-            analysis['category'], 
-            analysis['priority'], 
-            language
-        )
+        # Analyze with comprehensive RAG system and generate the response (overlapped when possible)
+        analysis, ai_response = analyze_and_respond(message, language)
         
         logger.info('✅ Samadhan AI response ready')
         
@@ -729,6 +1583,44 @@ def ai_chat():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/api/ai/chat/stream', methods=['POST'])
+def ai_chat_stream():
+    """Chat endpoint as server-sent events - the analysis first, then response tokens as WatsonX generates them"""
+    data = request.get_json(silent=True) or {}
+    message = data.get('message')
+    language = data.get('language', 'en')
+    
+    if not message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    logger.info(f'💬 Samadhan AI streaming: {message[:50]}...')
+    
+    def events():
+        try:
+            analysis = analyze_complaint_with_rag(message, language)
+            yield sse_event('analysis', analysis, app.json.dumps)
+            
+            for kind, text in stream_ai_response(message, analysis['category'], analysis['priority'], language):
+                if kind == 'token':
+                    yield sse_event('token', {'text': text})
+                else:
+                    yield sse_event('done', {
+                        'response': text,
+                        'timestamp': datetime.now().isoformat(),
+                        'language': language,
+                        'system': 'samadhan_ai_comprehensive'
+                    })
+            logger.info('✅ Samadhan AI response streamed')
+        except Exception as e:
+            logger.error(f'❌ Samadhan AI error: {e}')
+            yield sse_event('error', {
+                'error': str(e),
+                'response': f'I apologize for the error. Please contact CM Helpline {get_helpline_number("cm_helpline")} for immediate assistance.',
+                'timestamp': datetime.now().isoformat()
+            })
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
 @app.route('/api/ai/analyze', methods=['POST'])
 def ai_analyze():
     """AI analysis endpoint with comprehensive Samadhan AI RAG"""
@@ -742,16 +1634,8 @@ def ai_analyze():
 
         logger.info(f'🔍 Samadhan AI analyzing: {complaint_text[:50]}...')
         
-        # Analyze with comprehensive RAG system
-        analysis = analyze_complaint_with_rag(complaint_text, language)
-        
-        # Generate response
-        ai_response = generate_ai_response(
-            complaint_text,
-            analysis['category'],
-            analysis['priority'],
-            language
-        )
+        # Analyze with comprehensive RAG system and generate the response (overlapped when possible)
+        analysis, ai_response = analyze_and_respond(complaint_text, language)
         
         # Add response to analysis
         analysis['ai_response'] = ai_response
@@ -766,9 +1650,48 @@ def ai_analyze():
         logger.error(f'❌ Samadhan AI analysis error: {e}')
         return jsonify({
             'error': str(e),
-            'fallback_analysis': get_fallback_analysis(complaint_text)
+            'fallback_analysis': get_fallback_analysis(normalize_complaint(complaint_text))
         }), 500
 
+@app.route('/api/ingest/complaints', methods=['POST'])
+def ingest_complaints():
+    """Append resolved complaints to retrieval as a new immutable index segment"""
+    if not config.INGEST_TOKEN:
+        return jsonify({'error': 'Ingestion unavailable (INGEST_TOKEN not configured)'}), 503
+    token = request.headers.get('X-Ingest-Token', '')
+    if not hmac.compare_digest(token.encode('utf-8'), config.INGEST_TOKEN.encode('utf-8')):
+        return jsonify({'error': 'Invalid or missing X-Ingest-Token'}), 401
+    if not segmented_index or not complaint_encoder:
+        return jsonify({'error': 'Ingestion unavailable (embedding tier not ready or disabled)'}), 503
+    
+    try:
+        data = request.get_json() or {}
+        documents = data.get('documents') or ([data] if data.get('content') else [])
+        if not documents:
+            return jsonify({'error': 'documents (list of {content, metadata}) is required'}), 400
+        if len(documents) > config.INGEST_MAX_DOCUMENTS:
+            return jsonify({'error': f'At most {config.INGEST_MAX_DOCUMENTS} documents per request'}), 413
+        if any(not isinstance(doc, dict) or not doc.get('content') for doc in documents):
+            return jsonify({'error': 'Every document needs non-empty content'}), 400
+        
+        documents = [
+            {'content': doc['content'], 'metadata': {'type': 'resolved_complaint', **(doc.get('metadata') or {})}}
+            for doc in documents
+        ]
+        # Same normalization and encoder as queries; store=False keeps bulk ingests out of the query cache
+        vectors = complaint_encoder.encode([normalize_complaint(doc['content']) for doc in documents], store=False)
+        first, end = segmented_index.add(vectors, documents)
+        
+        return jsonify({
+            'ingested': end - first,
+            'ids': [first, end],
+            'segments': segmented_index.segment_count,
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f'❌ Complaint ingestion error: {e}')
+        return jsonify({'error': str(e)}), 500
+
 # Legacy endpoints (for backward compatibility)
 @app.route('/api/watsonx/test', methods=['GET'])
 def test_watsonx():
@@ -826,6 +1749,9 @@ def internal_error(error):
     logger.error(f'Internal error: {error}')
     return jsonify({'error': 'Internal server error', 'system': 'samadhan_ai'}), 500
 
+# Warm-up is started by the entry point, not on import: gunicorn_config.py hooks, the ASGI
+# lifespan startup in asgi.py, and __main__ below. Importing app (benchmarks, asgi) loads no model.
+
 if __name__ == '__main__':
     dataset_stats = get_dataset_stats()
     logger.info('🚀 Starting Samadhan AI Backend (SECURE)')
@@ -843,8 +1769,10 @@ if __name__ == '__main__':
     logger.info(f'🔧 WatsonX URL: {"✅ Configured" if config.WATSONX_URL else "❌ Missing"}')
     logger.info(f'🔧 OpenRouter API Key: {"✅ Configured" if config.OPENROUTER_API_KEY else "❌ Missing"}')
     
-    # Initialize RAG system
-    initialize_sentence_transformers()
+    # The debug reloader's parent process only watches files; its serving child sets WERKZEUG_RUN_MAIN
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warmup()
+        logger.info(f'🔥 Embedding warm-up: {warmup_state["status"]} (WARMUP_MODE={config.WARMUP_MODE})')
     
     logger.info('🔒 All credentials secured via environment variables')
     logger.info('🚀 Samadhan AI ready for secure deployment!')
@@ -0,0 +1,481 @@
+"""
+Async Serving Mode for Samadhan AI
+=================================
+
+ASGI entry point that serves /api/ai/chat, /api/ai/analyze and
+/api/ai/chat/stream (server-sent events) natively on the event loop: local
+tiers run inline (or in a thread for the encoder), and every WatsonX / IAM
+/ OpenRouter call is an AsyncProviderClient coroutine, so a single worker
+holds hundreds of in-flight LLM calls without a thread each. Every other route (and CORS preflight) is passed to
+the unchanged Flask app through asgiref's WSGI adapter.
+
+Run (SERVING_MODE=async makes gunicorn_config pick the uvicorn worker and this app):
+    SERVING_MODE=async gunicorn --config gunicorn_config.py
+    uvicorn asgi:application --port 5000
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as backend
+from async_providers import AsyncProviderClient
+from hedging import PRIMARY, SECONDARY
+from streaming import SSE_HEADERS, StreamingCleaner, sse_event
+
+logger = backend.logger
+config = backend.config
+
+# Blocking Flask handlers run in asgiref's thread pool
+flask_application = WsgiToAsgi(backend.app)
+
+provider_client: Optional[AsyncProviderClient] = None
+
+
+def get_provider_client() -> AsyncProviderClient:
+    """One client (and connection pool) per worker event loop"""
+    global provider_client
+    if provider_client is None:
+        provider_client = AsyncProviderClient(
+            config.WATSONX_API_KEY,
+            config.WATSONX_STREAMING_URL,
+            config.OPENROUTER_API_KEY,
+            config.FRONTEND_URL,
+            backend.token_cache,
+            openrouter_url=config.OPENROUTER_API_URL,
+            max_connections=config.ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=config.ASYNC_MAX_KEEPALIVE,
+            clean_response=backend.clean_ai_response,
+            breakers=backend.provider_breakers,
+            retry_attempts=config.PROVIDER_RETRY_ATTEMPTS,
+            refresh_token=backend.iam_tokens.get
+        )
+    return provider_client
+
+
+async def analyze_complaint_async(complaint_text: str, language: str = 'en',
+                                  on_local_guess: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """analyze_complaint_with_rag with the OpenRouter call awaited instead of blocking"""
+    try:
+        # Encoding may wait on the micro-batcher; keep the event loop free
+        local_analysis, decisive = await asyncio.to_thread(backend.local_tier_analysis, complaint_text)
+        if decisive:
+            return local_analysis
+
+        if config.OPENROUTER_API_KEY:
+            prompt = backend.build_analysis_prompt(complaint_text, language)
+            cache_key = backend.analysis_cache_key(prompt)
+            cached = await asyncio.to_thread(backend.cache_lookup, cache_key)
+            if cached:
+                return backend.parse_analysis_response(cached, complaint_text)
+
+            if on_local_guess:
+                on_local_guess(local_analysis)
+            try:
+                openrouter_response = await get_provider_client().call_openrouter_api(prompt)
+                parsed = backend.parse_analysis_response(openrouter_response, complaint_text)
+                if parsed:
+                    await asyncio.to_thread(backend.cache_store, cache_key, openrouter_response)
+                    return parsed
+            except Exception as e:
+                logger.warning(f"⚠️ OpenRouter analysis failed, using fallback: {e}")
+
+        return local_analysis
+
+    except Exception as e:
+        logger.error(f"❌ RAG analysis error: {e}")
+        return backend.get_fallback_analysis(backend.normalize_complaint(complaint_text))
+
+
+async def generate_ai_response_async(complaint_text: str, category: str, priority: str, language: str = 'en') -> str:
+    """generate_ai_response with WatsonX and OpenRouter awaited instead of blocking"""
+    up_info = backend.get_up_government_info(category)
+    try:
+        client = get_provider_client()
+        watson_request, openrouter_prompt = backend.build_response_prompts(
+            complaint_text, category, priority, language, up_info)
+
+        # The shared tier (SQLite / Redis) and the encoder block, so cache calls leave the event loop
+        cache_keys = backend.response_cache_keys(watson_request, openrouter_prompt)
+        cached = await asyncio.to_thread(backend.cached_response, complaint_text, category, priority, language,
+                                         up_info, cache_keys)
+        if cached:
+            return cached
+        remember = backend.response_recorder(complaint_text, category, priority, language, up_info, cache_keys)
+
+        if config.HEDGING_ENABLED and config.WATSONX_API_KEY and config.OPENROUTER_API_KEY:
+            hedged = await generate_hedged_response_async(client, watson_request, openrouter_prompt)
+            if hedged:
+                provider, hedged_response = hedged
+                await asyncio.to_thread(remember, provider, hedged_response)
+                return hedged_response
+            return backend.get_category_fallback_response(category, priority, up_info)
+
+        if config.WATSONX_API_KEY:
+            try:
+                watson_response = await client.call_watsonx_streaming(watson_request)
+                await asyncio.to_thread(remember, 'watsonx', watson_response)
+                return watson_response
+            except Exception as e:
+                logger.warning(f"⚠️ WatsonX failed, using OpenRouter fallback: {e}")
+
+        if config.OPENROUTER_API_KEY:
+            try:
+                openrouter_response = await client.call_openrouter_api(openrouter_prompt)
+                logger.info('✅ OpenRouter fallback response generated')
+                cleaned_response = backend.clean_ai_response(openrouter_response)
+                await asyncio.to_thread(remember, 'openrouter', cleaned_response)
+                return cleaned_response
+            except Exception as e:
+                logger.warning(f"⚠️ OpenRouter fallback failed: {e}")
+
+        return backend.get_category_fallback_response(category, priority, up_info)
+
+    except Exception as e:
+        logger.error(f"❌ AI response generation error: {e}")
+        return backend.get_category_fallback_response(category, priority, up_info)
+
+
+async def stream_ai_response_async(complaint_text: str, category: str, priority: str,
+                                   language: str = 'en') -> AsyncIterator[Tuple[str, str]]:
+    """backend.stream_ai_response with the WatsonX stream and OpenRouter call awaited"""
+    up_info = backend.get_up_government_info(category)
+    streamed = False
+    try:
+        client = get_provider_client()
+        watson_request, openrouter_prompt = backend.build_response_prompts(
+            complaint_text, category, priority, language, up_info)
+        cache_keys = backend.response_cache_keys(watson_request, openrouter_prompt)
+        remember = backend.response_recorder(complaint_text, category, priority, language, up_info, cache_keys)
+        response = await asyncio.to_thread(backend.cached_response, complaint_text, category, priority, language,
+                                           up_info, cache_keys)
+
+        if not response and config.WATSONX_API_KEY:
+            cleaner = StreamingCleaner(backend.clean_ai_response)
+            deltas = client.stream_watsonx(watson_request)
+            try:
+                logger.info('🤖 Streaming WatsonX (async)...')
+                async for delta in deltas:
+                    piece = cleaner.feed(delta)
+                    if piece:
+                        streamed = True
+                        yield 'token', piece
+                piece = cleaner.finish()
+                if piece:
+                    streamed = True
+                    yield 'token', piece
+                response = cleaner.text
+                logger.info('✅ WatsonX response streamed')
+                await asyncio.to_thread(remember, 'watsonx', response)
+            except Exception as e:
+                logger.warning(f"⚠️ WatsonX stream failed, using OpenRouter fallback: {e}")
+            finally:
+                await deltas.aclose()
+
+        if not response and config.OPENROUTER_API_KEY:
+            try:
+                response = backend.clean_ai_response(await client.call_openrouter_api(openrouter_prompt))
+                logger.info('✅ OpenRouter fallback response generated')
+                await asyncio.to_thread(remember, 'openrouter', response)
+            except Exception as e:
+                logger.warning(f"⚠️ OpenRouter fallback failed: {e}")
+
+        if not response:
+            response = backend.get_category_fallback_response(category, priority, up_info)
+
+    except Exception as e:
+        logger.error(f"❌ AI response generation error: {e}")
+        response = backend.get_category_fallback_response(category, priority, up_info)
+
+    if not streamed:
+        yield 'token', response
+    yield 'done', response
+
+
+async def generate_hedged_response_async(client: AsyncProviderClient, watson_request: Dict[str, Any],
+                                        openrouter_prompt: str) -> Optional[Tuple[str, str]]:
+    """backend.generate_hedged_response as tasks; the losing provider call is cancelled outright"""
+    started = time.perf_counter()
+    first_token = asyncio.Event()
+
+    def on_first_token():
+        backend.hedge_policy.record_first_token((time.perf_counter() - started) * 1000)
+        first_token.set()
+
+    async def call_openrouter() -> str:
+        return backend.clean_ai_response(await client.call_openrouter_api(openrouter_prompt))
+
+    primary = asyncio.create_task(client.call_watsonx_streaming(watson_request, on_first_token))
+    progress = asyncio.create_task(first_token.wait())
+    await asyncio.wait({primary, progress}, timeout=backend.hedge_policy.delay_ms() / 1000,
+                       return_when=asyncio.FIRST_COMPLETED)
+    progress.cancel()
+
+    pending = {primary: PRIMARY}
+    hedged = not (first_token.is_set() or primary.done())
+    if hedged:
+        logger.info('🔀 WatsonX slow to first token, hedging with OpenRouter')
+        pending[asyncio.create_task(call_openrouter())] = SECONDARY
+
+    secondary_started = hedged
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                provider = pending.pop(task)
+                try:
+                    response = task.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ {'WatsonX' if provider == PRIMARY else 'OpenRouter'} failed: {e}")
+                    if not secondary_started:
+                        pending[asyncio.create_task(call_openrouter())] = SECONDARY
+                        secondary_started = True
+                    continue
+                backend.hedge_policy.record(hedged, provider)
+                return ('watsonx' if provider == PRIMARY else 'openrouter'), response
+    finally:
+        for task in pending:
+            task.cancel()
+
+    backend.hedge_policy.record(hedged)
+    return None
+
+
+async def analyze_and_respond_async(complaint_text: str, language: str = 'en') -> Tuple[Dict[str, Any], str]:
+    """backend.analyze_and_respond on the event loop; a wrong guess cancels its response task"""
+    if config.ONE_SHOT_ENABLED and config.OPENROUTER_API_KEY:
+        return await analyze_and_respond_one_shot_async(complaint_text, language)
+
+    speculation = {}
+
+    async def timed_response(guess: Dict[str, Any]) -> Tuple[str, float]:
+        started = time.perf_counter()
+        response = await generate_ai_response_async(complaint_text, guess['category'], guess['priority'], language)
+        return response, (time.perf_counter() - started) * 1000
+
+    def start_speculative_response(guess: Dict[str, Any]):
+        if backend.acquire_speculation_slot():
+            speculation['guess'] = guess
+            speculation['task'] = asyncio.create_task(timed_response(guess))
+            speculation['task'].add_done_callback(lambda _: backend.speculation_slots.release())
+
+    started = time.perf_counter()
+    try:
+        analysis = await analyze_complaint_async(complaint_text, language, on_local_guess=start_speculative_response)
+    except BaseException:
+        if speculation:
+            speculation['task'].cancel()
+        raise
+    if not speculation:
+        return analysis, await generate_ai_response_async(
+            complaint_text, analysis['category'], analysis['priority'], language)
+
+    analysis_ms = (time.perf_counter() - started) * 1000
+    if backend.speculation_matches(speculation['guess'], analysis):
+        ai_response, response_ms = await speculation['task']
+        backend.record_speculation(speculation['guess'], analysis, started, analysis_ms, response_ms)
+        return analysis, ai_response
+
+    speculation['task'].cancel()
+    ai_response, response_ms = await timed_response(analysis)
+    backend.record_speculation(speculation['guess'], analysis, started, analysis_ms, response_ms)
+    return analysis, ai_response
+
+
+async def analyze_and_respond_one_shot_async(complaint_text: str, language: str = 'en') -> Tuple[Dict[str, Any], str]:
+    """backend.analyze_and_respond_one_shot with the OpenRouter call awaited"""
+    local_analysis, decisive = await asyncio.to_thread(backend.local_tier_analysis, complaint_text)
+    if decisive:
+        return local_analysis, await generate_ai_response_async(
+            complaint_text, local_analysis['category'], local_analysis['priority'], language)
+
+    prompt = backend.build_one_shot_prompt(complaint_text, language)
+    cache_key = backend.one_shot_cache_key(prompt)
+    answer = await asyncio.to_thread(backend.cache_lookup, cache_key)
+    from_cache = bool(answer)
+    if not answer:
+        try:
+            answer = await get_provider_client().call_openrouter_api(prompt, max_tokens=config.ONE_SHOT_MAX_TOKENS)
+        except Exception as e:
+            logger.warning(f"⚠️ One-shot call failed, using fallback: {e}")
+
+    analysis, ai_response = await asyncio.to_thread(
+        backend.one_shot_result, answer, from_cache, complaint_text, local_analysis, cache_key)
+    if ai_response is None:
+        ai_response = await generate_ai_response_async(complaint_text, analysis['category'], analysis['priority'],
+                                                       language)
+    return analysis, ai_response
+
+
+async def ai_chat(data: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    message = data.get('message')
+    language = data.get('language', 'en')
+    if not message:
+        return 400, {'error': 'Message is required'}
+
+    logger.info(f'💬 Samadhan AI processing (async): {message[:50]}...')
+    analysis, ai_response = await analyze_and_respond_async(message, language)
+    logger.info('✅ Samadhan AI response ready')
+    return 200, {
+        'response': ai_response,
+        'analysis': analysis,
+        'timestamp': datetime.now().isoformat(),
+        'language': language,
+        'system': 'samadhan_ai_comprehensive'
+    }
+
+
+async def ai_analyze(data: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    complaint_text = data.get('complaint')
+    language = data.get('language', 'en')
+    if not complaint_text:
+        return 400, {'error': 'Complaint text is required'}
+
+    logger.info(f'🔍 Samadhan AI analyzing (async): {complaint_text[:50]}...')
+    analysis, ai_response = await analyze_and_respond_async(complaint_text, language)
+    analysis['ai_response'] = ai_response
+    analysis['timestamp'] = datetime.now().isoformat()
+    analysis['system'] = 'samadhan_ai_comprehensive'
+    logger.info('✅ Samadhan AI analysis complete')
+    return 200, analysis
+
+
+async def chat_stream_events(message: str, language: str) -> AsyncIterator[str]:
+    """The server-sent events of backend.ai_chat_stream"""
+    try:
+        analysis = await analyze_complaint_async(message, language)
+        yield sse_event('analysis', analysis, backend.app.json.dumps)
+
+        async for kind, text in stream_ai_response_async(message, analysis['category'], analysis['priority'],
+                                                          language):
+            if kind == 'token':
+                yield sse_event('token', {'text': text})
+            else:
+                yield sse_event('done', {
+                    'response': text,
+                    'timestamp': datetime.now().isoformat(),
+                    'language': language,
+                    'system': 'samadhan_ai_comprehensive'
+                })
+        logger.info('✅ Samadhan AI response streamed')
+    except Exception as e:
+        logger.error(f'❌ Samadhan AI error: {e}')
+        yield sse_event('error', {
+            'error': str(e),
+            'response': f'I apologize for the error. Please contact CM Helpline {backend.get_helpline_number("cm_helpline")} for immediate assistance.',
+            'timestamp': datetime.now().isoformat()
+        })
+
+
+async def ai_chat_stream(scope, send, data: Dict[str, Any]):
+    message = data.get('message')
+    language = data.get('language', 'en')
+    if not message:
+        return await send_json(send, scope, 400, {'error': 'Message is required'})
+
+    logger.info(f'💬 Samadhan AI streaming (async): {message[:50]}...')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream; charset=utf-8')]
+                   + [(name.lower().encode(), value.encode()) for name, value in SSE_HEADERS.items()]
+                   + cors_headers(scope)
+    })
+    events = chat_stream_events(message, language)
+    try:
+        async for event in events:
+            await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+    finally:
+        await events.aclose()
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+ASYNC_ROUTES = {
+    ('POST', '/api/ai/chat'): ai_chat,
+    ('POST', '/api/ai/analyze'): ai_analyze
+}
+
+# Handlers that send their own (streamed) response
+STREAMING_ROUTES = {
+    ('POST', '/api/ai/chat/stream'): ai_chat_stream
+}
+
+
+async def read_body(receive) -> bytes:
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+def cors_headers(scope) -> List[Tuple[bytes, bytes]]:
+    """Same CORS policy as the Flask app for the natively served routes"""
+    origin = dict(scope.get('headers', [])).get(b'origin', b'').decode('latin-1')
+    if origin in backend.CORS_ORIGINS:
+        return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    return []
+
+
+async def send_json(send, scope, status: int, payload: Dict[str, Any]):
+    body = backend.app.json.dumps(payload).encode('utf-8') + b'\n'
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+                   + cors_headers(scope)
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    global provider_client
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Off the loop: WARMUP_MODE=sync loads the models before startup completes
+            await asyncio.to_thread(backend.start_warmup)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if provider_client is not None:
+                await provider_client.aclose()
+                provider_client = None
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    route = (scope.get('method'), scope.get('path')) if scope['type'] == 'http' else None
+    handler = ASYNC_ROUTES.get(route)
+    stream_handler = STREAMING_ROUTES.get(route)
+    if handler is None and stream_handler is None:
+        return await flask_application(scope, receive, send)
+
+    try:
+        data = json.loads(await read_body(receive) or b'null')
+        if not isinstance(data, dict):
+            raise ValueError('JSON object expected')
+    except ValueError as e:
+        return await send_json(send, scope, 400, {'error': f'Invalid JSON body: {e}'})
+
+    if stream_handler is not None:
+        return await stream_handler(scope, send, data)
+
+    try:
+        status, payload = await handler(data)
+    except Exception as e:
+        logger.error(f'❌ Samadhan AI error: {e}')
+        status, payload = 500, {
+            'error': str(e),
+            'response': f'I apologize for the error. Please contact CM Helpline {backend.get_helpline_number("cm_helpline")} for immediate assistance.',
+            'timestamp': datetime.now().isoformat()
+        }
+    await send_json(send, scope, status, payload)
@@ -0,0 +1,236 @@
+"""
+Async Provider Clients for Samadhan AI
+=====================================
+
+asyncio counterparts of get_ibm_cloud_token, call_watsonx_streaming and
+call_openrouter_api, built on httpx.AsyncClient. The sync versions hold a
+worker thread for the whole upstream call (up to 60 s for WatsonX); these
+hold only a coroutine, so one event loop can keep hundreds of LLM calls in
+flight. Used by the async serving mode (asgi.py).
+
+Calls go through the same per-provider CircuitBreakers as the sync path
+(fail fast while open, adaptive timeouts) and the same retry policy for
+transient errors.
+
+Each provider gets its own keep-alive connection pool, split across several
+small AsyncClients: httpcore rescans every pooled connection whenever a
+request starts or finishes, so one 200-connection pool costs ~10 ms of CPU
+per call under load, against ~2 ms for twenty 10-connection shards. Calls go
+to the shard with the fewest in flight.
+The IAM token cache is shared with the sync path, and concurrent refreshes
+in one event loop coalesce into a single IAM request. Given refresh_token
+(asgi.py passes the worker's IAMTokenManager), a refresh goes through it in
+a thread, so the token is also shared with the other workers.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+from circuit_breaker import CircuitBreaker, ProviderError, provider_retry
+from sse_parser import SSEDeltaParser
+
+logger = logging.getLogger(__name__)
+
+IAM_TOKEN_URL = 'https://iam.cloud.ibm.com/identity/token'
+OPENROUTER_CHAT_URL = 'https://openrouter.ai/api/v1/chat/completions'
+DEFAULT_OPENROUTER_MODEL = 'deepseek/deepseek-r1-0528-qwen3-8b:free'
+POOL_SHARD_SIZE = 10
+PROVIDER_TIMEOUTS = (('iam', 30.0), ('watsonx', 60.0), ('openrouter', 30.0))
+
+# Nothing reached the provider, so the call is safe to repeat
+CONNECTION_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class AsyncProviderClient:
+    """WatsonX (IAM-authenticated, streaming) and OpenRouter calls as coroutines"""
+
+    def __init__(self, watsonx_api_key: Optional[str], watsonx_url: Optional[str],
+                 openrouter_api_key: Optional[str], referer: str, token_cache: Dict[str, Any],
+                 openrouter_url: str = OPENROUTER_CHAT_URL, max_connections: int = 200,
+                 max_keepalive_connections: int = 20,
+                 clean_response: Callable[[str], str] = str.strip,
+                 breakers: Optional[Dict[str, CircuitBreaker]] = None, retry_attempts: int = 1,
+                 refresh_token: Optional[Callable[[], str]] = None):
+        self.watsonx_api_key = watsonx_api_key
+        self.watsonx_url = watsonx_url
+        self.openrouter_api_key = openrouter_api_key
+        self.openrouter_url = openrouter_url
+        self.referer = referer
+        self.token_cache = token_cache
+        self.refresh_token = refresh_token  # blocking refresh through the worker's IAMTokenManager, if any
+        self.clean_response = clean_response
+        self.breakers = breakers or {
+            provider: CircuitBreaker(provider, max_timeout=timeout) for provider, timeout in PROVIDER_TIMEOUTS
+        }
+        shards = max(1, math.ceil(max_connections / POOL_SHARD_SIZE))
+        limits = httpx.Limits(max_connections=math.ceil(max_connections / shards),
+                              max_keepalive_connections=math.ceil(max_keepalive_connections / shards))
+        # One SSL context for every shard (building one per client costs ~25 ms each)
+        ssl_context = httpx.create_ssl_context()
+        self.clients: Dict[str, List[httpx.AsyncClient]] = {
+            provider: [httpx.AsyncClient(limits=limits, timeout=timeout, verify=ssl_context) for _ in range(shards)]
+            for provider, timeout in PROVIDER_TIMEOUTS
+        }
+        self._in_flight = {provider: [0] * shards for provider in self.clients}
+        self._token_lock: Optional[asyncio.Lock] = None
+
+        retry_transient = provider_retry(retry_attempts, CONNECTION_ERRORS)
+        if refresh_token is None:  # refresh_token retries on its own
+            self.get_ibm_cloud_token = retry_transient(self.get_ibm_cloud_token)
+        self.call_watsonx_streaming = retry_transient(self.call_watsonx_streaming)
+        self.call_openrouter_api = retry_transient(self.call_openrouter_api)
+
+    @asynccontextmanager
+    async def _client(self, provider: str) -> AsyncIterator[httpx.AsyncClient]:
+        """Least-busy pool shard for provider, held for the duration of the call"""
+        in_flight = self._in_flight[provider]
+        shard = in_flight.index(min(in_flight))
+        in_flight[shard] += 1
+        try:
+            yield self.clients[provider][shard]
+        finally:
+            in_flight[shard] -= 1
+
+    async def get_ibm_cloud_token(self) -> str:
+        """Get IBM Cloud IAM token with caching (one refresh at a time)"""
+        if self.token_cache['token'] and time.time() < self.token_cache['expiry']:
+            return self.token_cache['token']
+        if not self.watsonx_api_key:
+            raise Exception("WatsonX API key not configured in environment variables")
+
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            # Another coroutine may have refreshed it while we waited
+            if self.token_cache['token'] and time.time() < self.token_cache['expiry']:
+                return self.token_cache['token']
+            if self.refresh_token is not None:
+                # Shared with the sync path and, through the token file, with the other workers
+                return await asyncio.to_thread(self.refresh_token)
+
+            logger.info('🔄 Getting IBM Cloud token (async)...')
+            breaker = self.breakers['iam']
+            with breaker.guard():
+                async with self._client('iam') as client:
+                    response = await client.post(
+                        IAM_TOKEN_URL,
+                        headers={
+                            'Content-Type': 'application/x-www-form-urlencoded',
+                            'Accept': 'application/json',
+                        },
+                        content=f'grant_type=urn:ibm:params:oauth:grant-type:apikey&apikey={self.watsonx_api_key}',
+                        timeout=breaker.timeout()
+                    )
+                if response.status_code != 200:
+                    logger.error(f'❌ IBM Cloud error: {response.status_code}')
+                    raise ProviderError(f'IBM Cloud authentication failed: {response.status_code}', response.status_code)
+
+                token_data = response.json()
+            if not token_data.get('access_token'):
+                raise Exception('Failed to obtain access token')
+
+            # Cache the token (expire 5 minutes before actual expiry)
+            self.token_cache['token'] = token_data['access_token']
+            self.token_cache['expiry'] = time.time() + (token_data.get('expires_in', 3600) - 300)
+            logger.info('✅ IBM Cloud token obtained')
+            return token_data['access_token']
+
+    async def stream_watsonx(self, request_body: dict) -> AsyncIterator[str]:
+        """WatsonX content deltas as they are generated (aclose() early closes the upstream stream)"""
+        if not self.watsonx_api_key:
+            raise Exception("WatsonX API key not configured")
+        if not self.watsonx_url:
+            raise Exception("WatsonX URL not configured")
+
+        access_token = await self.get_ibm_cloud_token()
+
+        breaker = self.breakers['watsonx']
+        with breaker.guard() as call:
+            async with self._client('watsonx') as client, client.stream(
+                'POST',
+                self.watsonx_url,
+                headers={
+                    'Authorization': f'Bearer {access_token}',
+                    'Accept': 'text/event-stream',
+                    'Content-Type': 'application/json',
+                },
+                json=request_body,
+                timeout=breaker.timeout()
+            ) as response:
+                call.first_byte()
+                if response.status_code != 200:
+                    logger.error(f'❌ WatsonX error: {response.status_code}')
+                    raise ProviderError(f'WatsonX API error: {response.status_code}', response.status_code)
+                produced = False
+                parser = SSEDeltaParser()
+                async for chunk in response.aiter_bytes():
+                    for content in parser.feed(chunk):
+                        produced = produced or bool(content.strip())
+                        yield content
+                    if parser.done:
+                        break
+                for content in parser.close():
+                    produced = produced or bool(content.strip())
+                    yield content
+            if not produced:
+                raise ProviderError('No response from WatsonX')
+
+    async def call_watsonx_streaming(self, request_body: dict,
+                                     on_first_token: Optional[Callable[[], None]] = None) -> str:
+        """Call WatsonX streaming API and join the streamed deltas (on_first_token: first delta arrived)"""
+        logger.info('🤖 Calling WatsonX (async)...')
+        parts = []
+        deltas = self.stream_watsonx(request_body)
+        try:
+            async for content in deltas:
+                if on_first_token and not parts:
+                    on_first_token()
+                parts.append(content)
+        finally:
+            await deltas.aclose()
+        logger.info('✅ WatsonX response generated')
+        return self.clean_response(''.join(parts))
+
+    async def call_openrouter_api(self, prompt: str, model: str = DEFAULT_OPENROUTER_MODEL, max_tokens: int = 500) -> str:
+        """Call OpenRouter API with DeepSeek model (fallback when WatsonX fails)"""
+        if not self.openrouter_api_key:
+            raise Exception("OpenRouter API key not configured")
+
+        logger.info('🤖 Using OpenRouter DeepSeek (async)...')
+        breaker = self.breakers['openrouter']
+        with breaker.guard():
+            async with self._client('openrouter') as client:
+                response = await client.post(
+                    self.openrouter_url,
+                    headers={
+                        "Authorization": f"Bearer {self.openrouter_api_key}",
+                        "Content-Type": "application/json",
+                        "HTTP-Referer": self.referer,
+                        "X-Title": "Samadhan AI"
+                    },
+                    json={
+                        "model": model,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": max_tokens,
+                        "temperature": 0.7
+                    },
+                    timeout=breaker.timeout()
+                )
+            if response.status_code != 200:
+                logger.error(f'❌ OpenRouter error: {response.status_code}')
+                raise ProviderError(f'OpenRouter API error: {response.status_code}', response.status_code)
+
+            content = response.json()['choices'][0]['message']['content']
+        logger.info('✅ OpenRouter response generated')
+        return content
+
+    async def aclose(self):
+        for shards in self.clients.values():
+            for client in shards:
+                await client.aclose()
@@ -0,0 +1,6 @@
+"""
+Samadhan AI performance benchmarks
+==================================
+
+Run from flask-backend/, e.g. `python -m benchmarks.ann_benchmark`.
+"""
@@ -0,0 +1,91 @@
+"""
+Recall vs latency benchmark: ANN backends against exact search
+=============================================================
+
+Usage (from flask-backend/):
+    python -m benchmarks.ann_benchmark --n 1000000 --dim 384
+    python -m benchmarks.ann_benchmark --vectors vectors.npy --backends numpy-ivf faiss-hnsw
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ann_index import ExactIndex, FAISS_AVAILABLE, build_index, configure_search
+from embedding_store import normalize_rows
+
+
+def synthetic_corpus(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors, roughly the shape of sentence embeddings of complaints"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100000):
+        end = min(n, start + 100000)
+        vectors[start:end] = centers[labels[start:end]] + 0.6 * rng.standard_normal((end - start, dim)).astype(np.float32)
+    return normalize_rows(vectors)
+
+
+def timed_search(index, queries: np.ndarray, k: int):
+    """Search one query at a time (as requests do); return ids and per-query latencies in ms"""
+    ids = np.empty((queries.shape[0], k), dtype=np.int64)
+    latencies = np.empty(queries.shape[0])
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        ids[i] = index.search(query[None, :], k)[0][0]
+        latencies[i] = (time.perf_counter() - started) * 1000
+    return ids, latencies
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vectors', help='Benchmark on a real .npy embedding matrix')
+    parser.add_argument('--n', type=int, default=200000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--backends', nargs='+',
+                        default=['numpy-ivf', 'faiss-ivf', 'faiss-hnsw'] if FAISS_AVAILABLE else ['numpy-ivf'])
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument('--ef-search', type=int, nargs='+', default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    if args.vectors:
+        corpus = normalize_rows(np.load(args.vectors, mmap_mode='r'))
+    else:
+        corpus = synthetic_corpus(args.n, args.dim, args.clusters)
+    rng = np.random.default_rng(1)
+    # Queries are perturbed corpus points, like reworded repeats of past complaints
+    noise = 0.05 * rng.standard_normal((args.queries, corpus.shape[1])).astype(np.float32)
+    queries = normalize_rows(corpus[np.sort(rng.choice(corpus.shape[0], args.queries, replace=False))] + noise)
+    print(f'Corpus: {corpus.shape[0]} x {corpus.shape[1]}, {args.queries} queries, k={args.k}')
+
+    truth, exact_ms = timed_search(ExactIndex(corpus), queries, args.k)
+    print(f"\n{'backend':<12}{'param':<14}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'build s':>10}")
+    print(f"{'exact':<12}{'-':<14}{1.0:>10.3f}{np.percentile(exact_ms, 50):>10.2f}{np.percentile(exact_ms, 99):>10.2f}{'-':>10}")
+
+    for backend in args.backends:
+        started = time.perf_counter()
+        index = build_index(corpus, backend)
+        build_s = time.perf_counter() - started
+        if index.backend == 'faiss-hnsw':
+            sweep = [('efSearch', value, {'ef_search': value}) for value in args.ef_search]
+        else:
+            sweep = [('nprobe', value, {'nprobe': value}) for value in args.nprobe]
+        for name, value, knobs in sweep:
+            configure_search(index, **knobs)
+            found, ms = timed_search(index, queries, args.k)
+            print(f"{index.backend:<12}{f'{name}={value}':<14}{recall_at_k(found, truth):>10.3f}"
+                  f"{np.percentile(ms, 50):>10.2f}{np.percentile(ms, 99):>10.2f}{build_s:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
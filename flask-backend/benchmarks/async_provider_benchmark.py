@@ -0,0 +1,119 @@
+"""
+Provider calls in flight: worker threads vs one asyncio event loop
+=================================================================
+
+A local OpenRouter stand-in answers every chat completion after
+`--latency-ms` (LLM calls take seconds, not milliseconds). The same burst of
+`--calls` concurrent calls is then served two ways:
+
+  threads  the sync path: call_openrouter_api over a pooled requests.Session
+           in a pool of `--threads` threads (gthread: workers x threads)
+  asyncio  AsyncProviderClient.call_openrouter_api, all calls awaited on one
+           event loop (one uvicorn worker)
+
+With blocking calls, in-flight concurrency is capped by the thread count;
+with coroutines it is capped only by the connection limit.
+
+Usage (from flask-backend/):
+    python -m benchmarks.async_provider_benchmark --latency-ms 1000 --calls 200
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from async_providers import AsyncProviderClient
+from http_sessions import ProviderSessions
+
+
+RESPONSE_BODY = json.dumps({'choices': [{'message': {'content': 'Complaint registered.'}}]}).encode()
+
+
+async def serve_slow_provider(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float):
+    """Minimal keep-alive HTTP/1.1 chat-completions stand-in (asyncio, so it never limits the burst)"""
+    try:
+        while True:
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in head.split(b'\r\n'):
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            await asyncio.sleep(latency)
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                         b'Content-Length: %d\r\n\r\n%s' % (len(RESPONSE_BODY), RESPONSE_BODY))
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+
+
+def start_stand_in(latency: float) -> int:
+    """Run the stand-in on its own event loop thread; returns its port"""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(
+        lambda reader, writer: serve_slow_provider(reader, writer, latency), '127.0.0.1', 0, backlog=1024))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def report(name: str, latencies, elapsed: float, calls: int):
+    print(f'{name:<9}{elapsed:>9.2f}{calls / elapsed:>10.1f}{np.percentile(latencies, 50):>9.0f}'
+          f'{np.percentile(latencies, 99):>9.0f}')
+
+
+def run_threads(url: str, calls: int, threads: int):
+    session = ProviderSessions(pool_maxsize=threads).get('openrouter')
+    payload = {'model': 'stand-in', 'messages': [{'role': 'user', 'content': 'Street lights not working'}]}
+
+    def call(_):
+        session.post(url, json=payload, timeout=30).json()
+        return time.perf_counter()
+
+    # Latency is measured from the burst's arrival, as a queued request sees it
+    burst = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        finished = list(pool.map(call, range(calls)))
+    return [(t - burst) * 1000 for t in finished], time.perf_counter() - burst
+
+
+async def run_asyncio(url: str, calls: int, max_connections: int):
+    client = AsyncProviderClient(None, None, 'stand-in-key', 'http://localhost', {'token': None, 'expiry': 0},
+                                 openrouter_url=url, max_connections=max_connections,
+                                 max_keepalive_connections=max_connections)
+
+    async def call():
+        await client.call_openrouter_api('Street lights not working')
+        return time.perf_counter()
+
+    burst = time.perf_counter()
+    finished = await asyncio.gather(*(call() for _ in range(calls)))
+    elapsed = time.perf_counter() - burst
+    await client.aclose()
+    return [(t - burst) * 1000 for t in finished], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=1000.0, help='Simulated LLM response time')
+    parser.add_argument('--calls', type=int, default=200, help='Concurrent calls in the burst')
+    parser.add_argument('--threads', type=int, default=16, help='Sync worker threads (gunicorn default 4 x 4)')
+    parser.add_argument('--max-connections', type=int, default=200, help='AsyncClient connection limit')
+    args = parser.parse_args()
+
+    url = f'http://127.0.0.1:{start_stand_in(args.latency_ms / 1000)}/api/v1/chat/completions'
+
+    print(f'{args.calls} concurrent calls, {args.latency_ms:.0f} ms provider latency')
+    print(f"\n{'mode':<9}{'total s':>9}{'calls/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    latencies, elapsed = run_threads(url, args.calls, args.threads)
+    report('threads', latencies, elapsed, args.calls)
+    latencies, elapsed = asyncio.run(run_asyncio(url, args.calls, args.max_connections))
+    report('asyncio', latencies, elapsed, args.calls)
+
+
+if __name__ == '__main__':
+    main()
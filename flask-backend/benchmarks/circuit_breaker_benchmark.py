@@ -0,0 +1,196 @@
+"""
+Provider outage: static timeouts vs circuit breaker with adaptive timeouts
+=========================================================================
+
+A local OpenRouter stand-in answers in `--latency-ms`, then goes through an
+outage (every call hangs `--hang-s` and returns 503), then recovers.
+`--concurrency` callers send a request every `--interval-ms` through
+generate_ai_response (OpenRouter, then the local category response) under
+two configurations:
+
+  static   the old behaviour: 30 s timeout, breaker never opens
+  breaker  adaptive timeout (p99 x 3, min `--min-timeout`), opens at 50%
+           failures over the last 10+ calls, background probe every
+           `--open-seconds`
+
+Per phase: how many requests OpenRouter answered, how many got the local
+fallback, and request latency percentiles.
+
+A final check opens a standalone breaker, sends it no traffic and makes
+its probe healthy: the probe alone must close it within a few
+`--open-seconds` (exit status 1 otherwise).
+
+Usage (from flask-backend/):
+    python -m benchmarks.circuit_breaker_benchmark --healthy-s 5 --outage-s 15 --recovery-s 10
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+PROVIDER_ANSWER = 'Complaint registered.'
+
+
+class OutageStandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    hang = 0.0
+    outage = False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.outage:
+            time.sleep(self.hang)
+            status, body = 503, b'{"error": "overloaded"}'
+        else:
+            time.sleep(self.latency)
+            status, body = 200, json.dumps({'choices': [{'message': {'content': PROVIDER_ANSWER}}]}).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # the caller timed out and hung up
+
+    def log_message(self, *args):
+        pass
+
+
+def run_timeline(app, args, phases):
+    """Callers issue requests until the timeline ends; returns (phase, served_by_provider, latency_ms)"""
+    results = []
+    lock = threading.Lock()
+    started = time.monotonic()
+    end = started + sum(duration for _, duration in phases)
+
+    def phase_at(t: float) -> str:
+        for name, duration in phases:
+            if t < duration:
+                return name
+            t -= duration
+        return phases[-1][0]
+
+    def caller():
+        while time.monotonic() < end:
+            issued = time.monotonic()
+            response = app.generate_ai_response('Street lights not working in Lucknow', 'Public Works', 'medium')
+            with lock:
+                results.append((phase_at(issued - started), response == PROVIDER_ANSWER,
+                                (time.monotonic() - issued) * 1000))
+            time.sleep(args.interval_ms / 1000)
+
+    def conductor():
+        for name, duration in phases:
+            OutageStandIn.outage = name == 'outage'
+            time.sleep(duration)
+
+    threads = [threading.Thread(target=caller) for _ in range(args.concurrency)] + [threading.Thread(target=conductor)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def probe_recovery_check(open_seconds: float) -> bool:
+    """Open a breaker, then let only its background probe (failing, then healthy) bring it back"""
+    from circuit_breaker import CircuitBreaker, ProviderError
+
+    healthy = threading.Event()
+    probes = []
+
+    def probe():
+        probes.append(time.monotonic())
+        with breaker.guard():
+            if not healthy.is_set():
+                raise ProviderError('probe stand-in down', 503)
+
+    breaker = CircuitBreaker('probe-check', max_timeout=1.0, min_calls=2, open_seconds=open_seconds, probe=probe)
+    for _ in range(2):
+        try:
+            with breaker.guard():
+                raise ProviderError('stand-in down', 503)
+        except ProviderError:
+            pass
+    time.sleep(open_seconds * 1.5)  # at least one failing probe re-opens it
+    failing_probes = len(probes)
+    healthy.set()
+    started = time.monotonic()
+    while breaker.state != 'closed' and time.monotonic() - started < open_seconds * 3 + 2:
+        time.sleep(0.05)
+    closed = breaker.state == 'closed'
+    print(f"probe-only recovery: {failing_probes} failing probe(s), then "
+          + (f'closed {time.monotonic() - started:.1f}s after the provider recovered' if closed
+             else f"still {breaker.state} after {time.monotonic() - started:.1f}s") + f' ({len(probes)} probes)')
+    return closed and failing_probes > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--hang-s', type=float, default=10.0, help='How long each call hangs during the outage')
+    parser.add_argument('--healthy-s', type=float, default=5.0)
+    parser.add_argument('--outage-s', type=float, default=15.0)
+    parser.add_argument('--recovery-s', type=float, default=10.0)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--interval-ms', type=float, default=100.0, help='Pause between a caller\'s requests')
+    parser.add_argument('--min-timeout', type=float, default=1.0)
+    parser.add_argument('--open-seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    OutageStandIn.latency = args.latency_ms / 1000
+    OutageStandIn.hang = args.hang_s
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OutageStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.update({
+        'OPENROUTER_API_KEY': 'stand-in',
+        'OPENROUTER_API_URL': f'http://127.0.0.1:{server.server_address[1]}/api/v1/chat/completions',
+        'WARMUP_MODE': 'off', 'LLM_CACHE_ENABLED': 'false'  # every request repeats the same prompt
+    })
+    import logging
+    import app
+    logging.disable(logging.ERROR)
+    app.config.WATSONX_API_KEY = None
+
+    phases = [('healthy', args.healthy_s), ('outage', args.outage_s), ('recovery', args.recovery_s)]
+    print(f'OpenRouter stand-in {args.latency_ms:.0f} ms; outage calls hang {args.hang_s:.0f} s then 503; '
+          f'{args.concurrency} callers; phases ' + ', '.join(f'{name} {duration:.0f}s' for name, duration in phases))
+    print(f"\n{'mode':<9}{'phase':<10}{'provider':>9}{'fallback':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for mode in ('static', 'breaker'):
+        if mode == 'static':
+            app.config.BREAKER_FAILURE_RATE = 2.0  # never opens
+            app.config.ADAPTIVE_TIMEOUT_MIN_SECONDS = 30.0  # timeout pinned at the old 30 s
+        else:
+            app.config.BREAKER_FAILURE_RATE = 0.5
+            app.config.ADAPTIVE_TIMEOUT_MIN_SECONDS = args.min_timeout
+            app.config.BREAKER_OPEN_SECONDS = args.open_seconds
+        app.provider_breakers['openrouter'] = app.create_provider_breaker(
+            'openrouter', 30, lambda: app.call_openrouter_api('ping', max_tokens=1))
+
+        results = run_timeline(app, args, phases)
+        for name, _ in phases:
+            rows = [(served, latency) for phase, served, latency in results if phase == name]
+            if rows:
+                latencies = [latency for _, latency in rows]
+                served = sum(served for served, _ in rows)
+                print(f'{mode:<9}{name:<10}{served:>9}{len(rows) - served:>9}{np.percentile(latencies, 50):>9.0f}'
+                      f'{np.percentile(latencies, 99):>9.0f}{max(latencies):>9.0f}')
+        breaker = app.provider_breakers['openrouter'].stats()
+        print(f"{'':<9}breaker: state {breaker['state']}, opened {breaker['times_opened']}x, "
+              f"rejected {breaker['rejected']}, timeout {breaker['timeout_seconds']} s\n")
+    server.shutdown()
+    if not probe_recovery_check(args.open_seconds):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
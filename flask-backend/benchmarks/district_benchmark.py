@@ -0,0 +1,85 @@
+"""
+District extraction: gazetteer coverage, false positives and latency
+===================================================================
+
+Recall: every district name, alias, Hindi spelling and code placed in a few
+complaint templates must resolve to its all_districts entry (codes, Banda
+and Basti next to a district cue).
+False positives: the dataset's complaint patterns, Hindi complaints that
+use "basti" / "banda" as ordinary words and uppercase words that are also
+district codes (AUR, DOR, ETH) must resolve to no district.
+Latency: one extract() call per complaint.
+
+Usage (from flask-backend/):
+    python -m benchmarks.district_benchmark
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from district_extractor import AMBIGUOUS_DISTRICTS, DISTRICT_ALIASES, DistrictExtractor
+from samadhan_dataset import COMPLAINT_PATTERNS
+
+TEMPLATES = [
+    'Street lights not working near the bus stand in {} for two weeks',
+    '{} me paani nahi aa raha hai',
+    'Garbage not collected in our colony, {}.',
+    'Hospital में डॉक्टर नहीं हैं, {} जिला'
+]
+
+ORDINARY_WORDS = [
+    'hamari basti me kachra nahi uthaya gaya',
+    'ek banda roz raat ko shor karta hai',
+    'बस्ती में नाली बंद है',
+    'AUR BHI PROBLEM HAI, SADAK TOOTI HAI',
+    'Bijli nahi hai AUR paani bhi nahi aa raha',
+    'DOR to DOR garbage collection band hai',
+    'ETH wallet scam, please register my cyber complaint'
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    extractor = DistrictExtractor.from_dataset()
+    print(f'Extractor build: {(time.perf_counter() - started) * 1000:.1f} ms, '
+          f'{len(extractor.all_districts)} districts, {len(extractor.automaton.labels)} spellings, '
+          f'{len(extractor.codes)} codes')
+
+    cases = []
+    for district, info in extractor.all_districts.items():
+        spellings = [district] + DISTRICT_ALIASES.get(district, [])
+        if district in AMBIGUOUS_DISTRICTS:
+            spellings = [f'{spelling} district' for spelling in spellings]
+        spellings += [f"{info['code']} district", f"dist. {info['code']}"]
+        cases += [(template.format(spelling), district) for spelling in spellings for template in TEMPLATES]
+    misses = [(text, expected, extractor.extract(text)) for text, expected in cases]
+    misses = [row for row in misses if row[1] != row[2]]
+    print(f'\nrecall {len(cases) - len(misses)}/{len(cases)} spellings x templates')
+    for text, expected, found in misses[:10]:
+        print(f'  miss {expected!r} got {found!r}: {text}')
+
+    patterns = [text for texts in COMPLAINT_PATTERNS.values() for text in texts]
+    false_positives = [(text, extractor.extract(text)) for text in patterns + ORDINARY_WORDS]
+    false_positives = [row for row in false_positives if row[1]]
+    print(f'false positives {len(false_positives)}/{len(patterns) + len(ORDINARY_WORDS)}')
+    for text, found in false_positives[:10]:
+        print(f'  {found!r}: {text}')
+
+    texts = [text for text, _ in cases] + patterns
+    latencies = []
+    for _ in range(args.repeat):
+        for text in texts:
+            started = time.perf_counter()
+            extractor.extract(text)
+            latencies.append((time.perf_counter() - started) * 1e6)
+    print(f'\nextract  p50 {np.percentile(latencies, 50):.1f} us  p99 {np.percentile(latencies, 99):.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Throughput and tail latency of direct encode() vs MicroBatcher
+=============================================================
+
+Each client thread encodes one complaint per call, like /api/ai/chat does.
+
+Usage (from flask-backend/):
+    python -m benchmarks.encode_batching_benchmark --clients 1 8 32
+    python -m benchmarks.encode_batching_benchmark --synthetic   # no torch needed: fixed + per-item cost model
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from micro_batcher import MicroBatcher
+from samadhan_dataset import COMPLAINT_PATTERNS
+
+
+class SyntheticEncoder:
+    """Cost model of a CPU transformer: per-call overhead plus per-item work, serialized like the GIL-bound model"""
+
+    def __init__(self, call_ms: float, item_ms: float, dim: int = 384):
+        self.call_ms = call_ms
+        self.item_ms = item_ms
+        self.dim = dim
+        self._lock = threading.Lock()
+
+    def encode(self, texts, **kwargs):
+        with self._lock:
+            time.sleep((self.call_ms + self.item_ms * len(texts)) / 1000.0)
+        return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+
+def run_clients(encoder, texts, clients: int, requests_per_client: int):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(seed):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            encoder.encode([rng.choice(texts)])
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--synthetic', action='store_true', help='Use a cost-model encoder instead of sentence-transformers')
+    parser.add_argument('--call-ms', type=float, default=6.0, help='Synthetic per-call overhead')
+    parser.add_argument('--item-ms', type=float, default=0.8, help='Synthetic per-sentence cost')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=50, help='Requests per client')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        model = SyntheticEncoder(args.call_ms, args.item_ms)
+        print(f'Encoder: synthetic ({args.call_ms} ms/call + {args.item_ms} ms/item)')
+    else:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(args.model)
+        model.encode(['warm up'])
+        print(f'Encoder: {args.model}')
+
+    texts = [text for patterns in COMPLAINT_PATTERNS.values() for text in patterns]
+    batcher = MicroBatcher(model, args.max_batch_size, args.max_wait_ms)
+
+    print(f"\n{'clients':>8}  {'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for clients in args.clients:
+        for mode, encoder in (('direct', model), ('batched', batcher)):
+            throughput, p50, p99 = run_clients(encoder, texts, clients, args.requests)
+            print(f'{clients:>8}  {mode:<10}{throughput:>10.1f}{p50:>10.2f}{p99:>10.2f}')
+    print(f'\nBatcher: {batcher.stats()}')
+
+
+if __name__ == '__main__':
+    main()
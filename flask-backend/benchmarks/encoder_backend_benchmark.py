@@ -0,0 +1,109 @@
+"""
+PyTorch vs ONNX Runtime (fp32 / int8) sentence encoder benchmark
+===============================================================
+
+Each backend runs in a fresh subprocess so load time and resident memory
+are measured without the other backends' imports. Reports single-sentence
+latency, batched throughput, RSS, and cosine agreement with PyTorch.
+
+Usage (from flask-backend/, after `python encoder_backends.py export --quantize`):
+    python -m benchmarks.encoder_backend_benchmark --threads 2
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from samadhan_dataset import COMPLAINT_PATTERNS
+
+BACKENDS = [('torch', False), ('onnx', False), ('onnx', True)]
+
+
+def run_backend(args):
+    """Subprocess body: load one backend, time it, dump embeddings"""
+    started = time.perf_counter()
+    from encoder_backends import load_encoder
+    encoder = load_encoder(args.backend, args.model, args.onnx_dir, args.quantized, args.threads)
+    load_s = time.perf_counter() - started
+
+    texts = [text for patterns in COMPLAINT_PATTERNS.values() for text in patterns]
+    encoder.encode(texts[:8])  # warm-up
+
+    latencies = []
+    for text in texts[:args.single]:
+        t0 = time.perf_counter()
+        encoder.encode([text])
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    embeddings = np.asarray(encoder.encode(texts, batch_size=32), dtype=np.float32)
+    throughput = len(texts) / (time.perf_counter() - t0)
+
+    np.save(args.output, embeddings)
+    print(json.dumps({
+        'load_s': load_s,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'throughput': throughput,
+        'max_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--onnx-dir', help='Exported ONNX directory (default .cache/onnx/<model>)')
+    parser.add_argument('--threads', type=int, default=None, help='Pinned intra-op threads for every backend')
+    parser.add_argument('--single', type=int, default=100, help='Single-sentence calls to time')
+    parser.add_argument('--backend', help=argparse.SUPPRESS)
+    parser.add_argument('--quantized', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend, quantized in BACKENDS:
+            name = f"{backend}{'-int8' if quantized else ''}"
+            output = str(Path(tmp) / f'{name}.npy')
+            cmd = [sys.executable, '-m', 'benchmarks.encoder_backend_benchmark', '--backend', backend,
+                   '--model', args.model, '--single', str(args.single), '--output', output]
+            if quantized:
+                cmd.append('--quantized')
+            if args.onnx_dir:
+                cmd += ['--onnx-dir', args.onnx_dir]
+            if args.threads:
+                cmd += ['--threads', str(args.threads)]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f'⚠️ {name} failed:\n{proc.stderr.strip()[-2000:]}')
+                continue
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+            results[name]['embeddings'] = np.load(output)
+
+    reference = results.get('torch', {}).get('embeddings')
+    print(f"\n{'backend':<11}{'load s':>8}{'p50 ms':>9}{'p99 ms':>9}{'sent/s':>9}{'RSS MiB':>9}{'cos mean':>10}{'cos min':>9}")
+    for name, r in results.items():
+        if reference is not None:
+            a = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+            b = r['embeddings'] / np.linalg.norm(r['embeddings'], axis=1, keepdims=True)
+            cosines = (a * b).sum(axis=1)
+            agreement = f'{cosines.mean():>10.5f}{cosines.min():>9.5f}'
+        else:
+            agreement = f"{'-':>10}{'-':>9}"
+        print(f"{name:<11}{r['load_s']:>8.2f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['throughput']:>9.0f}"
+              f"{r['max_rss_mib']:>9.0f}{agreement}")
+
+
+if __name__ == '__main__':
+    main()
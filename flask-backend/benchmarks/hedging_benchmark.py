@@ -0,0 +1,108 @@
+"""
+Response generation: WatsonX with serial fallback vs hedged OpenRouter
+=====================================================================
+
+Local stand-ins for both providers. The WatsonX stand-in streams its answer
+after a heavy-tailed time to first token: lognormal around `--ttft-ms` for
+most calls, and a `--stall-ms` stall for a `--stall-rate` fraction of them.
+OpenRouter answers after `--openrouter-ms`. The same requests then go
+through generate_ai_response with hedging off (wait for WatsonX, fall back
+only on failure) and on (HedgePolicy delay from the observed p95).
+
+Usage (from flask-backend/):
+    python -m benchmarks.hedging_benchmark --requests 300 --stall-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.0'  # streamed body ends when the connection closes
+    args = None
+    rng = np.random.default_rng(0)
+    rng_lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.startswith('/watsonx'):
+            with self.rng_lock:
+                stalled = self.rng.random() < self.args.stall_rate
+                ttft = self.rng.lognormal(np.log(self.args.ttft_ms), 0.5)
+            time.sleep((self.args.stall_ms if stalled else ttft) / 1000)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for word in ('Your ', 'complaint ', 'is ', 'registered.'):
+                payload = json.dumps({'choices': [{'delta': {'content': word}}]})
+                self.wfile.write(f'data: {payload}\n\n'.encode())
+                self.wfile.flush()
+                time.sleep(0.02)
+        else:
+            time.sleep(self.args.openrouter_ms / 1000)
+            body = json.dumps({'choices': [{'message': {'content': 'Complaint registered with the department.'}}]})
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--ttft-ms', type=float, default=300.0, help='Median WatsonX time to first token')
+    parser.add_argument('--stall-rate', type=float, default=0.05)
+    parser.add_argument('--stall-ms', type=float, default=5000.0)
+    parser.add_argument('--openrouter-ms', type=float, default=600.0)
+    args = parser.parse_args()
+
+    StandInHandler.args = args
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ.update({
+        'WATSONX_API_KEY': 'stand-in', 'WATSONX_URL': f'{base}/watsonx',
+        'OPENROUTER_API_KEY': 'stand-in', 'OPENROUTER_API_URL': f'{base}/openrouter',
+        'WARMUP_MODE': 'off', 'LLM_CACHE_ENABLED': 'false'  # every request repeats the same prompt
+    })
+    import logging
+    import app
+    logging.getLogger('app').setLevel(logging.ERROR)
+    app.token_cache.update(token='stand-in', expiry=time.time() + 3600)
+
+    print(f'WatsonX ttft ~{args.ttft_ms:.0f} ms, {args.stall_rate:.0%} stalls of {args.stall_ms:.0f} ms; '
+          f'OpenRouter {args.openrouter_ms:.0f} ms; {args.requests} requests x {args.concurrency} concurrent')
+    print(f"\n{'mode':<8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  hedging")
+    for hedging in (False, True):
+        app.config.HEDGING_ENABLED = hedging
+
+        def call(_):
+            started = time.perf_counter()
+            app.generate_ai_response('Street lights not working in Lucknow', 'Public Works', 'medium')
+            return (time.perf_counter() - started) * 1000
+
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            latencies = list(pool.map(call, range(args.requests)))
+        stats = app.hedge_policy.stats() if hedging else {}
+        summary = (f"rate {stats['hedge_rate']:.1%}, wins {stats['primary_wins']}/{stats['secondary_wins']} "
+                   f"(WatsonX/OpenRouter), delay {stats['delay_ms']:.0f} ms") if hedging else 'off'
+        print(f"{'on' if hedging else 'off':<8}{np.percentile(latencies, 50):>9.0f}{np.percentile(latencies, 95):>9.0f}"
+              f'{np.percentile(latencies, 99):>9.0f}{max(latencies):>9.0f}  {summary}')
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
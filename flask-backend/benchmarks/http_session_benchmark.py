@@ -0,0 +1,150 @@
+"""
+Provider calls: fresh connection per call vs pooled keep-alive sessions
+======================================================================
+
+A local HTTPS stand-in for a provider (self-signed certificate generated with
+the openssl CLI) adds a simulated network round-trip time: TCP plus TLS 1.3
+cost `--handshake-rtts` RTTs on every new connection, and each request costs
+one RTT. The same JSON POST is then timed three ways:
+
+  fresh      requests.post per call (what the providers used before)
+  pooled     ProviderSessions, first call included (one handshake)
+  prewarmed  ProviderSessions after prewarm() at boot (no handshake at all)
+
+Usage (from flask-backend/):
+    python -m benchmarks.http_session_benchmark --rtt-ms 20 --calls 50
+"""
+
+import argparse
+import json
+import os
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+from http_sessions import ProviderSessions
+
+
+def make_certificate(directory: str):
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-keyout', key, '-out', cert, '-subj', '/CN=localhost',
+                    '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+class ProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    rtt = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.rtt)
+        body = json.dumps({'choices': [{'message': {'content': 'ok'}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_HEAD = do_POST
+
+    def log_message(self, *args):
+        pass
+
+
+class TLSStandIn(ThreadingHTTPServer):
+    """HTTPS server whose new connections pay a simulated handshake delay in the handler thread"""
+    daemon_threads = True
+
+    def __init__(self, address, handler, context: ssl.SSLContext, handshake_delay: float):
+        super().__init__(address, handler)
+        self.context = context
+        self.handshake_delay = handshake_delay
+        self.handshakes = 0
+
+    def finish_request(self, request, client_address):
+        time.sleep(self.handshake_delay)
+        # Headers and body go out in separate writes; without NODELAY, Nagle plus delayed ACKs add ~40 ms
+        request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        request = self.context.wrap_socket(request, server_side=True)
+        self.handshakes += 1
+        super().finish_request(request, client_address)
+
+
+def time_calls(call, calls: int):
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rtt-ms', type=float, default=20.0, help='Simulated round-trip time to the provider')
+    parser.add_argument('--handshake-rtts', type=int, default=2, help='RTTs per new connection (TCP + TLS 1.3)')
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        ProviderHandler.rtt = args.rtt_ms / 1000
+        server = TLSStandIn(('127.0.0.1', 0), ProviderHandler, context, args.handshake_rtts * args.rtt_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'https://localhost:{server.server_address[1]}/api/v1/chat/completions'
+        payload = {'model': 'stand-in', 'messages': [{'role': 'user', 'content': 'Street lights not working'}]}
+
+        results = {}
+        before = server.handshakes
+        results['fresh'] = time_calls(lambda: requests.post(url, json=payload, verify=cert, timeout=30), args.calls)
+        handshakes = {'fresh': server.handshakes - before}
+
+        for name in ('pooled', 'prewarmed'):
+            sessions = ProviderSessions()
+            session = sessions.get('openrouter')
+            if name == 'prewarmed':
+                session.head(url, verify=cert, timeout=30)  # what prewarm() does, with the stand-in's CA
+            before = server.handshakes
+            results[name] = time_calls(lambda: session.post(url, json=payload, verify=cert, timeout=30), args.calls)
+            handshakes[name] = server.handshakes - before
+            sessions.close()
+
+        print(f'RTT {args.rtt_ms:.0f} ms, {args.handshake_rtts} RTTs per handshake, {args.calls} sequential calls')
+        print(f"\n{'mode':<11}{'first ms':>10}{'p50 ms':>9}{'p99 ms':>9}{'handshakes':>12}")
+        for name, latencies in results.items():
+            print(f'{name:<11}{latencies[0]:>10.1f}{np.percentile(latencies, 50):>9.1f}'
+                  f'{np.percentile(latencies, 99):>9.1f}{handshakes[name]:>12}')
+
+        # Concurrent calls: the pool keeps up to pool_maxsize connections per host alive
+        sessions = ProviderSessions(pool_maxsize=args.concurrency)
+        session = sessions.get('openrouter')
+        print(f'\n{args.concurrency} concurrent callers, {args.calls * 2} calls')
+        for name, call in (('fresh', lambda _: requests.post(url, json=payload, verify=cert, timeout=30)),
+                           ('pooled', lambda _: session.post(url, json=payload, verify=cert, timeout=30))):
+            before = server.handshakes
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                list(pool.map(call, range(args.calls * 2)))
+            elapsed = time.perf_counter() - started
+            print(f'{name:<11}{args.calls * 2 / elapsed:>8.1f} calls/s  {server.handshakes - before:>4} handshakes')
+        print(f'\npool stats: {sessions.stats()}')
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
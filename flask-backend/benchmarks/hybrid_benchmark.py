@@ -0,0 +1,141 @@
+"""
+Dense vs BM25 vs hybrid (RRF) retrieval benchmark
+================================================
+
+Accuracy: leave-one-out over the complaint patterns. Each pattern is
+searched against the training corpus with its own document removed, and
+the department of the top-1 labelled neighbour and of the top-k vote is
+compared with the pattern's department.
+
+Measured with all-MiniLM-L6-v2 (240 patterns, 280 documents, k=7):
+
+    method   top-1 acc  vote acc
+    dense        0.775     0.854
+    bm25         0.521     0.625
+    hybrid       0.667     0.792
+
+Hybrid beats BM25 alone but not dense alone here, and weighting the dense
+leg up to 0.9 of the fused score only ties it. Each training pattern has
+paraphrased neighbours the encoder already finds, so this corpus has few
+of the rare exact terms BM25 is meant to rescue. That is why the app
+keeps HYBRID_RETRIEVAL_ENABLED off. Re-run this against a historical
+complaint index before turning it on.
+
+Latency: per-query time on a synthetic corpus (Zipf vocabulary, clustered
+embeddings behind the numpy IVF index) of --n documents.
+
+Usage (from flask-backend/):
+    python -m benchmarks.hybrid_benchmark --model all-MiniLM-L6-v2
+    python -m benchmarks.hybrid_benchmark --skip-accuracy --n 100000
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from ann_index import ExactIndex, build_index
+from benchmarks.ann_benchmark import synthetic_corpus
+from embedding_store import normalize_rows
+from hybrid_retriever import BM25Index, HybridRetriever, document_text
+from knn_classifier import canonical_labels
+from samadhan_dataset.load_dataset import get_training_documents
+
+
+class _Document:
+    def __init__(self, page_content: str, metadata: dict):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+def evaluate_accuracy(args):
+    from encoder_backends import load_encoder
+
+    documents = [_Document(d['content'], d['metadata']) for d in get_training_documents()]
+    departments = [canonical_labels(doc)[0] for doc in documents]
+    queries = [(i, doc.page_content.split('. This should be handled by')[0])
+               for i, doc in enumerate(documents) if doc.metadata.get('type') == 'complaint_example' and departments[i]]
+
+    encoder = load_encoder(args.backend, args.model)
+    vectors = normalize_rows(np.asarray(encoder.encode([doc.page_content for doc in documents], batch_size=64), dtype=np.float32))
+    query_vectors = np.asarray(encoder.encode([text for _, text in queries], batch_size=64), dtype=np.float32)
+    hybrid = HybridRetriever.build(ExactIndex(vectors), documents, depth=args.depth)
+
+    legs = {
+        'dense': lambda q, text: hybrid.dense_index.search(q, args.depth)[0][0],
+        'bm25': lambda q, text: hybrid.bm25.search([text], args.depth)[0][0],
+        'hybrid': lambda q, text: hybrid.search(q, args.depth, [text])[0][0]
+    }
+    print(f'Leave-one-out over {len(queries)} complaint patterns, corpus {len(documents)} documents, k={args.k}')
+    print(f"\n{'method':<9}{'top-1 acc':>11}{'vote acc':>10}")
+    for name, search in legs.items():
+        top1 = vote = 0
+        for (doc_id, text), query_vector in zip(queries, query_vectors):
+            ranked = [i for i in search(query_vector[None, :], text) if i >= 0 and i != doc_id and departments[i]]
+            labels = [departments[i] for i in ranked[:args.k]]
+            top1 += bool(labels) and labels[0] == departments[doc_id]
+            vote += bool(labels) and Counter(labels).most_common(1)[0][0] == departments[doc_id]
+        print(f'{name:<9}{top1 / len(queries):>11.3f}{vote / len(queries):>10.3f}')
+
+
+def synthetic_texts(n: int, vocabulary: int, length: int, seed: int = 0):
+    """Documents of Zipf-distributed word ids, the usual shape of natural text term frequencies"""
+    rng = np.random.default_rng(seed)
+    words = np.minimum(rng.zipf(1.2, size=(n, length)), vocabulary)
+    return [' '.join(f'w{w}' for w in row) for row in words]
+
+
+def evaluate_latency(args):
+    print(f'\nSynthetic corpus: {args.n} documents x {args.length} tokens, dim {args.dim}, k={args.k}')
+    texts = synthetic_texts(args.n, args.vocabulary, args.length)
+    vectors = synthetic_corpus(args.n, args.dim, 500)
+    started = time.perf_counter()
+    dense = build_index(vectors, 'numpy-ivf')
+    dense.nprobe = args.nprobe
+    hybrid = HybridRetriever(dense, BM25Index.build(texts), depth=args.depth)
+    print(f'Index build: {time.perf_counter() - started:.1f}s')
+
+    rng = np.random.default_rng(1)
+    picks = rng.choice(args.n, args.queries, replace=False)
+    query_texts = [' '.join(texts[i].split()[:args.query_length]) for i in picks]
+    query_vectors = vectors[picks]
+
+    runs = {
+        'dense': lambda q, text: hybrid.dense_index.search(q, args.k),
+        'bm25': lambda q, text: hybrid.bm25.search([text], args.k),
+        'hybrid': lambda q, text: hybrid.search(q, args.k, [text])
+    }
+    print(f"\n{'method':<9}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, search in runs.items():
+        latencies = []
+        for text, query in zip(query_texts, query_vectors):
+            t0 = time.perf_counter()
+            search(query[None, :], text)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        print(f'{name:<9}{np.percentile(latencies, 50):>9.2f}{np.percentile(latencies, 99):>9.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--backend', default='torch', choices=['torch', 'onnx'])
+    parser.add_argument('--skip-accuracy', action='store_true')
+    parser.add_argument('--n', type=int, default=100000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--vocabulary', type=int, default=30000)
+    parser.add_argument('--length', type=int, default=40)
+    parser.add_argument('--query-length', type=int, default=12)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--nprobe', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=50)
+    parser.add_argument('--k', type=int, default=7)
+    args = parser.parse_args()
+
+    if not args.skip_accuracy:
+        evaluate_accuracy(args)
+    evaluate_latency(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+IAM token renewal: refresh in the request vs background refresh shared by workers
+================================================================================
+
+A local IAM mock issues tokens that live `--lifetime` seconds and takes
+`--iam-ms` to answer. `--workers` forked processes, each with `--threads`
+request threads, call the token getter every `--interval-ms` for
+`--duration` seconds, in three modes:
+
+  legacy      the old get_ibm_cloud_token: unlocked per-process dict,
+              renewed inside whichever requests find it expired
+  locked      IAMTokenManager without the refresher or the token file
+              (one renewal per worker, still inside a request)
+  background  IAMTokenManager with the background refresher and the
+              shared token file
+
+Each worker holds a token before the load starts, so the table shows the
+renewals: IAM calls, token reads that waited on IAM (slower than 50 ms),
+and the read latency percentiles. IAM calls include each worker's first token.
+
+Usage (from flask-backend/):
+    python -m benchmarks.iam_token_benchmark --workers 4 --threads 8 --lifetime 8 --duration 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+from iam_tokens import IAMTokenManager
+
+SLOW_MS = 50.0
+
+
+class MockIAM(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    args = None
+    calls = None  # multiprocessing.Value, shared with the parent
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.calls.get_lock():
+            self.calls.value += 1
+            serial = self.calls.value
+        time.sleep(self.args.iam_ms / 1000)
+        body = json.dumps({'access_token': f'token-{serial}', 'expires_in': self.args.lifetime}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def worker(mode: str, args, url: str, shared_path: str, results):
+    session = requests.Session()
+
+    def fetch():
+        data = session.post(url, data='grant_type=apikey').json()
+        return data['access_token'], data['expires_in']
+
+    cache = {'token': None, 'expiry': 0}
+    margin = 1.0
+    if mode == 'legacy':
+        def get_token():
+            if cache['token'] and time.time() < cache['expiry']:
+                return cache['token']
+            token, expires_in = fetch()
+            cache.update(token=token, expiry=time.time() + expires_in - margin)
+            return token
+    else:
+        manager = IAMTokenManager(fetch, cache, shared_path=shared_path if mode == 'background' else None,
+                                  background=mode == 'background', refresh_ahead=args.lifetime / 2,
+                                  expiry_margin=margin)
+        get_token = manager.get
+    get_token()
+
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.time() + args.duration
+
+    def load():
+        own = []
+        while time.time() < deadline:
+            started = time.perf_counter()
+            get_token()
+            own.append((time.perf_counter() - started) * 1000)
+            time.sleep(args.interval_ms / 1000)
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=load) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--lifetime', type=float, default=8.0, help='Token lifetime (s)')
+    parser.add_argument('--iam-ms', type=float, default=300.0, help='IAM response latency')
+    parser.add_argument('--interval-ms', type=float, default=10.0, help='Pause between token reads per thread')
+    parser.add_argument('--duration', type=float, default=20.0)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('fork')
+    MockIAM.args = args
+    MockIAM.calls = context.Value('i', 0)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockIAM)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/identity/token'
+
+    print(f'{args.workers} workers x {args.threads} threads, token lifetime {args.lifetime:.0f}s, '
+          f'IAM {args.iam_ms:.0f} ms, {args.duration:.0f}s per mode')
+    print(f"\n{'mode':<12}{'IAM calls':>10}{'slow reads':>11}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for mode in ('legacy', 'locked', 'background'):
+        with tempfile.TemporaryDirectory() as directory:
+            results = context.Queue()
+            processes = [context.Process(target=worker, args=(mode, args, url, os.path.join(directory, 'token.json'),
+                                                              results))
+                         for _ in range(args.workers)]
+            with MockIAM.calls.get_lock():
+                MockIAM.calls.value = 0
+            for process in processes:
+                process.start()
+            latencies = np.concatenate([results.get() for _ in processes])
+            for process in processes:
+                process.join()
+        print(f'{mode:<12}{MockIAM.calls.value:>10}{int((latencies > SLOW_MS).sum()):>11}'
+              f'{np.percentile(latencies, 50):>9.3f}{np.percentile(latencies, 99):>9.3f}{latencies.max():>9.1f}')
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Rule-based keyword matching: per-keyword substring scans vs the automaton
+=======================================================================
+
+Times the keyword part of get_fallback_analysis on short complaints and on
+~2 KB complaints, and lists where word-boundary matching changes the
+category, priority or sentiment of the dataset's complaint patterns.
+
+Usage (from flask-backend/):
+    python -m benchmarks.keyword_benchmark
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from keyword_engine import SENTIMENT_KEYWORDS, KeywordEngine
+from samadhan_dataset import COMPLAINT_PATTERNS, PRIORITY_KEYWORDS, UP_GOVERNMENT_DATASET
+
+
+def substring_analysis(complaint_text: str):
+    """The previous get_fallback_analysis keyword logic: one `in` test per keyword"""
+    text = complaint_text.lower()
+    category_scores = {}
+    for dept_name, dept_info in UP_GOVERNMENT_DATASET['departments'].items():
+        score = sum(1 for keyword in dept_info['priority_keywords'] if keyword in text)
+        if score > 0:
+            category_scores[dept_name] = score
+    category = max(category_scores, key=category_scores.get) if category_scores else 'Other'
+
+    priority = 'medium'
+    for p in ['critical', 'high', 'low']:
+        if any(keyword in text for keyword in PRIORITY_KEYWORDS[p]['general']):
+            priority = p
+            break
+        category_key = category.lower().replace(' ', '_')
+        if category_key in PRIORITY_KEYWORDS[p]:
+            if any(keyword in text for keyword in PRIORITY_KEYWORDS[p][category_key]):
+                priority = p
+                break
+
+    neg_score = sum(1 for word in SENTIMENT_KEYWORDS['negative'] if word in text)
+    pos_score = sum(1 for word in SENTIMENT_KEYWORDS['positive'] if word in text)
+    sentiment = 'negative' if neg_score > pos_score else 'positive' if pos_score > neg_score else 'neutral'
+    return category, priority, sentiment
+
+
+def automaton_analysis(engine: KeywordEngine, complaint_text: str):
+    hits = engine.analyze(complaint_text)
+    category = engine.best_department(hits) or 'Other'
+    return category, hits.priority(category.lower().replace(' ', '_')), hits.sentiment()
+
+
+def long_complaints(patterns, size: int, count: int, seed: int = 0):
+    """Complaints of ~size characters stitched from random patterns and filler narrative"""
+    rng = np.random.default_rng(seed)
+    filler = ('I have visited the office several times and submitted written applications '
+              'but nobody has responded so far and the residents of our locality are suffering. ')
+    texts = []
+    for _ in range(count):
+        parts = []
+        while sum(len(p) for p in parts) < size:
+            parts.append(patterns[rng.integers(len(patterns))] + '. ' + filler)
+        texts.append(''.join(parts)[:size])
+    return texts
+
+
+def time_per_call(fn, texts, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            fn(text)
+            latencies.append((time.perf_counter() - started) * 1e6)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--long-size', type=int, default=2048)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--show', type=int, default=15, help='Disagreements to print')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engine = KeywordEngine.from_dataset()
+    print(f'Automaton build: {(time.perf_counter() - started) * 1000:.1f} ms, '
+          f'{len(engine.automaton.labels)} keywords, pattern {len(engine.automaton.pattern.pattern)} chars')
+
+    patterns = [text for texts in COMPLAINT_PATTERNS.values() for text in texts]
+    workloads = {
+        'short': patterns,
+        f'{args.long_size // 1024} KB': long_complaints(patterns, args.long_size, 200)
+    }
+    print(f"\n{'workload':<10}{'method':<11}{'p50 us':>9}{'p99 us':>9}")
+    for name, texts in workloads.items():
+        for method, fn in [('substring', substring_analysis), ('automaton', lambda t: automaton_analysis(engine, t))]:
+            p50, p99 = time_per_call(fn, texts, args.repeat)
+            print(f'{name:<10}{method:<11}{p50:>9.1f}{p99:>9.1f}')
+
+    changed = [(text, substring_analysis(text), automaton_analysis(engine, text)) for text in patterns]
+    changed = [row for row in changed if row[1] != row[2]]
+    print(f'\n{len(changed)}/{len(patterns)} complaint patterns change (category, priority, sentiment):')
+    for text, old, new in changed[:args.show]:
+        print(f'  {text[:60]!r}\n      substring {old}\n      automaton {new}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Linear classifier accuracy and latency vs the rule-based keyword path
+====================================================================
+
+Accuracy: k-fold cross-validation over COMPLAINT_PATTERNS (keyword-list
+examples always stay in training), department and priority, against the
+keyword rules on the same held-out patterns. The priority policy table
+compares rules only, max(linear, rules) and the linear priority above a
+confidence threshold. The rules win at every threshold (0.975 against
+0.946 at 0.8), so classify_with_linear takes only the department from
+the linear tier.
+
+Latency: per-complaint time for single calls and for batches.
+
+Usage (from flask-backend/):
+    python -m benchmarks.linear_classifier_benchmark --folds 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from keyword_engine import get_keyword_engine
+from knn_classifier import CATEGORY_PRIORITY_KEYS, DEPARTMENT_CATEGORIES
+from linear_classifier import LinearComplaintClassifier, training_examples
+from samadhan_dataset import COMPLAINT_PATTERNS
+
+
+def rule_based(text: str):
+    engine = get_keyword_engine()
+    hits = engine.analyze(text)
+    department = engine.best_department(hits) or 'General Services'
+    return department, hits.priority(CATEGORY_PRIORITY_KEYS.get(DEPARTMENT_CATEGORIES.get(department)))
+
+
+def cross_validate(folds: int, seed: int = 0):
+    texts, departments, priorities = training_examples()
+    n_patterns = sum(len(patterns) for patterns in COMPLAINT_PATTERNS.values())
+    fold_of = np.random.default_rng(seed).permutation(n_patterns) % folds
+
+    scores = {'linear': [0, 0], 'rules': [0, 0]}
+    priority_votes = []  # (true, linear, linear confidence, rules) per held-out pattern
+    for fold in range(folds):
+        held_out = set(np.flatnonzero(fold_of == fold).tolist())
+        train = [i for i in range(len(texts)) if i not in held_out]
+        model = LinearComplaintClassifier.train([texts[i] for i in train], [departments[i] for i in train],
+                                                [priorities[i] for i in train])
+        held_out = sorted(held_out)
+        predictions = model.predict_batch([texts[i] for i in held_out])
+        for i, prediction in zip(held_out, predictions):
+            department, priority = rule_based(texts[i])
+            scores['linear'][0] += prediction['department'] == departments[i]
+            scores['linear'][1] += prediction['priority'] == priorities[i]
+            scores['rules'][0] += department == departments[i]
+            scores['rules'][1] += priority == priorities[i]
+            priority_votes.append((priorities[i], prediction['priority'], prediction['priority_confidence'], priority))
+
+    print(f'{folds}-fold cross-validation over {n_patterns} complaint patterns')
+    print(f"\n{'method':<9}{'department':>12}{'priority':>10}")
+    for method, (department_hits, priority_hits) in scores.items():
+        print(f'{method:<9}{department_hits / n_patterns:>12.3f}{priority_hits / n_patterns:>10.3f}')
+    compare_priority_policies(priority_votes)
+
+
+def compare_priority_policies(votes):
+    """Priority accuracy of the ways the linear tier can combine its priority head with the rules"""
+    severity = ['low', 'medium', 'high', 'critical']
+    policies = {
+        'rules only': lambda linear, confidence, rules: rules,
+        'max(linear, rules)': lambda linear, confidence, rules: max(linear, rules, key=severity.index)
+    }
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9, 0.95):
+        policies[f'linear if conf >= {threshold}'] = (
+            lambda linear, confidence, rules, t=threshold: linear if confidence >= t else rules)
+    print(f"\n{'priority policy':<24}{'accuracy':>9}{'linear used':>13}")
+    for name, policy in policies.items():
+        hits = sum(policy(linear, confidence, rules) == true for true, linear, confidence, rules in votes)
+        used = sum(policy(linear, confidence, rules) != rules for true, linear, confidence, rules in votes)
+        print(f'{name:<24}{hits / len(votes):>9.3f}{used:>13}')
+
+
+def measure_latency(batch: int, repeat: int):
+    model = LinearComplaintClassifier.train(*training_examples())
+    texts = [text for patterns in COMPLAINT_PATTERNS.values() for text in patterns]
+    model.predict_batch(texts[:8])
+
+    single = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            model.predict(text)
+            single.append((time.perf_counter() - started) * 1e6)
+
+    batches = [(texts * (batch // len(texts) + 1))[:batch] for _ in range(repeat)]
+    started = time.perf_counter()
+    for chunk in batches:
+        model.predict_batch(chunk)
+    per_item = (time.perf_counter() - started) * 1e6 / (batch * repeat)
+
+    print(f'\nsingle call  p50 {np.percentile(single, 50):.0f} us  p99 {np.percentile(single, 99):.0f} us')
+    print(f'batch of {batch}  {per_item:.1f} us per complaint')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--batch', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    cross_validate(args.folds)
+    measure_latency(args.batch, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Hindi / Hinglish normalization: rule-based coverage and per-complaint cost
+=========================================================================
+
+Runs the rule-based keyword analysis on Devanagari and romanized-Hindi
+complaints with and without the normalization stage, and times the stage
+on the dataset's English patterns (where it must be a cheap no-op) and on
+the Hindi samples.
+
+Usage (from flask-backend/):
+    python -m benchmarks.normalizer_benchmark
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from keyword_engine import get_keyword_engine
+from samadhan_dataset import COMPLAINT_PATTERNS
+from text_normalizer import TextNormalizer
+
+# (complaint, expected department)
+HINDI_COMPLAINTS = [
+    ('paani nahi aa raha 3 din se, tanki khali hai', 'Water Supply'),
+    ('पानी नहीं आ रहा है, बहुत परेशानी है', 'Water Supply'),
+    ('ganda pani aa raha hai nal me', 'Water Supply'),
+    ('सड़क टूटी है और बड़े गड्ढे हैं', 'Public Works'),
+    ('hamari gali ki sadak kharab hai, gaddhe bhare nahi', 'Public Works'),
+    ('nali band hai, gutter ubal raha hai', 'Public Works'),
+    ('बत्ती नहीं जल रही, अंधेरा रहता है', 'Public Works'),
+    ('mohalle me kachra nahi uthaya gaya ek hafte se', 'Environment'),
+    ('फैक्ट्री से बहुत धुआं और प्रदूषण', 'Environment'),
+    ('aspatal me doctor nahi hai, marij pareshan hai', 'Healthcare'),
+    ('सरकारी अस्पताल में दवाई नहीं मिल रही', 'Healthcare'),
+    ('vidyalaya me shikshak nahi aate, bachche pareshan', 'Education'),
+    ('स्कूल में मिड डे मील का भोजन खराब है', 'Education'),
+    ('kotedar rashan nahi de raha, anaj kam deta hai', 'Food & Civil Supplies'),
+    ('दाखिल खारिज का काम महीनों से लंबित है, खतौनी में गलती', 'Revenue'),
+    ('kisan ko khad aur beej nahi mil raha', 'Agriculture'),
+    ('vridha pension teen mahine se nahi aayi', 'Social Welfare'),
+    ('चौराहे पर भीषण दुर्घटना, तुरंत मदद चाहिए', 'Traffic Police')
+]
+
+
+def rule_based_department(text: str) -> str:
+    engine = get_keyword_engine()
+    return engine.best_department(engine.analyze(text)) or 'Other'
+
+
+def time_per_call(fn, texts, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            fn(text)
+            latencies.append((time.perf_counter() - started) * 1e6)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    normalizer = TextNormalizer()
+    print(f'Normalizer build: {(time.perf_counter() - started) * 1000:.1f} ms, '
+          f'{len(normalizer.automaton.labels)} Hindi keywords')
+
+    raw_hits = normalized_hits = 0
+    print(f"\n{'expected':<22}{'raw':<22}{'normalized':<22}complaint")
+    for text, expected in HINDI_COMPLAINTS:
+        raw = rule_based_department(text)
+        normalized = rule_based_department(normalizer.normalize(text).text)
+        raw_hits += raw == expected
+        normalized_hits += normalized == expected
+        print(f'{expected:<22}{raw:<22}{normalized:<22}{text[:40]}')
+    print(f'\ndepartment accuracy  raw {raw_hits}/{len(HINDI_COMPLAINTS)}  '
+          f'normalized {normalized_hits}/{len(HINDI_COMPLAINTS)}')
+
+    english = [text for patterns in COMPLAINT_PATTERNS.values() for text in patterns]
+    changed = sum(normalizer.normalize(text).text != text for text in english)
+    print(f'{changed}/{len(english)} English complaint patterns changed by normalization')
+
+    print(f"\n{'workload':<10}{'p50 us':>9}{'p99 us':>9}")
+    for name, texts in [('english', english), ('hindi', [text for text, _ in HINDI_COMPLAINTS])]:
+        p50, p99 = time_per_call(normalizer.normalize, texts, args.repeat)
+        print(f'{name:<10}{p50:>9.1f}{p99:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Chat turn: two LLM calls (analysis, then response) vs one one-shot call
+======================================================================
+
+A local OpenRouter mock answers the three prompt kinds the backend sends:
+the JSON analysis, the citizen response and the one-shot JSON with both.
+Its latency models an LLM: `--base-ms` per call plus `--ms-per-token` for
+every completion token (words and punctuation marks). A `--invalid-rate`
+fraction of one-shot answers carries an invalid priority, to exercise the
+per-field fallback. Complaints go through analyze_and_respond (WatsonX
+unset, caches and warm-up off, so every turn reaches the LLM) in three
+modes:
+
+  two-call     analysis, then response (speculation off)
+  speculative  the response starts from the local guess during the analysis
+  one-shot     ONE_SHOT_ENABLED
+
+Per mode: LLM calls, prompt and completion tokens per request (counted by
+the mock) and request latency percentiles.
+
+Usage (from flask-backend/):
+    python -m benchmarks.one_shot_benchmark --requests 200 --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+COMPLAINTS = [
+    'No water supply in Gomti Nagar for 3 days, please help',
+    'Huge potholes on the main road near Charbagh station in Lucknow',
+    'Street lights not working in our colony in Kanpur for a week',
+    'Garbage not collected for ten days, the smell is unbearable',
+    'Doctor absent at the primary health centre in Varanasi',
+    'Traffic signal broken at Hazratganj crossing, accidents happening',
+    'Teachers not coming to the government school in our village',
+    'Electricity cut for 12 hours daily in Agra'
+]
+
+ANALYSES = [
+    ('water', 'Utilities', 'Water Supply'), ('pothole', 'Infrastructure', 'Public Works'),
+    ('light', 'Utilities', 'Water Supply'), ('garbage', 'Environment', 'Environment'),
+    ('doctor', 'Healthcare', 'Healthcare'), ('traffic', 'Traffic', 'Traffic Police'),
+    ('school', 'Education', 'Education'), ('electricity', 'Utilities', 'Water Supply')
+]
+
+RESPONSE = ('We understand your concern and have forwarded your complaint to {department}. Please call {contact} '
+            'for updates; the expected resolution time is {response_time}. For emergencies call {emergency}.')
+
+
+def tokens(text: str) -> int:
+    """Rough BPE count: words and punctuation (whitespace runs are nearly free)"""
+    return len(re.findall(r'\w+|[^\w\s]', text))
+
+
+class MockProvider(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    args = None
+    lock = threading.Lock()
+    totals = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+    rng = np.random.default_rng(0)
+
+    def answer(self, prompt: str) -> str:
+        complaint = re.search(r'Complaint: (.*)', prompt).group(1).strip().strip('"')
+        category, department = next(((category, department) for word, category, department in ANALYSES
+                                     if word in complaint.lower()), ('Other', 'General Services'))
+        analysis = {'category': category, 'priority': 'high', 'department': department, 'sentiment': 'negative',
+                    'confidence': 0.85, 'district': None}
+        if 'write the reply to the citizen' in prompt:
+            with self.lock:
+                invalid = self.rng.random() < self.args.invalid_rate
+            return json.dumps(dict(analysis, priority='urgent' if invalid else 'high', response=RESPONSE))
+        if 'provide JSON response' in prompt:
+            return json.dumps(analysis)
+        # The same reply, with the department data the response prompt carries
+        field = lambda name: re.search(rf'{name}: (.*)', prompt).group(1)
+        return RESPONSE.format(department=field('Department'), contact=field('Contact'),
+                               response_time=field('Response Time'), emergency=field('Emergency'))
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        prompt = request['messages'][0]['content']
+        content = self.answer(prompt)
+        with self.lock:
+            self.totals['calls'] += 1
+            self.totals['prompt_tokens'] += tokens(prompt)
+            self.totals['completion_tokens'] += tokens(content)
+        time.sleep((self.args.base_ms + self.args.ms_per_token * tokens(content)) / 1000)
+        body = json.dumps({'choices': [{'message': {'content': content}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--base-ms', type=float, default=300.0, help='Per-call latency (queueing, prefill)')
+    parser.add_argument('--ms-per-token', type=float, default=10.0, help='Per completion token')
+    parser.add_argument('--invalid-rate', type=float, default=0.05, help='One-shot answers with an invalid field')
+    args = parser.parse_args()
+
+    MockProvider.args = args
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockProvider)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.update({
+        'OPENROUTER_API_KEY': 'mock',
+        'OPENROUTER_API_URL': f'http://127.0.0.1:{server.server_address[1]}/api/v1/chat/completions',
+        'WARMUP_MODE': 'off', 'LLM_CACHE_ENABLED': 'false'  # every complaint repeats
+    })
+    import logging
+    import app
+    logging.disable(logging.WARNING)
+    app.config.WATSONX_API_KEY = None
+
+    print(f'Mock provider {args.base_ms:.0f} ms + {args.ms_per_token:.0f} ms/token; {args.requests} requests x '
+          f'{args.concurrency} concurrent; {args.invalid_rate:.0%} invalid one-shot answers')
+    print(f"\n{'mode':<13}{'calls/req':>10}{'prompt tok':>11}{'compl tok':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode in ('two-call', 'speculative', 'one-shot'):
+        app.config.ONE_SHOT_ENABLED = mode == 'one-shot'
+        app.config.SPECULATIVE_RESPONSE_ENABLED = mode == 'speculative'
+        with MockProvider.lock:
+            MockProvider.totals.update(calls=0, prompt_tokens=0, completion_tokens=0)
+
+        def turn(i):
+            started = time.perf_counter()
+            app.analyze_and_respond(COMPLAINTS[i % len(COMPLAINTS)])
+            return (time.perf_counter() - started) * 1000
+
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            latencies = list(pool.map(turn, range(args.requests)))
+        totals = MockProvider.totals
+        print(f"{mode:<13}{totals['calls'] / args.requests:>10.2f}{totals['prompt_tokens'] / args.requests:>11.0f}"
+              f"{totals['completion_tokens'] / args.requests:>10.0f}{np.percentile(latencies, 50):>9.0f}"
+              f'{np.percentile(latencies, 95):>9.0f}')
+    stats = app.one_shot_stats.stats()
+    print(f"\none-shot: {stats['complete']}/{stats['requests']} complete, field fallbacks "
+          + ', '.join(f'{name} {count}' for name, count in stats['field_fallbacks'].items() if count))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
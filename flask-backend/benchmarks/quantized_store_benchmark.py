@@ -0,0 +1,110 @@
+"""
+Per-worker memory and accuracy of float32 / float16 / int8 embedding stores
+=========================================================================
+
+Forks N workers that memory-map the same store file read-only and score
+queries against it, then reports each worker's RSS and PSS (proportional set
+size, which splits shared pages between the processes mapping them) plus
+top-k agreement with float32.
+
+Usage (from flask-backend/, Linux only for PSS):
+    python -m benchmarks.quantized_store_benchmark --n 500000 --workers 4
+    python -m benchmarks.quantized_store_benchmark --vectors .cache/embeddings/<store>.npy
+"""
+
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ann_index import ExactIndex
+from embedding_store import STORE_DTYPES, normalize_rows, quantize_rows
+from benchmarks.ann_benchmark import recall_at_k, synthetic_corpus
+
+
+def memory_kb():
+    """(rss, pss) of the current process in KiB from /proc/self/smaps_rollup"""
+    values = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ('Rss:', 'Pss:'):
+                    values[parts[0]] = int(parts[1])
+    except OSError:
+        return None, None
+    return values.get('Rss:'), values.get('Pss:')
+
+
+def worker(store_dir, dtype, queries, k, barrier, results):
+    vectors = np.load(Path(store_dir) / f'{dtype}.npy', mmap_mode='r')
+    scales_file = Path(store_dir) / f'{dtype}.scales.npy'
+    scales = np.load(scales_file, mmap_mode='r') if scales_file.exists() else None
+    index = ExactIndex(vectors, scales)
+
+    started = time.perf_counter()
+    ids, _ = index.search(queries, k)
+    latency_ms = (time.perf_counter() - started) * 1000 / queries.shape[0]
+
+    # Measure only after every worker has touched the whole store
+    barrier.wait()
+    rss, pss = memory_kb()
+    results.put((ids, latency_ms, rss, pss))
+    barrier.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vectors', help='Real float32 embedding matrix (.npy)')
+    parser.add_argument('--n', type=int, default=300000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    corpus = normalize_rows(np.load(args.vectors)) if args.vectors else synthetic_corpus(args.n, args.dim, 500)
+    rng = np.random.default_rng(1)
+    queries = normalize_rows(corpus[rng.choice(corpus.shape[0], args.queries, replace=False)]
+                             + 0.05 * rng.standard_normal((args.queries, corpus.shape[1])).astype(np.float32))
+    print(f'Corpus: {corpus.shape[0]} x {corpus.shape[1]}, {args.workers} workers, {args.queries} queries, k={args.k}')
+
+    ctx = mp.get_context('fork')
+    with tempfile.TemporaryDirectory() as store_dir:
+        for dtype in STORE_DTYPES:
+            codes, scales = quantize_rows(corpus, dtype)
+            np.save(Path(store_dir) / f'{dtype}.npy', codes)
+            if scales is not None:
+                np.save(Path(store_dir) / f'{dtype}.scales.npy', scales)
+        del corpus, codes, scales
+
+        print(f"\n{'dtype':<9}{'store MiB':>10}{'RSS MiB':>10}{'PSS MiB':>10}{'ms/query':>10}{'recall@k':>10}{'top-1':>8}")
+        baseline = None
+        for dtype in STORE_DTYPES:
+            barrier = ctx.Barrier(args.workers)
+            results = ctx.Queue()
+            procs = [ctx.Process(target=worker, args=(store_dir, dtype, queries, args.k, barrier, results))
+                     for _ in range(args.workers)]
+            for p in procs:
+                p.start()
+            outputs = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+
+            ids = outputs[0][0]
+            if baseline is None:
+                baseline = ids
+            size_mib = sum(f.stat().st_size for f in Path(store_dir).glob(f'{dtype}.*')) / 2 ** 20
+            rss = np.mean([o[2] for o in outputs]) / 1024 if outputs[0][2] else float('nan')
+            pss = np.mean([o[3] for o in outputs]) / 1024 if outputs[0][3] else float('nan')
+            latency = np.mean([o[1] for o in outputs])
+            top1 = float(np.mean(ids[:, 0] == baseline[:, 0]))
+            print(f'{dtype:<9}{size_mib:>10.1f}{rss:>10.1f}{pss:>10.1f}{latency:>10.2f}'
+                  f'{recall_at_k(ids, baseline):>10.3f}{top1:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+SSE parsing: str buffer re-split per chunk vs the bytearray parser
+==================================================================
+
+Builds multi-megabyte synthetic WatsonX streams (OpenAI-style `data:`
+events with mixed English / Devanagari deltas, CRLF line ends) and parses
+them, cut into fixed-size chunks, with:
+
+  legacy  the old call_watsonx_streaming loop: chunks decoded to str
+          (as iter_content(decode_unicode=True) did), appended to a str
+          buffer that is split on every chunk, trailing line parsed again
+  parser  sse_parser.iter_sse_deltas on the raw bytes
+
+Streams:
+  tokens      many small events, the shape of a real generation
+  multi-line  the same, every event's JSON split over two data: lines
+  long-event  one multi-megabyte event, the worst case for re-splitting
+
+Per stream and chunk size: MB/s of both, the speedup, and whether legacy
+produced the parser's text. `json` is the MB/s of decoding the payloads
+alone, the ceiling for any parser of the stream.
+
+Usage (from flask-backend/):
+    python -m benchmarks.sse_parser_benchmark --megabytes 4
+"""
+
+import argparse
+import codecs
+import json
+import time
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from sse_parser import delta_content, iter_sse_deltas
+
+WORDS = ['water ', 'supply ', 'complaint ', 'Lucknow ', 'पानी ', 'नहीं ', 'आ ', 'रहा ', 'department ', '**urgent** ',
+         'will ', 'be ', 'resolved ', 'within ', '48 ', 'hours.\n']
+
+
+def event(content: str) -> str:
+    return 'data: ' + json.dumps({'id': 'chatcmpl', 'model': 'ibm/granite',
+                                  'choices': [{'index': 0, 'delta': {'content': content}}]},
+                                 ensure_ascii=False) + '\r\n\r\n'
+
+
+def token_stream(megabytes: float, rng: np.random.Generator, multi_line: bool = False) -> bytes:
+    events, size = [], 0
+    while size < megabytes * 1e6:
+        text = event(''.join(rng.choice(WORDS, rng.integers(1, 4))))
+        if multi_line:
+            text = text.replace('"choices"', '\r\ndata: "choices"', 1)
+        events.append(text)
+        size += len(text.encode('utf-8'))
+    return (''.join(events) + 'data: [DONE]\r\n\r\n').encode('utf-8')
+
+
+def long_event_stream(megabytes: float, rng: np.random.Generator) -> bytes:
+    content = ''.join(rng.choice(WORDS, int(megabytes * 1e6 / 8)))
+    return (event(content) + 'data: [DONE]\r\n\r\n').encode('utf-8')
+
+
+def legacy_delta_content(line: str) -> Optional[str]:
+    if not line.startswith('data:'):
+        return None
+    data_str = line[5:].strip()
+    if not data_str or data_str == '[DONE]':
+        return None
+    try:
+        choices = json.loads(data_str).get('choices', [])
+        return choices[0].get('delta', {}).get('content') if choices else None
+    except (json.JSONDecodeError, AttributeError, IndexError, KeyError):
+        return None
+
+
+def legacy_deltas(chunks: Iterable[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    for chunk in chunks:
+        chunk = decoder.decode(chunk)
+        if chunk:
+            buffer += str(chunk)
+            lines = buffer.split('\n')
+            buffer = lines.pop() if lines else ''
+            for line in lines:
+                content = legacy_delta_content(line)
+                if content:
+                    yield content
+    content = legacy_delta_content(buffer)
+    if content:
+        yield content
+
+
+def chunked(stream: bytes, size: int) -> List[bytes]:
+    return [stream[i:i + size] for i in range(0, len(stream), size)]
+
+
+def best_time(parse, chunks: List[bytes], repeat: int):
+    best, text = float('inf'), ''
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = ''.join(parse(chunks))
+        best = min(best, time.perf_counter() - started)
+    return best, text
+
+
+def json_floor(stream: bytes, repeat: int) -> float:
+    """Seconds to decode just the stream's JSON payloads"""
+    payloads = ['\n'.join(line[6:] for line in block.split('\r\n'))
+                for block in stream.decode('utf-8').split('\r\n\r\n') if block]
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for payload in payloads:
+            delta_content(payload)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=float, default=4.0)
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[256, 1024, 16384])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    streams = {'tokens': token_stream(args.megabytes, rng),
+               'multi-line': token_stream(args.megabytes, rng, multi_line=True),
+               'long-event': long_event_stream(args.megabytes, rng)}
+    print(f"{'stream':<12}{'chunk':>7}{'json MB/s':>11}{'legacy MB/s':>13}{'parser MB/s':>13}{'speedup':>9}"
+          f"  legacy text")
+    for name, stream in streams.items():
+        megabytes = len(stream) / 1e6
+        json_mbps = megabytes / json_floor(stream, args.repeat)
+        for size in args.chunk_sizes:
+            chunks = chunked(stream, size)
+            legacy_s, legacy_text = best_time(legacy_deltas, chunks, args.repeat)
+            parser_s, parser_text = best_time(iter_sse_deltas, chunks, args.repeat)
+            print(f'{name:<12}{size:>7}{json_mbps:>11.1f}{megabytes / legacy_s:>13.1f}{megabytes / parser_s:>13.1f}'
+                  f"{legacy_s / parser_s:>8.1f}x  {'same' if legacy_text == parser_text else 'DIFFERENT'}")
+
+
+if __name__ == '__main__':
+    main()
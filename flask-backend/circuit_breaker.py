@@ -0,0 +1,257 @@
+"""
+Provider Circuit Breakers for Samadhan AI
+========================================
+
+A degraded WatsonX or OpenRouter used to cost every request its full
+static timeout (60 s / 30 s) before the fallback ran, so an outage
+multiplied latency for everyone. Each provider now has a CircuitBreaker:
+
+  closed     calls go through; outcomes fill a rolling window, and a
+             failure rate above the threshold (once the window holds
+             min_calls outcomes) opens the breaker
+  open       calls fail fast with CircuitOpenError, so callers move
+             straight to the next tier
+  half_open  after open_seconds a single trial call (the background probe,
+             or whichever request comes first) decides: success closes,
+             failure re-opens
+
+Timeouts come from the same window: a percentile of recent successful
+latencies times a headroom multiplier, clamped to [min_timeout,
+max_timeout] (max_timeout until enough samples exist), so a provider whose
+latency drifts far past its normal range times out, counts as a failure and
+trips the breaker long before the static timeout.
+
+provider_retry() wraps a provider call in tenacity's jittered exponential
+backoff for transient errors (connection failures, 429 and 5xx), within a
+time budget so a slow failure is not repeated.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+try:
+    from tenacity import retry, retry_if_exception, stop_after_attempt, stop_after_delay, wait_random_exponential
+    TENACITY_AVAILABLE = True
+except ImportError:
+    TENACITY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """The provider's breaker is open; fail fast to the next tier"""
+
+
+class ProviderError(Exception):
+    """The provider answered, but not with a usable response"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        # Other 4xx mean our request (key, prompt) is wrong; retrying or blaming the provider won't help
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def counts_as_failure(error: Exception) -> bool:
+    """Whether an exception says something about the provider's health"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, ProviderError):
+        return error.retryable
+    return True
+
+
+class CallTimer:
+    """Handed to a guarded call; mark first_byte() when latency should stop counting (streams)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_byte_at = None
+
+    def first_byte(self):
+        if self.first_byte_at is None:
+            self.first_byte_at = time.perf_counter()
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker with a rolling outcome and latency window"""
+
+    def __init__(self, name: str, max_timeout: float, min_timeout: float = 5.0, window: int = 50,
+                 min_calls: int = 10, failure_rate: float = 0.5, open_seconds: float = 30.0,
+                 timeout_percentile: float = 99.0, timeout_multiplier: float = 3.0,
+                 probe: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.probe = probe
+        self._outcomes = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._generation = 0  # bumped on every transition; calls admitted earlier don't count afterwards
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._prober: Optional[threading.Thread] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_opened = None
+
+    def _transition(self, state: str):
+        # Caller holds the lock
+        self._state = state
+        self._generation += 1
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self._outcomes.clear()
+            self.times_opened += 1
+            self.last_opened = datetime.now().isoformat()
+            logger.warning(f'⚠️ {self.name} circuit opened, failing fast for {self.open_seconds:.0f}s')
+            if self.probe and (self._prober is None or not self._prober.is_alive()):
+                self._prober = threading.Thread(target=self._probe_loop, name=f'samadhan-probe-{self.name}',
+                                                daemon=True)
+                self._prober.start()
+        elif state == CLOSED:
+            self._outcomes.clear()
+            logger.info(f'✅ {self.name} circuit closed')
+
+    def _refresh(self):
+        # Caller holds the lock
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _admit(self) -> Tuple[int, bool]:
+        """(generation, is_trial) for an admitted call, or CircuitOpenError"""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return self._generation, False
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return self._generation, True
+            self.rejected += 1
+            state = self._state
+        raise CircuitOpenError(f'{self.name} circuit is {state}')
+
+    def _finish(self, generation: int, is_trial: bool, ok: Optional[bool], latency: Optional[float]):
+        with self._lock:
+            if is_trial:
+                self._trial_in_flight = False
+            if latency is not None:
+                self._latencies.append(latency)
+            if ok is None or generation != self._generation:
+                return
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED if ok else OPEN)
+            elif self._state == CLOSED:
+                self._outcomes.append(ok)
+                failures = self._outcomes.count(False)
+                if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                    self._transition(OPEN)
+
+    @contextmanager
+    def guard(self) -> Iterator[CallTimer]:
+        """Admit one provider call (or raise CircuitOpenError) and record how it went"""
+        generation, is_trial = self._admit()
+        timer = CallTimer()
+        ok, latency = None, None
+        try:
+            yield timer
+            ok = True
+            latency = (timer.first_byte_at or time.perf_counter()) - timer.started
+        except Exception as e:
+            ok = not counts_as_failure(e)
+            raise
+        finally:
+            # ok stays None when the call was cancelled (hedge lost, client went away)
+            self._finish(generation, is_trial, ok, latency)
+
+    def timeout(self) -> float:
+        """Request timeout from recent successful latencies"""
+        with self._lock:
+            if len(self._latencies) < self.min_calls:
+                return float(self.max_timeout)
+            samples = np.fromiter(self._latencies, dtype=np.float64)
+        timeout = np.percentile(samples, self.timeout_percentile) * self.timeout_multiplier
+        return float(np.clip(timeout, self.min_timeout, self.max_timeout))
+
+    def _probe_loop(self):
+        """While not closed, try the probe call each time the breaker half-opens"""
+        while True:
+            with self._lock:
+                self._refresh()
+                if self._state == CLOSED:
+                    return
+                if self._state == OPEN:
+                    wait = self._opened_at + self.open_seconds - time.monotonic()
+                else:
+                    # Half-open: probe unless a real request holds the trial slot, then check back shortly
+                    wait = 1.0 if self._trial_in_flight else 0.0
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            try:
+                self.probe()
+            except CircuitOpenError:
+                pass
+            except Exception as e:
+                logger.warning(f'⚠️ {self.name} probe failed: {e}')
+            with self._lock:
+                # A probe that never reached guard() (e.g. served from a cache) leaves it half-open; don't spin
+                idle = self._state == HALF_OPEN and not self._trial_in_flight
+            if idle:
+                time.sleep(1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        timeout = self.timeout()
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                'state': state,
+                'window_calls': calls,
+                'failure_rate': self._outcomes.count(False) / calls if calls else None,
+                'timeout_seconds': round(timeout, 2),
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'last_opened': self.last_opened
+            }
+
+
+def provider_retry(attempts: int, connection_errors: Tuple[type, ...], budget_seconds: float = 5.0) -> Callable:
+    """Jittered exponential backoff for transient provider errors (no-op without tenacity or with attempts <= 1)
+    
+    No retry starts once budget_seconds have passed since the first attempt.
+    """
+    if not TENACITY_AVAILABLE or attempts <= 1:
+        return lambda fn: fn
+
+    def transient(error: BaseException) -> bool:
+        return isinstance(error, connection_errors) or (isinstance(error, ProviderError) and error.retryable)
+
+    return retry(retry=retry_if_exception(transient), wait=wait_random_exponential(multiplier=0.25, max=2.0),
+                 stop=stop_after_attempt(attempts) | stop_after_delay(budget_seconds), reraise=True)
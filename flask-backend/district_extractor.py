@@ -0,0 +1,214 @@
+"""
+Offline District Extractor for Samadhan AI
+=========================================
+
+District routing (DM contact, collectorate) used to depend on the LLM
+filling a "district" JSON field, so none of the local tiers ever had a
+district. This module finds the district in the complaint itself with no
+network call.
+
+Every district of DISTRICTS_DATASET['all_districts'] is compiled, along
+with its Hindi spelling, renamed / alternate names (Prayagraj, Ayodhya,
+Noida, Banaras...) and common misspellings, into one whole-word
+KeywordAutomaton. Matching runs on the same transliterated spelling
+skeleton as the Hindi normalizer, so Devanagari, romanized and misspelled
+names (Muzzafarnagar, Gaziabad, Lakhnau) meet in one pass.
+
+Names that are also everyday Hindi words (Banda, Basti) only count next to
+a district cue such as "district", "jila" or "janpad". So do the uppercase
+district codes (LKO, GKP: "district LKO", "GKP dist."), matched
+separately and case-sensitively; bare, many of them (AUR, DOR, ETH, MAU)
+are ordinary words or acronyms.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from keyword_engine import KeywordAutomaton, normalize_keyword
+from text_normalizer import skeleton, transliterate
+
+# Hindi spellings, renamed districts and frequent misspellings (either script)
+DISTRICT_ALIASES: Dict[str, List[str]] = {
+    'Agra': ['आगरा'],
+    'Aligarh': ['अलीगढ़', 'अलीगढ'],
+    'Allahabad': ['Prayagraj', 'Prayag', 'Ilahabad', 'Allahbad', 'इलाहाबाद', 'प्रयागराज'],
+    'Ambedkar Nagar': ['अम्बेडकर नगर', 'अंबेडकर नगर'],
+    'Amethi': ['अमेठी', 'Chhatrapati Shahuji Maharaj Nagar'],
+    'Amroha': ['अमरोहा', 'Jyotiba Phule Nagar', 'JP Nagar'],
+    'Auraiya': ['औरैया', 'Auraia'],
+    'Azamgarh': ['आज़मगढ़', 'आजमगढ़'],
+    'Baghpat': ['बागपत', 'Bagpat'],
+    'Bahraich': ['बहराइच', 'Baharaich'],
+    'Ballia': ['बलिया', 'Baliya'],
+    'Balrampur': ['बलरामपुर'],
+    'Banda': ['बांदा', 'बाँदा'],
+    'Barabanki': ['बाराबंकी', 'Bara Banki'],
+    'Bareilly': ['बरेली', 'Bareli', 'Barelly'],
+    'Basti': ['बस्ती'],
+    'Bhadohi': ['भदोही', 'Sant Ravidas Nagar'],
+    'Bijnor': ['बिजनौर'],
+    'Budaun': ['बदायूं', 'बदायूँ', 'Badaun'],
+    'Bulandshahr': ['बुलंदशहर', 'Bulandshahar'],
+    'Chandauli': ['चंदौली'],
+    'Chitrakoot': ['चित्रकूट', 'Chitrakut'],
+    'Deoria': ['देवरिया', 'Devria'],
+    'Etah': ['एटा'],
+    'Etawah': ['इटावा', 'Itawa'],
+    'Faizabad': ['Ayodhya', 'फैजाबाद', 'फ़ैज़ाबाद', 'अयोध्या'],
+    'Farrukhabad': ['फर्रुखाबाद', 'Farukhabad'],
+    'Fatehpur': ['फतेहपुर'],
+    'Firozabad': ['फिरोजाबाद', 'फ़िरोज़ाबाद', 'Ferozabad'],
+    'Gautam Buddha Nagar': ['Noida', 'Greater Noida', 'GB Nagar', 'गौतम बुद्ध नगर', 'नोएडा'],
+    'Ghaziabad': ['गाजियाबाद', 'ग़ाज़ियाबाद', 'Gaziabad'],
+    'Ghazipur': ['गाजीपुर', 'ग़ाज़ीपुर', 'Gazipur'],
+    'Gonda': ['गोंडा'],
+    'Gorakhpur': ['गोरखपुर', 'Gorakpur'],
+    'Hamirpur': ['हमीरपुर'],
+    'Hapur': ['हापुड़', 'Hapud', 'Panchsheel Nagar'],
+    'Hardoi': ['हरदोई'],
+    'Hathras': ['हाथरस', 'Mahamaya Nagar'],
+    'Jalaun': ['जालौन', 'Orai'],
+    'Jaunpur': ['जौनपुर'],
+    'Jhansi': ['झांसी', 'झाँसी'],
+    'Kannauj': ['कन्नौज', 'Kanauj'],
+    'Kanpur Dehat': ['कानपुर देहात'],
+    'Kanpur Nagar': ['Kanpur', 'Cawnpore', 'कानपुर', 'कानपुर नगर'],
+    'Kasganj': ['कासगंज', 'Kanshiram Nagar'],
+    'Kaushambi': ['कौशांबी', 'कौशाम्बी'],
+    'Kheri': ['Lakhimpur', 'Lakhimpur Kheri', 'खीरी', 'लखीमपुर', 'लखीमपुर खीरी'],
+    'Kushinagar': ['कुशीनगर', 'Padrauna'],
+    'Lalitpur': ['ललितपुर'],
+    'Lucknow': ['लखनऊ', 'Lakhnau', 'Lucknaw'],
+    'Maharajganj': ['महाराजगंज', 'Mahrajganj'],
+    'Mahoba': ['महोबा'],
+    'Mainpuri': ['मैनपुरी'],
+    'Mathura': ['मथुरा'],
+    'Mau': ['मऊ'],
+    'Meerut': ['मेरठ', 'Merath', 'Merut'],
+    'Mirzapur': ['मिर्जापुर', 'मिर्ज़ापुर'],
+    'Moradabad': ['मुरादाबाद', 'Muradabad'],
+    'Muzaffarnagar': ['मुजफ्फरनगर', 'मुज़फ़्फ़रनगर', 'Mujaffarnagar'],
+    'Pilibhit': ['पीलीभीत'],
+    'Pratapgarh': ['प्रतापगढ़'],
+    'Raebareli': ['रायबरेली', 'Rae Bareli', 'Rae Bareilly', 'Raibareli'],
+    'Rampur': ['रामपुर'],
+    'Saharanpur': ['सहारनपुर'],
+    'Sambhal': ['संभल', 'Bhim Nagar'],
+    'Sant Kabir Nagar': ['संत कबीर नगर', 'Khalilabad'],
+    'Shahjahanpur': ['शाहजहांपुर', 'शाहजहाँपुर', 'Shahjanpur'],
+    'Shamli': ['शामली', 'Prabuddh Nagar'],
+    'Shravasti': ['श्रावस्ती', 'Sravasti'],
+    'Siddharthnagar': ['सिद्धार्थनगर', 'सिद्धार्थ नगर'],
+    'Sitapur': ['सीतापुर'],
+    'Sonbhadra': ['सोनभद्र', 'Sonebhadra'],
+    'Sultanpur': ['सुल्तानपुर'],
+    'Unnao': ['उन्नाव'],
+    'Varanasi': ['Banaras', 'Benares', 'Kashi', 'वाराणसी', 'बनारस', 'काशी']
+}
+
+# District names that are also everyday Hindi words, matched only next to a district cue
+AMBIGUOUS_DISTRICTS = {'Banda', 'Basti'}
+DISTRICT_CUES = ['district', 'dist', 'jila', 'zila', 'jilla', 'janpad', 'जिला', 'जनपद']
+
+
+class DistrictMatch:
+    """One district mention: canonical all_districts name, the spelling found and where"""
+
+    def __init__(self, district: str, spelling: str, position: int):
+        self.district = district
+        self.spelling = spelling
+        self.position = position
+
+
+class DistrictExtractor:
+    """All district spellings and codes of the gazetteer, found in one pass"""
+
+    def __init__(self, all_districts: Dict[str, Dict[str, Any]], major_districts: Dict[str, Dict[str, Any]],
+                 aliases: Optional[Dict[str, List[str]]] = None):
+        self.all_districts = all_districts
+        self.major_districts = major_districts
+        aliases = DISTRICT_ALIASES if aliases is None else aliases
+
+        keywords: List[Tuple[str, str]] = []
+        for district in all_districts:
+            spellings = [district] + aliases.get(district, [])
+            # "Siddharth Nagar" / "Siddharthnagar": both ways of writing a compound name
+            spellings += [spelling.replace(' ', '') for spelling in spellings if ' ' in spelling]
+            spellings += [re.sub(r'(?<=\w)nagar$', ' nagar', spelling.lower()) for spelling in spellings]
+            for spelling in spellings:
+                form = skeleton(transliterate(spelling))
+                if district in AMBIGUOUS_DISTRICTS:
+                    for cue in DISTRICT_CUES:
+                        cue = skeleton(transliterate(cue))
+                        keywords += [(f'{form} {cue}', district), (f'{cue} {form}', district)]
+                else:
+                    keywords.append((form, district))
+        self.automaton = KeywordAutomaton.build(keywords, whole_words=True)
+
+        self.codes = {info['code']: district for district, info in all_districts.items() if info.get('code')}
+        codes = '|'.join(sorted(self.codes))
+        cues = '|'.join(sorted(map(re.escape, DISTRICT_CUES), key=len, reverse=True))
+        # Lookarounds rather than \b: Devanagari cues end in a vowel sign, which \b does not treat as a letter
+        self.code_pattern = re.compile(rf'(?<!\w)(?i:{cues})\.?[\s:-]*({codes})(?!\w)'
+                                       rf'|(?<!\w)({codes})[\s.-]*(?i:{cues})(?!\w)')
+
+        # all_districts name -> major_districts key ("Kanpur Nagar" -> "Kanpur")
+        self.major_names = {}
+        for district in all_districts:
+            for name in major_districts:
+                if district in (name, f'{name} Nagar'):
+                    self.major_names[district] = name
+
+    @classmethod
+    def from_dataset(cls) -> 'DistrictExtractor':
+        from samadhan_dataset.districts import DISTRICTS_DATASET
+        return cls(DISTRICTS_DATASET['all_districts'], DISTRICTS_DATASET['major_districts'])
+
+    def find_all(self, text: str) -> List[DistrictMatch]:
+        """Every district name mention, then every code; a name inside a longer one (Bareli in Rae Bareli) is dropped"""
+        found = []
+        covered = 0
+        folded = skeleton(transliterate(text))
+        for match in self.automaton.pattern.finditer(folded):
+            spelling = match.group(1)
+            if match.start() < covered:
+                continue
+            covered = match.start() + len(spelling)
+            for district in self.automaton.labels[normalize_keyword(spelling)]:
+                found.append(DistrictMatch(district, spelling, match.start()))
+
+        for match in self.code_pattern.finditer(text):
+            group = 1 if match.group(1) else 2
+            found.append(DistrictMatch(self.codes[match.group(group)], match.group(group), match.start(group)))
+        return found
+
+    def extract(self, text: str) -> Optional[str]:
+        """Most mentioned district (earliest mention breaks ties), or None"""
+        counts: Dict[str, List[int]] = {}
+        for match in self.find_all(text):
+            counts.setdefault(match.district, []).append(match.position)
+        if not counts:
+            return None
+        return max(counts, key=lambda district: (len(counts[district]), -min(counts[district])))
+
+    def district_info(self, name: str) -> Dict[str, Any]:
+        """Gazetteer entry plus DM / collectorate contacts for a district name in any spelling"""
+        district = name if name in self.all_districts else self.extract(name)
+        if not district:
+            return {}
+        info = {'district': district, **self.all_districts[district]}
+        major_name = self.major_names.get(district)
+        if major_name:
+            info.update(self.major_districts[major_name])
+        return info
+
+
+_default_extractor = None
+
+
+def get_district_extractor() -> DistrictExtractor:
+    """Process-wide extractor built from the Samadhan AI dataset on first use"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = DistrictExtractor.from_dataset()
+    return _default_extractor
@@ -0,0 +1,113 @@
+"""
+Query Embedding Cache for Samadhan AI
+====================================
+
+Bounded LRU + TTL cache in front of the sentence encoder. Keys are a
+normalized form of the complaint text so resubmissions that differ only in
+case, spacing, Unicode form or digit script share one embedding.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from embedding_store import normalize_rows
+
+# Devanagari digits ०-९ -> ASCII 0-9
+DEVANAGARI_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_complaint_text(text: str) -> str:
+    """NFKC, case-fold, unify Devanagari digits and collapse whitespace"""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = text.casefold().translate(DEVANAGARI_DIGITS)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of normalized query embeddings with a TTL"""
+
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            vector, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)  # shared between requests
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class CachedEncoder:
+    """Encode complaints through the cache; misses are encoded together in one batch"""
+
+    def __init__(self, model, cache: EmbeddingCache):
+        self.model = model
+        self.cache = cache
+
+    def encode(self, texts: List[str], store: bool = True) -> np.ndarray:
+        """Return L2-normalized float32 embeddings, one row per text (store=False: read the cache, don't fill it)"""
+        keys = [normalize_complaint_text(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [self.cache.get(key) for key in keys]
+
+        # Encode the normalized key so every variant of a text maps to the same vector
+        missing = list(dict.fromkeys(key for key, vector in zip(keys, vectors) if vector is None))
+        if missing:
+            encoded = dict(zip(missing, normalize_rows(self.model.encode(missing))))
+            if store:
+                for key, vector in encoded.items():
+                    self.cache.put(key, vector)
+            vectors = [encoded[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+        return np.vstack(vectors)
@@ -0,0 +1,205 @@
+"""
+Persistent Document Embedding Store for Samadhan AI
+==================================================
+
+Embeds the RAG training corpus once, saves it as a normalized float32 matrix
+alongside a content hash of the documents, and memory-maps it on startup so
+each request only has to encode the complaint and run one matrix-vector product.
+
+The store can also be kept as float16 or as int8 codes with one float32 scale
+per vector. Files are memory-mapped read-only, so every gunicorn worker maps
+the same page-cache pages instead of holding a private copy, and scoring
+reads the quantized rows directly in bounded blocks.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / '.cache' / 'embeddings'
+
+STORE_DTYPES = ('float32', 'float16', 'int8')
+
+# Rows dequantized per block while scoring, bounds the temporary float32 buffer
+SCORE_BLOCK_ROWS = 32768
+
+
+def compute_corpus_hash(documents: List[Any], model_name: str) -> str:
+    """Hash document contents, metadata and model name into a cache key"""
+    hasher = hashlib.sha256()
+    hasher.update(model_name.encode('utf-8'))
+    for doc in documents:
+        payload = json.dumps(
+            {'content': doc.page_content, 'metadata': doc.metadata},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        hasher.update(payload.encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_rows(matrix: np.ndarray, dtype: str):
+    """Quantize normalized rows; returns (codes, scales) where scales is None unless int8"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if dtype == 'float32':
+        return matrix, None
+    if dtype == 'float16':
+        return matrix.astype(np.float16), None
+    if dtype == 'int8':
+        # Symmetric per-vector scale: row ~= codes * scale
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f'Unsupported embedding dtype: {dtype}')
+
+
+def score_matrix(vectors: np.ndarray, queries: np.ndarray, scales: Optional[np.ndarray] = None,
+                 block_rows: int = SCORE_BLOCK_ROWS) -> np.ndarray:
+    """Inner products (n_queries x n_vectors) against float32, float16 or int8 rows"""
+    if vectors.dtype == np.float32 and scales is None:
+        return queries @ np.asarray(vectors).T
+
+    scores = np.empty((queries.shape[0], vectors.shape[0]), dtype=np.float32)
+    for start in range(0, vectors.shape[0], block_rows):
+        block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+        block_scores = queries @ block.T
+        if scales is not None:
+            block_scores *= scales[start:start + block_rows]
+        scores[:, start:start + block.shape[0]] = block_scores
+    return scores
+
+
+class EmbeddingStore:
+    """Read-only, normalized document embeddings backed by memory-mapped .npy files"""
+
+    def __init__(self, embeddings: np.ndarray, documents: List[Any], content_hash: str,
+                 scales: Optional[np.ndarray] = None):
+        self.embeddings = embeddings
+        self.scales = scales
+        self.documents = documents
+        self.content_hash = content_hash
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.embeddings.shape[1])
+
+    @property
+    def dtype(self) -> str:
+        return 'int8' if self.scales is not None else str(self.embeddings.dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.embeddings.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    @classmethod
+    def load_or_build(cls, model, documents: List[Any], model_name: str,
+                      cache_dir: Optional[str] = None, dtype: str = 'float32') -> 'EmbeddingStore':
+        """Memory-map the cached matrix if the corpus hash matches, otherwise rebuild it"""
+        if dtype not in STORE_DTYPES:
+            raise ValueError(f'Unsupported embedding dtype: {dtype}')
+        cache_path = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        content_hash = compute_corpus_hash(documents, model_name)
+        model_slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        base_name = f'{model_slug}-{content_hash[:16]}'
+
+        loaded = cls._load_matrix(cache_path, base_name, dtype, content_hash, len(documents))
+        if loaded is None:
+            # float32 is the master copy; quantized stores are derived from it
+            master = cls._load_matrix(cache_path, base_name, 'float32', content_hash, len(documents))
+            if master is None:
+                logger.info(f'🔄 Embedding {len(documents)} RAG documents (cache miss)...')
+                texts = [doc.page_content for doc in documents]
+                matrix = normalize_rows(model.encode(texts, batch_size=64, show_progress_bar=False))
+                cls._save_matrix(cache_path, base_name, 'float32', matrix, None, content_hash, model_name)
+            else:
+                matrix = np.asarray(master[0])
+            if dtype != 'float32':
+                codes, scales = quantize_rows(matrix, dtype)
+                cls._save_matrix(cache_path, base_name, dtype, codes, scales, content_hash, model_name)
+            loaded = cls._load_matrix(cache_path, base_name, dtype, content_hash, len(documents))
+            logger.info(f'✅ Document embeddings ({dtype}) saved to {cache_path / base_name}')
+        else:
+            logger.info(f'✅ Document embeddings ({dtype}) memory-mapped from {cache_path / base_name}')
+
+        embeddings, scales = loaded
+        return cls(embeddings, documents, content_hash, scales)
+
+    @staticmethod
+    def _paths(cache_path: Path, base_name: str, dtype: str):
+        # float32 keeps the unsuffixed name so existing caches stay valid
+        stem = base_name if dtype == 'float32' else f'{base_name}.{dtype}'
+        return (cache_path / f'{stem}.npy', cache_path / f'{stem}.scales.npy', cache_path / f'{stem}.json')
+
+    @classmethod
+    def _load_matrix(cls, cache_path: Path, base_name: str, dtype: str, content_hash: str,
+                     expected_rows: int) -> Optional[tuple]:
+        matrix_file, scales_file, meta_file = cls._paths(cache_path, base_name, dtype)
+        if not (matrix_file.exists() and meta_file.exists()):
+            return None
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('content_hash') != content_hash or meta.get('dtype', 'float32') != dtype:
+                return None
+            embeddings = np.load(matrix_file, mmap_mode='r')
+            if embeddings.dtype != np.dtype(dtype) or embeddings.shape[0] != expected_rows:
+                return None
+            scales = np.load(scales_file, mmap_mode='r') if dtype == 'int8' else None
+            return embeddings, scales
+        except Exception as e:
+            logger.warning(f'⚠️ Ignoring unreadable embedding cache {matrix_file}: {e}')
+            return None
+
+    @classmethod
+    def _save_matrix(cls, cache_path: Path, base_name: str, dtype: str, matrix: np.ndarray,
+                     scales: Optional[np.ndarray], content_hash: str, model_name: str):
+        matrix_file, scales_file, meta_file = cls._paths(cache_path, base_name, dtype)
+        cache_path.mkdir(parents=True, exist_ok=True)
+        # Write to temp files and rename so concurrent workers never read a partial file
+        pid = os.getpid()
+        tmp_matrix = matrix_file.with_name(f'{matrix_file.stem}.{pid}.tmp.npy')
+        tmp_meta = meta_file.with_name(f'{meta_file.stem}.{pid}.tmp.json')
+        np.save(tmp_matrix, np.ascontiguousarray(matrix))
+        if scales is not None:
+            tmp_scales = scales_file.with_name(f'{scales_file.stem}.{pid}.tmp.npy')
+            np.save(tmp_scales, np.ascontiguousarray(scales, dtype=np.float32))
+            os.replace(tmp_scales, scales_file)
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump({
+                'content_hash': content_hash,
+                'model_name': model_name,
+                'rows': int(matrix.shape[0]),
+                'dimension': int(matrix.shape[1]),
+                'dtype': dtype,
+                'normalized': True
+            }, f, indent=2)
+        os.replace(tmp_matrix, matrix_file)
+        os.replace(tmp_meta, meta_file)
+
+    def similarities(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity of one query against every document"""
+        return score_matrix(self.embeddings, normalize_rows(query_embedding), self.scales)[0]
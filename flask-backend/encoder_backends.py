@@ -0,0 +1,216 @@
+"""
+Pluggable Sentence Encoder Backends for Samadhan AI
+==================================================
+
+- torch: sentence-transformers on PyTorch (default, downloads the model)
+- onnx:  the same transformer exported to ONNX and served by onnxruntime,
+         optionally with dynamic int8 weight quantization. Serving only needs
+         onnxruntime + tokenizers, so PyTorch is never imported.
+
+The ONNX path reproduces the sentence-transformers pipeline (tokenize with
+the same truncation, mean/CLS pooling, optional L2 normalization), so its
+embeddings are interchangeable with the PyTorch path.
+
+Usage:
+    python encoder_backends.py export --model all-MiniLM-L6-v2 --quantize
+"""
+
+import argparse
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_RUNTIME_AVAILABLE = (importlib.util.find_spec('onnxruntime') is not None
+                          and importlib.util.find_spec('tokenizers') is not None)
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec('sentence_transformers') is not None
+
+DEFAULT_ONNX_DIR = Path(__file__).resolve().parent / '.cache' / 'onnx'
+ONNX_CONFIG_FILE = 'encoder_config.json'
+FP32_MODEL_FILE = 'model.onnx'
+INT8_MODEL_FILE = 'model.int8.onnx'
+
+
+def default_onnx_dir(model_name: str) -> Path:
+    return DEFAULT_ONNX_DIR / re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+
+
+def export_onnx(model_name: str, out_dir: Optional[str] = None, quantize: bool = False,
+                opset: int = 14) -> Path:
+    """Export a sentence-transformers model's transformer to ONNX (needs torch)"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    target = Path(out_dir) if out_dir else default_onnx_dir(model_name)
+    st_model = SentenceTransformer(model_name, device='cpu')
+    transformer = st_model[0]
+    pooling = next((m for m in st_model if type(m).__name__ == 'Pooling'), None)
+    normalize = any(type(m).__name__ == 'Normalize' for m in st_model)
+    if pooling is None:
+        pooling_mode = 'mean'
+    elif hasattr(pooling, 'get_pooling_mode_str'):
+        pooling_mode = pooling.get_pooling_mode_str()
+    else:
+        pooling_mode = getattr(pooling, 'pooling_mode', 'mean')
+    if pooling_mode not in ('mean', 'cls'):
+        raise ValueError(f'Unsupported pooling mode for ONNX export: {pooling_mode}')
+    tokenizer = transformer.tokenizer
+    hf_model = transformer.auto_model.eval()
+
+    dummy = tokenizer(['Street lights not working'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in dummy]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    class LastHiddenState(torch.nn.Module):
+        """Call the transformer by keyword; positional order differs across transformers versions"""
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    # Build in a temp dir and swap in, so a worker never sees a half-written export
+    tmp_dir = Path(tempfile.mkdtemp(prefix='onnx-export-', dir=target.parent if target.parent.exists() else None))
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs['dynamo'] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(hf_model),
+            tuple(dummy[name] for name in input_names),
+            str(tmp_dir / FP32_MODEL_FILE),
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            **export_kwargs
+        )
+    tokenizer.save_pretrained(str(tmp_dir))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(tmp_dir / FP32_MODEL_FILE), str(tmp_dir / INT8_MODEL_FILE),
+                         weight_type=QuantType.QInt8)
+
+    with open(tmp_dir / ONNX_CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_name': model_name,
+            'input_names': input_names,
+            'max_seq_length': int(st_model.max_seq_length),
+            'pooling': pooling_mode,
+            'normalize': normalize,
+            'pad_token': tokenizer.pad_token,
+            'pad_token_id': int(tokenizer.pad_token_id),
+            'quantized': quantize
+        }, f, indent=2)
+
+    if target.exists():
+        shutil.rmtree(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_dir, target)
+    logger.info(f'✅ Exported {model_name} to ONNX at {target}')
+    return target
+
+
+class OnnxEncoder:
+    """encode(texts) served by onnxruntime with a pinned intra-op thread count"""
+
+    def __init__(self, model_dir: str, quantized: bool = False, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        root = Path(model_dir)
+        with open(root / ONNX_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        model_file = root / (INT8_MODEL_FILE if quantized else FP32_MODEL_FILE)
+        if not model_file.exists():
+            raise FileNotFoundError(f'{model_file} not found; run `python encoder_backends.py export`')
+
+        self.tokenizer = Tokenizer.from_file(str(root / 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.config['max_seq_length'])
+        self.tokenizer.enable_padding(pad_id=self.config['pad_token_id'], pad_token=self.config['pad_token'])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(model_file), options, providers=['CPUExecutionProvider'])
+        self.input_names = self.config['input_names']
+        self.quantized = quantized
+        self.max_seq_length = self.config['max_seq_length']
+        logger.info(f"✅ ONNX encoder loaded ({model_file.name}, threads={num_threads or 'auto'})")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        hidden = self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+
+        if self.config['pooling'] == 'cls':
+            pooled = hidden[:, 0]
+        else:
+            mask = feeds['attention_mask'][:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.config['normalize']:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Same call shape as SentenceTransformer.encode for the arguments this app uses"""
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size)[0]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([self._encode_batch(list(texts[i:i + batch_size]))
+                          for i in range(0, len(texts), batch_size)])
+
+
+def load_encoder(backend: str, model_name: str, onnx_dir: Optional[str] = None,
+                 quantized: bool = False, num_threads: Optional[int] = None):
+    """Load the configured encoder backend"""
+    if backend == 'onnx':
+        return OnnxEncoder(onnx_dir or str(default_onnx_dir(model_name)), quantized, num_threads)
+    if backend == 'torch':
+        from sentence_transformers import SentenceTransformer
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        return SentenceTransformer(model_name)
+    raise ValueError(f'Unknown encoder backend: {backend}')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Export the Samadhan AI sentence encoder to ONNX')
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export', help='Export (and optionally int8-quantize) a sentence-transformers model')
+    export.add_argument('--model', default=os.getenv('SENTENCE_MODEL_NAME', 'all-MiniLM-L6-v2'))
+    export.add_argument('--out', help='Output directory (default .cache/onnx/<model>)')
+    export.add_argument('--quantize', action='store_true', help='Also write a dynamic int8 model')
+    export.add_argument('--opset', type=int, default=14)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    target = export_onnx(args.model, args.out, args.quantize, args.opset)
+    print(f'✅ ONNX encoder written to {target}')
+
+
+if __name__ == '__main__':
+    main()
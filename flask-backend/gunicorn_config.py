@@ -1,3 +1,45 @@
+import os
+
 bind = "0.0.0.0:10000"
 workers = 2
 timeout = 120
+
+# GUNICORN_PRELOAD=true loads the sentence model and embedding indexes once in the
+# master so workers share those pages copy-on-write. Warm-up then has to finish
+# before forking, because background threads do not survive fork. Without
+# preload, each worker warms up in a background thread and /ready gates traffic.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+if preload_app:
+    os.environ['WARMUP_MODE'] = 'sync'
+
+# SERVING_MODE=async runs asgi:application on uvicorn workers, one event loop per
+# worker, so in-flight LLM calls no longer hold a worker each. The app is chosen
+# here, so start commands must not pass one: a positional app:app overrides wsgi_app.
+if os.getenv('SERVING_MODE', 'sync') == 'async':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'asgi:application'
+else:
+    wsgi_app = 'app:app'
+
+
+def when_ready(server):
+    """With preload, warm up once in the master before any worker is forked"""
+    if preload_app:
+        from app import start_warmup
+        start_warmup('sync')
+
+
+def post_fork(server, worker):
+    """With preload, pre-warm provider connections and start the IAM token refresher in each worker
+    (pooled sockets and threads are per process)"""
+    if preload_app:
+        import threading
+        from app import iam_tokens, prewarm_provider_connections
+        threading.Thread(target=prewarm_provider_connections, name='samadhan-prewarm', daemon=True).start()
+        iam_tokens.start()
+
+
+def post_worker_init(worker):
+    """Warm up each worker once it has loaded the app (no-op when the preloaded master already did)"""
+    from app import start_warmup
+    start_warmup()
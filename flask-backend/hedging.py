@@ -0,0 +1,78 @@
+"""
+Hedged Response Generation for Samadhan AI
+=========================================
+
+generate_ai_response fell back to OpenRouter only after WatsonX had failed,
+and a stalled WatsonX stream takes its full 60 s timeout to fail. With
+hedging on, OpenRouter is fired as soon as WatsonX has gone longer than
+its usual time to first token without producing one; whichever provider
+completes first answers and the other is cancelled.
+
+HedgePolicy tracks WatsonX's recent time-to-first-token to set the hedge
+delay (a percentile of the window, clamped, with a fixed delay until enough
+samples exist) and counts hedges and wins, so the delay can be tuned
+against the extra OpenRouter calls it costs.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict
+
+import numpy as np
+
+PRIMARY = 'primary'
+SECONDARY = 'secondary'
+
+
+class HedgePolicy:
+    """Hedge delay from the primary's time-to-first-token percentile, plus outcome counters"""
+
+    def __init__(self, percentile: float = 95.0, initial_delay_ms: float = 2000.0, min_delay_ms: float = 250.0,
+                 max_delay_ms: float = 10000.0, window: int = 200, min_samples: int = 20):
+        self.percentile = percentile
+        self.initial_delay_ms = initial_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.min_samples = min_samples
+        self._first_token_ms = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.wins = {PRIMARY: 0, SECONDARY: 0}
+        self.failed = 0
+
+    def record_first_token(self, elapsed_ms: float):
+        with self._lock:
+            self._first_token_ms.append(elapsed_ms)
+
+    def delay_ms(self) -> float:
+        """How long to wait for the primary's first token before firing the secondary"""
+        with self._lock:
+            if len(self._first_token_ms) < self.min_samples:
+                return self.initial_delay_ms
+            samples = np.fromiter(self._first_token_ms, dtype=np.float64)
+        return float(np.clip(np.percentile(samples, self.percentile), self.min_delay_ms, self.max_delay_ms))
+
+    def record(self, hedged: bool, winner: str = None):
+        """One request; winner is PRIMARY, SECONDARY or None when both providers failed"""
+        with self._lock:
+            self.requests += 1
+            self.hedged += hedged
+            if winner:
+                self.wins[winner] += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        delay = self.delay_ms()
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedged': self.hedged,
+                'hedge_rate': self.hedged / self.requests if self.requests else None,
+                'primary_wins': self.wins[PRIMARY],
+                'secondary_wins': self.wins[SECONDARY],
+                'failed': self.failed,
+                'delay_ms': round(delay, 1),
+                'first_token_samples': len(self._first_token_ms)
+            }
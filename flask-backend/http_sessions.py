@@ -0,0 +1,136 @@
+"""
+Pooled Provider Sessions for Samadhan AI
+=======================================
+
+Every WatsonX, IAM and OpenRouter call used the module-level requests.post,
+which opens (and then drops) a new TCP connection and TLS session per call,
+so one chat request paid two or more handshakes before any bytes of the
+prompt left the worker.
+
+ProviderSessions keeps one requests.Session per provider and process, each
+with its own keep-alive connection pool (HTTPAdapter pool size tuned to the
+worker's concurrency, TCP keep-alive probes so idle pooled connections
+survive NAT and load balancer idle timers). Sessions are created lazily and
+recreated after a fork, so a gunicorn worker never shares a socket with
+the master. prewarm() opens pooled connections at boot so the first
+complaint does not pay the handshakes either.
+"""
+
+import logging
+import os
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_MAXSIZE = 10
+
+# Probe idle pooled connections so middleboxes keep them open (Linux option names where available)
+KEEPALIVE_SOCKET_OPTIONS: List[Tuple[int, int, int]] = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+]
+for _name, _value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+    if hasattr(socket, _name):
+        KEEPALIVE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, getattr(socket, _name), _value))
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections set TCP keep-alive socket options"""
+
+    def __init__(self, socket_options: Optional[List[Tuple[int, int, int]]] = None, **kwargs):
+        # Set before HTTPAdapter.__init__, which builds the pool manager
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.socket_options is not None:
+            kwargs['socket_options'] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class ProviderSessions:
+    """One pooled keep-alive requests.Session per provider, per worker process"""
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, pool_block: bool = False,
+                 socket_options: Optional[List[Tuple[int, int, int]]] = None):
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.socket_options = KEEPALIVE_SOCKET_OPTIONS if socket_options is None else socket_options
+        self._sessions: Dict[str, requests.Session] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _create(self) -> requests.Session:
+        session = requests.Session()
+        # Each provider talks to one or two hosts; pool_maxsize bounds concurrent connections per host
+        adapter = KeepAliveAdapter(socket_options=self.socket_options, pool_connections=4,
+                                   pool_maxsize=self.pool_maxsize, pool_block=self.pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def get(self, provider: str) -> requests.Session:
+        if self._pid != os.getpid():
+            # Forked worker: the parent's pooled sockets are not ours to reuse
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._sessions = {}
+                    self._pid = os.getpid()
+        session = self._sessions.get(provider)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(provider)
+                if session is None:
+                    session = self._sessions[provider] = self._create()
+        return session
+
+    def prewarm(self, provider: str, url: str, connections: int = 1, timeout: float = 5.0) -> int:
+        """Open up to `connections` pooled connections to url's host; returns how many succeeded"""
+        session = self.get(provider)
+        opened = []
+
+        def open_connection():
+            try:
+                # Any response (even 404/405) leaves a handshaken connection in the pool
+                session.head(url, timeout=timeout, allow_redirects=False)
+                opened.append(True)
+            except requests.RequestException as e:
+                logger.warning(f'⚠️ Pre-warming {provider} connection failed: {e}')
+
+        # Concurrent requests, so each one needs its own connection
+        threads = [threading.Thread(target=open_connection, daemon=True) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout + 1)
+        return len(opened)
+
+    def stats(self) -> Dict[str, Any]:
+        """Connections opened vs requests sent per provider (requests per connection = reuse)"""
+        stats = {}
+        for provider, session in list(self._sessions.items()):
+            connections = requests_sent = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        connections += pool.num_connections
+                        requests_sent += pool.num_requests
+            stats[provider] = {
+                'connections_opened': connections,
+                'requests': requests_sent,
+                'pool_maxsize': self.pool_maxsize
+            }
+        return stats
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
@@ -0,0 +1,245 @@
+"""
+Hybrid BM25 + Embedding Retrieval for Samadhan AI
+================================================
+
+Dense search misses exact terms the encoder blurs together (department
+names, "transformer", "dengue"), while keyword matching misses paraphrases.
+The hybrid retriever runs both legs and merges their rankings with
+reciprocal-rank fusion (RRF): score(d) = sum over legs of 1 / (rrf_k + rank).
+
+The BM25 leg is a compact inverted index: one CSR-style postings array per
+term holding document ids and precomputed BM25 impact weights, so a query
+is a handful of slice reads plus one bincount over the matched postings.
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_store import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# \w alone splits Devanagari words at vowel signs and viramas; the block minus the dandas is added
+TOKEN_PATTERN = re.compile(r'[\w\u0900-\u0963\u0966-\u097F]+', re.UNICODE)
+
+# Only words that carry no routing signal in complaints
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'by', 'for', 'from', 'has', 'have', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the', 'their', 'there', 'this', 'to', 'was', 'we',
+    'were', 'with', 'my', 'i', 'me', 'not', 'no', 'since', 'very', 'up'
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens (Latin and Devanagari), stopwords removed"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def document_text(document) -> str:
+    """Page content of a LangChain-style document or a {'content': ...} dict"""
+    if isinstance(document, dict):
+        return document.get('content', '')
+    return document.page_content
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index with precomputed per-posting weights"""
+
+    def __init__(self, vocabulary: Dict[str, int], indptr: np.ndarray, doc_ids: np.ndarray,
+                 weights: np.ndarray, n_docs: int):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.n_docs = n_docs
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.5, b: float = 0.75) -> 'BM25Index':
+        vocabulary: Dict[str, int] = {}
+        term_ids, doc_ids, term_freqs, doc_lengths = [], [], [], []
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for token, tf in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_ids.append(doc_id)
+                term_freqs.append(tf)
+
+        n_docs = len(doc_lengths)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        term_freqs = np.asarray(term_freqs, dtype=np.float32)
+        doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+
+        # Group postings by term (stable, so doc ids stay ascending within a term)
+        order = np.argsort(term_ids, kind='stable')
+        term_ids, doc_ids, term_freqs = term_ids[order], doc_ids[order], term_freqs[order]
+        document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=indptr[1:])
+        document_frequency = document_frequency.astype(np.float32)
+
+        idf = np.log1p((n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+        avg_length = float(doc_lengths.mean()) if n_docs else 0.0
+        norm = k1 * (1 - b + b * doc_lengths[doc_ids] / max(avg_length, 1e-9))
+        weights = (idf[term_ids] * term_freqs * (k1 + 1) / (term_freqs + norm)).astype(np.float32)
+
+        logger.info(f'✅ BM25 index built ({n_docs} documents, {len(vocabulary)} terms, {weights.size} postings)')
+        return cls(vocabulary, indptr, doc_ids, weights, n_docs)
+
+    def search(self, texts: Sequence[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, scores), both shaped (n_queries, k), padded with -1 / 0"""
+        k = max(1, min(k, self.n_docs))
+        ids = np.full((len(texts), k), -1, dtype=np.int64)
+        scores = np.zeros((len(texts), k), dtype=np.float32)
+        for row, text in enumerate(texts):
+            terms = {self.vocabulary[t] for t in tokenize(text) if t in self.vocabulary}
+            if not terms:
+                continue
+            postings = [slice(self.indptr[t], self.indptr[t + 1]) for t in terms]
+            matched = np.concatenate([self.doc_ids[s] for s in postings])
+            weights = np.concatenate([self.weights[s] for s in postings])
+            # Dense accumulator: O(postings + corpus) with no sort over the matched postings
+            doc_scores = np.bincount(matched, weights=weights, minlength=self.n_docs)
+            candidates = np.flatnonzero(doc_scores)
+            candidate_scores = doc_scores[candidates]
+            n = min(k, candidates.size)
+            top = np.argpartition(-candidate_scores, n - 1)[:n] if n < candidates.size else np.arange(candidates.size)
+            top = top[np.argsort(-candidate_scores[top], kind='stable')]
+            ids[row, :n] = candidates[top]
+            scores[row, :n] = candidate_scores[top]
+        return ids, scores
+
+
+def reciprocal_rank_fusion(rankings: List[np.ndarray], k: int, rrf_k: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """Fuse per-leg ranked id arrays (-1 = padding) of one query into the top-k (ids, RRF scores)"""
+    ids = np.concatenate([ranking[ranking >= 0] for ranking in rankings])
+    contributions = np.concatenate([
+        1.0 / (rrf_k + 1 + np.flatnonzero(ranking >= 0)) for ranking in rankings
+    ])
+    out_ids = np.full(k, -1, dtype=np.int64)
+    out_scores = np.zeros(k, dtype=np.float32)
+    if ids.size == 0:
+        return out_ids, out_scores
+    candidates, inverse = np.unique(ids, return_inverse=True)
+    fused = np.bincount(inverse, weights=contributions)
+    order = np.argsort(-fused, kind='stable')[:k]
+    out_ids[:order.size] = candidates[order]
+    out_scores[:order.size] = fused[order]
+    return out_ids, out_scores
+
+
+class HybridRetriever:
+    """Dense index + BM25 fused by RRF, usable anywhere an index's search(queries, k) is expected
+
+    Without query texts it is a pass-through to the dense index. With texts,
+    neighbours are chosen by fused rank, but the returned scores stay cosine
+    similarities so vote weights and similarity thresholds keep their
+    meaning. Documents found only by BM25 are scored against the vectors the
+    dense index stores for them (reconstruct()); a dense index without
+    reconstruct() gives them 0, so they take a neighbour slot but no vote.
+
+    Over a SegmentedIndex each live segment gets its own BM25 index, built
+    the first time a search sees the segment, so ingested complaints are
+    found lexically too. Per-segment BM25 scores use that segment's term
+    statistics; they only decide which segment hits reach the fusion depth.
+    """
+
+    def __init__(self, dense_index, bm25: BM25Index, depth: int = 50, rrf_k: int = 60):
+        self.dense_index = dense_index
+        self.bm25 = bm25  # base corpus
+        self.depth = depth
+        self.rrf_k = rrf_k
+        self._segment_bm25: Dict[str, BM25Index] = {}
+        self._segment_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.dense_index)
+
+    @classmethod
+    def build(cls, dense_index, documents, depth: int = 50, rrf_k: int = 60) -> 'HybridRetriever':
+        if hasattr(dense_index, 'parts'):
+            documents = dense_index.parts()[0][1]  # segments are indexed as searches reach them
+        return cls(dense_index, BM25Index.build(document_text(doc) for doc in documents), depth, rrf_k)
+
+    def _segment_index(self, name: str, documents) -> BM25Index:
+        bm25 = self._segment_bm25.get(name)
+        if bm25 is None:
+            with self._segment_lock:
+                bm25 = self._segment_bm25.get(name)
+                if bm25 is None:
+                    bm25 = BM25Index.build(document_text(doc) for doc in documents)
+                    self._segment_bm25[name] = bm25
+        return bm25
+
+    def _sparse_search(self, texts: Sequence[str], depth: int) -> np.ndarray:
+        """BM25 ids (global, -1 padded) of the base corpus and every live segment, best first"""
+        parts = self.dense_index.parts() if hasattr(self.dense_index, 'parts') else []
+        ids, scores = self.bm25.search(texts, depth)
+        if len(parts) <= 1:
+            return ids
+        all_ids, all_scores = [ids], [np.where(ids >= 0, scores, -np.inf)]
+        for name, documents, offset in parts[1:]:
+            if len(documents) == 0:
+                continue
+            ids, scores = self._segment_index(name, documents).search(texts, depth)
+            all_ids.append(np.where(ids >= 0, ids + offset, -1))
+            all_scores.append(np.where(ids >= 0, scores, -np.inf))
+        live = {name for name, _, _ in parts}
+        if not live.issuperset(self._segment_bm25):
+            with self._segment_lock:
+                # Compacted segments
+                self._segment_bm25 = {name: bm25 for name, bm25 in self._segment_bm25.items() if name in live}
+
+        ids, scores = np.concatenate(all_ids, axis=1), np.concatenate(all_scores, axis=1)
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :depth]
+        return np.take_along_axis(ids, order, axis=1)
+
+    def search(self, queries: np.ndarray, k: int, texts: Optional[Sequence[str]] = None
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, cosine scores) in fused-rank order, padded with -1"""
+        if texts is None:
+            return self.dense_index.search(queries, k)
+
+        k = max(1, min(k, len(self)))
+        depth = max(k, self.depth)
+        queries = normalize_rows(np.atleast_2d(queries))
+        dense_ids, dense_scores = self.dense_index.search(queries, depth)
+        sparse_ids = self._sparse_search(texts, depth)
+
+        ids = np.full((len(texts), k), -1, dtype=np.int64)
+        scores = np.full((len(texts), k), -np.inf, dtype=np.float32)
+        missing = []  # (row, column) of fused ids the dense leg did not score
+        for row in range(len(texts)):
+            fused_ids, _ = reciprocal_rank_fusion([dense_ids[row], sparse_ids[row]], k, self.rrf_k)
+            valid = dense_ids[row] >= 0
+            cosine = dict(zip(dense_ids[row][valid].tolist(), dense_scores[row][valid].tolist()))
+            n = int((fused_ids >= 0).sum())
+            ids[row, :n] = fused_ids[:n]
+            for column, doc_id in enumerate(fused_ids[:n].tolist()):
+                if doc_id in cosine:
+                    scores[row, column] = cosine[doc_id]
+                else:
+                    missing.append((row, column))
+
+        if missing:
+            rows, columns = (np.asarray(axis) for axis in zip(*missing))
+            if hasattr(self.dense_index, 'reconstruct'):
+                unique_ids, inverse = np.unique(ids[rows, columns], return_inverse=True)
+                vectors = self.dense_index.reconstruct(unique_ids)[inverse]
+                scores[rows, columns] = np.einsum('ij,ij->i', vectors, queries[rows])
+            else:
+                scores[rows, columns] = 0.0
+        return ids, scores
+
+    def params(self) -> Dict[str, Any]:
+        return {'depth': self.depth, 'rrf_k': self.rrf_k, 'bm25_terms': len(self.bm25.vocabulary),
+                'bm25_segments': len(self._segment_bm25)}
@@ -0,0 +1,219 @@
+"""
+IAM Token Refresher for Samadhan AI
+==================================
+
+get_ibm_cloud_token used to renew the WatsonX bearer token lazily, inside
+a request, through an unlocked per-process dict: when the token expired,
+every concurrent request in every worker called iam.cloud.ibm.com at once
+and paid its latency. IAMTokenManager instead:
+
+  - renews the token in a background thread refresh_ahead seconds before
+    it expires (plus jitter, so workers do not wake together); requests
+    only read it
+  - runs one refresh at a time per worker (a lock), and one per host (an
+    exclusive flock on <shared_path>.lock): the worker holding the flock
+    calls IAM and writes the token to shared_path (mode 0600, atomic
+    replace); the others then find the fresh token there and adopt it
+  - refreshes inside a request only when no usable token exists at all
+    (cold start, or IAM down for longer than the token's lifetime)
+
+A failed background refresh is retried with backoff while the current
+token keeps serving. stats() reports refresh latency percentiles,
+failures and how many renewals were adopted from another worker. Without
+fcntl (Windows) or a shared_path the token is per process.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND = 'background'
+REQUEST = 'request'
+
+
+class IAMTokenManager:
+    """Thread-safe IAM token holder with a background refresher, shared across workers through a file"""
+
+    def __init__(self, fetch: Callable[[], Tuple[str, float]], cache: Dict[str, Any],
+                 shared_path: Optional[str] = None, owner: str = '', background: bool = True,
+                 refresh_ahead: float = 600, expiry_margin: float = 60, jitter_seconds: float = 60,
+                 retry_seconds: float = 15, max_retry_seconds: float = 300, window: int = 100):
+        self.fetch = fetch  # () -> (access token, expires_in seconds); does the IAM call
+        self.cache = cache  # {'token', 'expiry'}: read without locking on every request
+        self.shared_path = shared_path if FCNTL_AVAILABLE else None
+        self.owner = owner  # tokens in the shared file from another API key are ignored
+        self.background = background
+        self.refresh_ahead = refresh_ahead
+        self.expiry_margin = expiry_margin  # stop using a token this long before IAM's expiry
+        self.jitter_seconds = min(jitter_seconds, refresh_ahead / 4)
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._lock = threading.Lock()  # one refresh at a time in this process
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pid = None  # process the refresher thread runs in
+        self._latencies = deque(maxlen=window)
+        self.refreshes = {BACKGROUND: 0, REQUEST: 0}
+        self.adopted = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_refresh_at = None
+        if self.shared_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.shared_path)), exist_ok=True)
+            except OSError as e:
+                logger.warning(f'⚠️ IAM token file unavailable, token is per worker: {e}')
+                self.shared_path = None
+
+    def start(self):
+        """Start the background refresher in this process (again in a forked worker)"""
+        if not self.background or self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='samadhan-iam-refresh', daemon=True).start()
+
+    def get(self) -> str:
+        """A usable token: the cached one, or (none usable) a refresh in the calling thread"""
+        self.start()
+        token, expiry = self.cache['token'], self.cache['expiry']
+        if token and time.time() < expiry:
+            return token
+        return self.refresh(REQUEST)
+
+    def refresh(self, reason: str = REQUEST) -> str:
+        """Renew the token unless another thread or worker already has; returns the token"""
+        # A background refresh renews a token that is still usable but due; a request only needs a usable one
+        ahead = self.refresh_ahead if reason == BACKGROUND else 0
+        with self._lock:
+            token, expiry = self.cache['token'], self.cache['expiry']
+            if token and time.time() < expiry - ahead:
+                return token
+            with self._shared_lock():
+                shared = self._read_shared()
+                if shared and time.time() < shared[1] - ahead:
+                    self._set(*shared)
+                    with self._stats_lock:
+                        self.adopted += 1
+                    logger.info('✅ IBM Cloud token adopted from another worker')
+                    return shared[0]
+
+                logger.info(f'🔄 Refreshing IBM Cloud token ({reason})...')
+                started = time.perf_counter()
+                try:
+                    token, expires_in = self.fetch()
+                except Exception as e:
+                    with self._stats_lock:
+                        self.failures += 1
+                        self.last_error = f'{type(e).__name__}: {e}'
+                    raise
+                expiry = time.time() + expires_in - self.expiry_margin
+                self._write_shared(token, expiry)
+                self._set(token, expiry)
+                with self._stats_lock:
+                    self._latencies.append((time.perf_counter() - started) * 1000)
+                    self.refreshes[reason] += 1
+                    self.last_refresh_at = datetime.now().isoformat()
+                logger.info(f'✅ IBM Cloud token refreshed ({reason}), usable for {expiry - time.time():.0f}s')
+                return token
+
+    def _set(self, token: str, expiry: float):
+        self.cache.update(token=token, expiry=expiry)
+
+    def _run(self):
+        backoff = self.retry_seconds
+        while True:
+            pause = self.cache['expiry'] - self.refresh_ahead - time.time()
+            if self.cache['token'] and pause > 0:
+                time.sleep(pause + random.uniform(0, self.jitter_seconds))
+                continue
+            try:
+                self.refresh(BACKGROUND)
+                backoff = self.retry_seconds
+            except Exception as e:
+                logger.warning(f'⚠️ Background IBM Cloud token refresh failed, retrying in {backoff:.0f}s: {e}')
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_retry_seconds)
+
+    @contextmanager
+    def _shared_lock(self) -> Iterator[None]:
+        """Exclusive flock across workers; no-op without a shared file"""
+        if not self.shared_path:
+            yield
+            return
+        try:
+            handle = open(self.shared_path + '.lock', 'a')
+        except OSError as e:
+            logger.warning(f'⚠️ IAM token lock unavailable: {e}')
+            yield
+            return
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+        finally:
+            handle.close()  # releases the flock
+
+    def _read_shared(self) -> Optional[Tuple[str, float]]:
+        if not self.shared_path:
+            return None
+        try:
+            with open(self.shared_path) as handle:
+                entry = json.load(handle)
+            if entry.get('owner') == self.owner and entry.get('token'):
+                return entry['token'], float(entry['expiry'])
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        return None
+
+    def _write_shared(self, token: str, expiry: float):
+        if not self.shared_path:
+            return
+        tmp_path = f'{self.shared_path}.{os.getpid()}.tmp'
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as handle:
+                json.dump({'owner': self.owner, 'token': token, 'expiry': expiry}, handle)
+            os.replace(tmp_path, self.shared_path)
+        except OSError as e:
+            logger.warning(f'⚠️ Could not share IBM Cloud token with other workers: {e}')
+
+    def stats(self) -> Dict[str, Any]:
+        token, expiry = self.cache['token'], self.cache['expiry']
+        with self._stats_lock:
+            samples = np.fromiter(self._latencies, dtype=np.float64)
+            return {
+                'background_refresh': self.background and self._pid == os.getpid(),
+                'shared': self.shared_path is not None,
+                'token_valid': bool(token) and time.time() < expiry,
+                'usable_for_seconds': round(expiry - time.time()) if token else None,
+                'refreshes': dict(self.refreshes),
+                'adopted_from_other_workers': self.adopted,
+                'failures': self.failures,
+                'last_error': self.last_error,
+                'last_refresh_at': self.last_refresh_at,
+                'refresh_latency_ms': {
+                    'samples': len(samples),
+                    'last': round(float(samples[-1]), 1),
+                    'p50': round(float(np.percentile(samples, 50)), 1),
+                    'p95': round(float(np.percentile(samples, 95)), 1)
+                } if len(samples) else None
+            }
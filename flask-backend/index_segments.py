@@ -0,0 +1,436 @@
+"""
+Append-Only Index Segments for Resolved Complaints
+=================================================
+
+New documents are written as small immutable segments (a ComplaintIndex
+directory each) instead of rebuilding or re-pickling one big index:
+
+    <root>/segments.json          manifest: live segments in append order
+    <root>/seg-00000042/          vectors.npy + documents.jsonl + manifest.json
+
+Document ids are stable: the base corpus comes first, then every segment in
+append order, and compaction only merges adjacent segments, so an id never
+moves. Searches fan out over the base index and every live segment and
+merge the per-segment top-k.
+
+An append that leaves more than max_segments live starts a background
+compaction, which merges size-tiered runs of adjacent segments (see
+plan_merge) until at most max_segments are live again. So a search fans
+out over at most max_segments + 1 indexes, plus whatever was appended
+while a compaction was running.
+
+Readers never lock. Writers and the compactor publish a new manifest with
+os.replace, and every process (gunicorn worker) picks it up on its next
+search. Segments retired by compaction are deleted after a grace period so
+readers still holding the old manifest can finish.
+
+Usage:
+    python index_segments.py ingest --root .cache/segments --documents resolved.jsonl
+    python index_segments.py compact --root .cache/segments
+"""
+
+import argparse
+import bisect
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ann_index import ComplaintIndex, ExactIndex, build_index
+from embedding_store import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS_MANIFEST = 'segments.json'
+WRITE_LOCK = 'write.lock'
+COMPACT_LOCK = 'compact.lock'
+
+
+@contextmanager
+def _file_lock(path: Path, blocking: bool = True):
+    """Exclusive flock shared by every process using the segment directory; yields False if busy"""
+    with open(path, 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def plan_merge(counts: List[int], max_segments: int, merge_factor: int = 4) -> Optional[Tuple[int, int]]:
+    """[start, end) of the adjacent segments to merge next, or None while at most max_segments are live
+
+    Size-tiered: a segment's class is floor(log_merge_factor(count)), and
+    merge_factor adjacent segments of one class merge into one of the next
+    class (the lowest such class first, the newest run on a tie). When no
+    such run exists, the window of 2..merge_factor adjacent segments with
+    the fewest documents rewritten per segment removed is merged instead, so
+    a plan always exists above max_segments.
+    """
+    if len(counts) <= max(max_segments, 1):
+        return None
+    classes = [int(np.log(max(count, 1)) / np.log(merge_factor)) for count in counts]
+    best = None
+    start = 0
+    for end in range(1, len(classes) + 1):
+        if end == len(classes) or classes[end] != classes[start]:
+            if end - start >= merge_factor and (best is None or classes[start] <= classes[best[0]]):
+                best = (start, start + merge_factor)
+            start = end
+    if best is not None:
+        return best
+
+    cost = None
+    for size in range(2, min(merge_factor, len(counts)) + 1):
+        for start in range(len(counts) - size + 1):
+            per_segment = sum(counts[start:start + size]) / (size - 1)
+            if cost is None or per_segment <= cost:
+                cost, best = per_segment, (start, start + size)
+    return best
+
+
+class SegmentDocuments:
+    """Read-only sequence view over the documents of several consecutive parts"""
+
+    def __init__(self, parts: List[Any]):
+        self.parts = parts
+        self.starts = []
+        total = 0
+        for part in parts:
+            self.starts.append(total)
+            total += len(part)
+        self.total = total
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __getitem__(self, i: int):
+        if i < 0 or i >= self.total:
+            raise IndexError(i)
+        part = bisect.bisect_right(self.starts, i) - 1
+        return self.parts[part][i - self.starts[part]]
+
+    def __iter__(self) -> Iterator[Any]:
+        for part in self.parts:
+            yield from part
+
+
+class _LiveDocuments:
+    """Documents of whatever snapshot is current; ids never move, so lookups stay valid as it grows"""
+
+    def __init__(self, index: 'SegmentedIndex'):
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.index._snapshot.documents)
+
+    def __getitem__(self, i: int):
+        return self.index._snapshot.documents[i]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.index._snapshot.documents)
+
+
+class _Snapshot:
+    """Immutable view of the live segments; searches use whichever snapshot they started with"""
+
+    def __init__(self, base_index, base_documents, segments: List[Tuple[str, ComplaintIndex]], generation: int):
+        self.segments = segments
+        self.generation = generation
+        self.indexes = [base_index] + [segment for _, segment in segments]
+        self.documents = SegmentDocuments([base_documents] + [segment.documents for _, segment in segments])
+        self.offsets = np.asarray(self.documents.starts, dtype=np.int64)
+
+
+class SegmentedIndex:
+    """Base index plus append-only segments, searchable through search(queries, k)"""
+
+    backend = 'segmented'
+
+    def __init__(self, root: str, base_index, base_documents, refresh_interval: float = 1.0,
+                 max_segments: int = 8, ann_threshold: int = 50000, retire_grace: float = 300.0,
+                 merge_factor: int = 4):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.base_index = base_index
+        self.base_documents = base_documents
+        self.refresh_interval = refresh_interval
+        self.max_segments = max_segments
+        self.ann_threshold = ann_threshold  # merged segments this large get an IVF index instead of exact
+        self.merge_factor = merge_factor
+        self.retire_grace = retire_grace
+        self._refresh_lock = threading.Lock()
+        self._compacting = threading.Event()
+        self._checked_at = 0.0
+        self._snapshot = _Snapshot(base_index, base_documents, [], -1)
+        self.documents = _LiveDocuments(self)
+        self.refresh(force=True)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.documents)
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._snapshot.segments)
+
+    # Manifest
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        path = self.root / SEGMENTS_MANIFEST
+        if not path.exists():
+            return {'generation': 0, 'next_segment': 0, 'segments': [], 'retired': []}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        manifest['generation'] += 1
+        tmp_path = self.root / f'{SEGMENTS_MANIFEST}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.root / SEGMENTS_MANIFEST)
+
+    def refresh(self, force: bool = False):
+        """Pick up segments published by this or another process (checked at most once per interval)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        with self._refresh_lock:
+            self._checked_at = now
+            manifest = self._read_manifest()
+            if manifest['generation'] == self._snapshot.generation:
+                return
+            loaded = dict(self._snapshot.segments)
+            segments = []
+            for entry in manifest['segments']:
+                name = entry['name']
+                segment = loaded.get(name) or ComplaintIndex.load(str(self.root / name))
+                segments.append((name, segment))
+            self._snapshot = _Snapshot(self.base_index, self.base_documents, segments, manifest['generation'])
+
+    # Writes
+
+    def _write_segment(self, name: str, vectors: np.ndarray, documents: List[Dict[str, Any]]) -> int:
+        """Write a segment directory next to its final name and move it into place"""
+        index = ExactIndex(vectors) if vectors.shape[0] < self.ann_threshold else build_index(vectors, 'faiss-ivf')
+        tmp_dir = self.root / f'.{name}.tmp'
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        ComplaintIndex(index, None, {'created_at': time.time()}).save(str(tmp_dir), documents)
+        os.replace(tmp_dir, self.root / name)
+        return vectors.shape[0]
+
+    def add(self, vectors: np.ndarray, documents: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Append documents ({'content', 'metadata'}) with their embeddings as one new segment
+
+        Returns the (first, last + 1) global ids assigned to them.
+        """
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[0] != len(documents):
+            raise ValueError(f'{vectors.shape[0]} vectors for {len(documents)} documents')
+        if not documents:
+            return len(self), len(self)
+
+        with _file_lock(self.root / WRITE_LOCK):
+            manifest = self._read_manifest()
+            name = f"seg-{manifest['next_segment']:08d}"
+            count = self._write_segment(name, vectors, documents)
+            manifest['next_segment'] += 1
+            manifest['segments'].append({'name': name, 'count': count})
+            self._write_manifest(manifest)
+            first = len(self.base_documents) + sum(entry['count'] for entry in manifest['segments'][:-1])
+
+        self.refresh(force=True)
+        logger.info(f'✅ Appended {count} documents as {name} ({len(manifest["segments"])} live segments)')
+        if len(manifest['segments']) > self.max_segments:
+            self.compact_in_background()
+        return first, first + count
+
+    # Compaction
+
+    def _plan(self, manifest: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        return plan_merge([entry['count'] for entry in manifest['segments']], self.max_segments, self.merge_factor)
+
+    def compact(self) -> bool:
+        """Merge the run of adjacent segments plan_merge() picks, if any, into one
+
+        Returns False if another process is already compacting.
+        """
+        with _file_lock(self.root / COMPACT_LOCK, blocking=False) as acquired:
+            if not acquired:
+                return False
+            self._delete_retired()
+            manifest = self._read_manifest()
+            plan = self._plan(manifest)
+            if plan is None:
+                return True
+            merged = manifest['segments'][plan[0]:plan[1]]
+
+            # Build outside the write lock: segments are immutable and appends only go to the tail
+            parts = [ComplaintIndex.load(str(self.root / entry['name'])) for entry in merged]
+            vectors = np.concatenate([part.reconstruct(np.arange(len(part))) for part in parts])
+            documents = [{'content': doc.page_content, 'metadata': doc.metadata}
+                         for part in parts for doc in part.documents]
+
+            with _file_lock(self.root / WRITE_LOCK):
+                manifest = self._read_manifest()
+                name = f"seg-{manifest['next_segment']:08d}"
+                manifest['next_segment'] += 1
+                self._write_segment(name, vectors, documents)
+                # Swap the merged run in place so every document keeps its global id
+                names = [entry['name'] for entry in manifest['segments']]
+                start = names.index(merged[0]['name'])
+                manifest['segments'][start:start + len(merged)] = [{'name': name, 'count': len(documents)}]
+                manifest['retired'] += [{'name': entry['name'], 'retired_at': time.time()} for entry in merged]
+                self._write_manifest(manifest)
+
+        self.refresh(force=True)
+        logger.info(f'✅ Compacted {len(merged)} segments into {name} ({len(documents)} documents)')
+        return True
+
+    def compact_in_background(self):
+        """Start one compaction thread in this process unless one is already running
+
+        It merges until no more than max_segments are live (appends may land meanwhile).
+        """
+        if self._compacting.is_set():
+            return
+        self._compacting.set()
+
+        def run():
+            try:
+                while self._plan(self._read_manifest()) is not None and self.compact():
+                    pass
+            except Exception as e:
+                logger.error(f'❌ Segment compaction failed: {e}')
+            finally:
+                self._compacting.clear()
+
+        threading.Thread(target=run, name='segment-compaction', daemon=True).start()
+
+    def _delete_retired(self):
+        """Remove retired segment directories once no reader can still be using the old manifest"""
+        with _file_lock(self.root / WRITE_LOCK):
+            manifest = self._read_manifest()
+            cutoff = time.time() - self.retire_grace
+            expired = [entry for entry in manifest['retired'] if entry['retired_at'] < cutoff]
+            if not expired:
+                return
+            manifest['retired'] = [entry for entry in manifest['retired'] if entry['retired_at'] >= cutoff]
+            self._write_manifest(manifest)
+        for entry in expired:
+            shutil.rmtree(self.root / entry['name'], ignore_errors=True)
+
+    # Reads
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (global ids, scores), both shaped (n_queries, k), sorted by score descending"""
+        self.refresh()
+        snapshot = self._snapshot
+        queries = normalize_rows(np.atleast_2d(queries))
+        all_ids, all_scores = [], []
+        for index, offset in zip(snapshot.indexes, snapshot.offsets):
+            if len(index) == 0:
+                continue
+            ids, scores = index.search(queries, min(k, len(index)))
+            all_ids.append(np.where(ids >= 0, ids + offset, -1))
+            all_scores.append(np.where(ids >= 0, scores, -np.inf))
+
+        out_ids = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        out_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        if not all_ids:
+            return out_ids, out_scores
+        ids, scores = np.concatenate(all_ids, axis=1), np.concatenate(all_scores, axis=1)
+        n = min(k, ids.shape[1])
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :n]
+        out_ids[:, :n] = np.take_along_axis(ids, order, axis=1)
+        out_scores[:, :n] = np.take_along_axis(scores, order, axis=1)
+        return out_ids, out_scores
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        """Stored vectors of the given global ids as float32 rows (ids keep their place across compaction)"""
+        snapshot = self._snapshot
+        ids = np.asarray(ids, dtype=np.int64)
+        owner = np.searchsorted(snapshot.offsets, ids, side='right') - 1
+        out = None
+        for part in np.unique(owner).tolist():
+            mask = owner == part
+            rows = snapshot.indexes[part].reconstruct(ids[mask] - snapshot.offsets[part])
+            if out is None:
+                out = np.empty((ids.size, rows.shape[1]), dtype=np.float32)
+            out[mask] = rows
+        return out
+
+    def parts(self) -> List[Tuple[str, Any, int]]:
+        """(name, documents, first global id) of the base corpus and of each live segment"""
+        self.refresh()
+        snapshot = self._snapshot
+        names = ['base'] + [name for name, _ in snapshot.segments]
+        return list(zip(names, snapshot.documents.parts, snapshot.offsets.tolist()))
+
+    def params(self) -> Dict[str, Any]:
+        return {'segments': self.segment_count, 'documents': len(self),
+                'base_documents': len(self.base_documents)}
+
+
+def _read_jsonl(path: str) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Append documents to, or compact, a segmented complaint index')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest = sub.add_parser('ingest', help='Embed a JSONL file ({"content", "metadata"} per line) as a new segment')
+    ingest.add_argument('--root', required=True)
+    ingest.add_argument('--documents', required=True)
+    ingest.add_argument('--model', default=os.getenv('SENTENCE_MODEL_NAME', 'all-MiniLM-L6-v2'))
+    ingest.add_argument('--batch', type=int, default=5000, help='Documents per segment')
+
+    compact = sub.add_parser('compact', help='Merge segments until at most --max-segments are live')
+    compact.add_argument('--root', required=True)
+    compact.add_argument('--max-segments', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    empty = ExactIndex(np.zeros((0, 1), dtype=np.float32))
+    if args.command == 'ingest':
+        from sentence_transformers import SentenceTransformer
+        from embedding_cache import normalize_complaint_text
+        from text_normalizer import TextNormalizer
+        model = SentenceTransformer(args.model)
+        normalizer = TextNormalizer()
+        segments = SegmentedIndex(args.root, empty, [], max_segments=1 << 30)
+        documents = _read_jsonl(args.documents)
+        for start in range(0, len(documents), args.batch):
+            batch = documents[start:start + args.batch]
+            # The app embeds queries from normalized text (normalize_complaint + CachedEncoder); match it
+            texts = [normalize_complaint_text(normalizer.normalize(doc.get('content', '')).text) for doc in batch]
+            vectors = model.encode(texts, batch_size=256)
+            segments.add(vectors, batch)
+        print(f'✅ Ingested {len(documents)} documents into {args.root} ({segments.segment_count} segments)')
+    else:
+        segments = SegmentedIndex(args.root, empty, [], max_segments=args.max_segments)
+        while segments._plan(segments._read_manifest()) is not None:
+            if not segments.compact():
+                print('⚠️ Another process is compacting')
+                return
+        print(f'✅ Compacted to {segments.segment_count} segments')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Single-Pass Keyword Engine for Samadhan AI
+=========================================
+
+The rule-based analysis used to run one substring test per keyword, so
+every complaint was scanned ~250 times and keywords matched inside other
+words ("ration" in "declaration", "tree" in "streets", "pds" in "updates").
+
+Here all dataset keywords (department priority keywords, priority keywords,
+sentiment words) are compiled once into a single automaton: a character
+trie of every keyword, compiled into one regular expression so the walk
+runs in the C regex engine. One pass over the complaint tries the trie at
+each word start and takes the longest keyword there; every shorter keyword
+matching at the same position is one of its prefixes, precomputed at build
+time. Keywords must start on a word boundary but may end inside a word, so
+"accidents", "urgently" and "street lights" still match "accident",
+"urgent" and "street light".
+"""
+
+import re
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+SENTIMENT_KEYWORDS = {
+    'negative': ['angry', 'frustrated', 'terrible', 'worst', 'horrible', 'disgusted', 'furious', 'outraged', 'disappointed'],
+    'positive': ['thank', 'appreciate', 'good', 'excellent', 'satisfied', 'happy', 'pleased', 'grateful']
+}
+
+PRIORITY_ORDER = ['critical', 'high', 'low']
+
+
+def normalize_keyword(keyword: str) -> str:
+    return ' '.join(keyword.lower().split())
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Regex for a character trie; optional tails are greedy, so the longest keyword wins"""
+    branches = []
+    for char, child in sorted((c, n) for c, n in node.items() if c):
+        # Collapse single-child chains into one literal run
+        run = [char]
+        while len(child) == 1 and '' not in child:
+            (char, child), = child.items()
+            run.append(char)
+        literal = ''.join(r'\s+' if c == ' ' else re.escape(c) for c in run)
+        branches.append(literal + _trie_pattern(child))
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    return f'(?:{body})?' if '' in node else body
+
+
+class KeywordAutomaton:
+    """Every keyword starting on a word boundary, found in one pass
+
+    Each keyword phrase carries one or more labels; scan() returns the set of
+    (label, keyword) pairs found in a text.
+    """
+
+    def __init__(self, whole_words: bool = False):
+        self.whole_words = whole_words  # keywords must also end on a word boundary
+        self.labels: Dict[str, List[Hashable]] = {}
+        self.pattern = None
+        self.matches: Dict[str, Tuple[Tuple[Hashable, str], ...]] = {}
+
+    @classmethod
+    def build(cls, keywords: Iterable[Tuple[str, Hashable]], whole_words: bool = False) -> 'KeywordAutomaton':
+        automaton = cls(whole_words)
+        for keyword, label in keywords:
+            automaton.add(keyword, label)
+        automaton.compile()
+        return automaton
+
+    def add(self, keyword: str, label: Hashable):
+        keyword = normalize_keyword(keyword)
+        if keyword and label not in self.labels.setdefault(keyword, []):
+            self.labels[keyword].append(label)
+
+    def compile(self):
+        trie: Dict[str, Any] = {}
+        for keyword in self.labels:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        end = r'\b' if self.whole_words else ''
+        self.pattern = re.compile(r'\b(?=(' + _trie_pattern(trie) + ')' + end + ')')
+        # Longest keyword at a position -> all keywords matching there (its keyword prefixes)
+        self.matches = {
+            keyword: tuple((label, prefix) for prefix in self.labels if self._is_prefix(prefix, keyword)
+                           for label in self.labels[prefix])
+            for keyword in self.labels
+        }
+
+    def _is_prefix(self, prefix: str, keyword: str) -> bool:
+        if not keyword.startswith(prefix):
+            return False
+        return not self.whole_words or len(prefix) == len(keyword) or keyword[len(prefix)] == ' '
+
+    def scan(self, text: str) -> Set[Tuple[Hashable, str]]:
+        """Every (label, keyword) starting on a word boundary in text"""
+        hits = set()
+        matches = self.matches
+        for longest in self.pattern.findall(text.lower()):
+            hits.update(matches.get(longest) or matches[normalize_keyword(longest)])
+        return hits
+
+
+class KeywordHits:
+    """Keyword hits of one complaint, grouped the way the rule-based analysis consumes them"""
+
+    def __init__(self, hits: Set[Tuple[Hashable, str]]):
+        self.hits = hits
+        self.department_scores: Dict[str, int] = {}
+        self.priorities: Set[Tuple[str, str]] = set()
+        self.sentiment_scores = {'negative': 0, 'positive': 0}
+        for label, _ in hits:
+            kind = label[0]
+            if kind == 'department':
+                self.department_scores[label[1]] = self.department_scores.get(label[1], 0) + 1
+            elif kind == 'priority':
+                self.priorities.add((label[1], label[2]))
+            elif kind == 'sentiment':
+                self.sentiment_scores[label[1]] += 1
+
+    def keywords(self, kind: str) -> List[str]:
+        return sorted({keyword for label, keyword in self.hits if label[0] == kind})
+
+    def priority(self, category_key: Optional[str] = None) -> str:
+        """critical > high > low by general keywords or the category's own list, else medium"""
+        for p in PRIORITY_ORDER:
+            if (p, 'general') in self.priorities:
+                return p
+            if category_key and (p, category_key) in self.priorities:
+                return p
+        return 'medium'
+
+    def sentiment(self) -> str:
+        negative, positive = self.sentiment_scores['negative'], self.sentiment_scores['positive']
+        if negative > positive:
+            return 'negative'
+        if positive > negative:
+            return 'positive'
+        return 'neutral'
+
+
+class KeywordEngine:
+    """Department, priority and sentiment keywords of the dataset in one automaton"""
+
+    def __init__(self, departments: Dict[str, Dict[str, Any]], priority_keywords: Dict[str, Dict[str, List[str]]],
+                 sentiment_keywords: Optional[Dict[str, List[str]]] = None):
+        keywords = []
+        for department, info in departments.items():
+            keywords += [(keyword, ('department', department)) for keyword in info.get('priority_keywords', [])]
+        for priority, scopes in priority_keywords.items():
+            for scope, words in scopes.items():
+                keywords += [(keyword, ('priority', priority, scope)) for keyword in words]
+        for sentiment, words in (sentiment_keywords or SENTIMENT_KEYWORDS).items():
+            keywords += [(keyword, ('sentiment', sentiment)) for keyword in words]
+        self.automaton = KeywordAutomaton.build(keywords)
+        self.department_order = list(departments)
+
+    @classmethod
+    def from_dataset(cls) -> 'KeywordEngine':
+        from samadhan_dataset import PRIORITY_KEYWORDS, UP_GOVERNMENT_DATASET
+        return cls(UP_GOVERNMENT_DATASET['departments'], PRIORITY_KEYWORDS)
+
+    def analyze(self, text: str) -> KeywordHits:
+        return KeywordHits(self.automaton.scan(text))
+
+    def best_department(self, hits: KeywordHits) -> Optional[str]:
+        """Department with the most distinct keyword hits (dataset order breaks ties)"""
+        if not hits.department_scores:
+            return None
+        return max(self.department_order, key=lambda name: hits.department_scores.get(name, 0))
+
+
+_default_engine = None
+
+
+def get_keyword_engine() -> KeywordEngine:
+    """Process-wide engine built from the Samadhan AI dataset on first use"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = KeywordEngine.from_dataset()
+    return _default_engine
@@ -0,0 +1,190 @@
+"""
+Top-k kNN Voting Classifier for Samadhan AI
+==========================================
+
+Classifies complaints by a similarity-weighted vote of their k nearest
+training documents. Labels are canonicalized per document type, because the
+raw metadata mixes names ('PublicWorks' vs 'Infrastructure') and some
+document types (districts, helplines, portals) carry no category at all.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from keyword_engine import get_keyword_engine
+from samadhan_dataset import COMPLAINT_PATTERNS, UP_GOVERNMENT_DATASET
+
+logger = logging.getLogger(__name__)
+
+# Complaint pattern category -> handling department
+CATEGORY_DEPARTMENTS = {
+    'Infrastructure': 'Public Works',
+    'Water Supply': 'Water Supply',
+    'Traffic': 'Traffic Police',
+    'Environment': 'Environment',
+    'Healthcare': 'Healthcare',
+    'Education': 'Education'
+}
+
+# Department -> canonical category (the complaint pattern names where one exists)
+DEPARTMENT_CATEGORIES = {dept: category for category, dept in CATEGORY_DEPARTMENTS.items()}
+
+# Complaint pattern category -> PRIORITY_KEYWORDS sub-key
+CATEGORY_PRIORITY_KEYS = {
+    'Infrastructure': 'infrastructure',
+    'Water Supply': 'water',
+    'Traffic': 'traffic',
+    'Environment': 'environment',
+    'Healthcare': 'healthcare',
+    'Education': 'education'
+}
+
+PRIORITIES = ['critical', 'high', 'medium', 'low']
+
+
+def label_priority(text: str, category: Optional[str] = None) -> str:
+    """Keyword priority label for a training example (same precedence as the rule-based path)"""
+    return get_keyword_engine().analyze(text).priority(CATEGORY_PRIORITY_KEYS.get(category))
+
+
+def canonical_labels(document) -> Tuple[Optional[str], Optional[str]]:
+    """Return (department, priority) for a document, or None where it should abstain"""
+    metadata = document.metadata or {}
+    doc_type = metadata.get('type')
+
+    if doc_type == 'complaint_example':
+        # Metadata stores the category with spaces stripped ('WaterSupply')
+        raw_category = metadata.get('category', '')
+        category = next((c for c in COMPLAINT_PATTERNS if c.replace(' ', '') == raw_category), None)
+        if not category:
+            return None, None
+        complaint = document.page_content.split('. This should be handled by')[0]
+        return CATEGORY_DEPARTMENTS[category], label_priority(complaint, category)
+
+    # Department docs and historical resolved complaints carry explicit labels
+    department = metadata.get('department')
+    if department in UP_GOVERNMENT_DATASET['departments']:
+        priority = metadata.get('priority')
+        return department, priority if priority in PRIORITIES else None
+
+    return None, None
+
+
+class KNNVotingClassifier:
+    """Similarity-weighted top-k vote over any index exposing search(queries, k)"""
+
+    def __init__(self, index, documents, k: int = 7):
+        self.index = index
+        self.documents = documents
+        self.k = max(1, min(k, len(documents)))
+
+        self.departments = list(UP_GOVERNMENT_DATASET['departments'].keys())
+        self._department_index = {name: i for i, name in enumerate(self.departments)}
+        self._priority_index = {name: i for i, name in enumerate(PRIORITIES)}
+        self._labels_lock = threading.Lock()
+
+        # -1 marks documents that abstain from a vote
+        self.department_labels = np.zeros(0, dtype=np.int64)
+        self.priority_labels = np.zeros(0, dtype=np.int64)
+        self._extend_labels(len(documents))
+
+        logger.info(f'✅ kNN classifier ready ({int((self.department_labels >= 0).sum())} labelled documents, k={self.k})')
+
+    def _extend_labels(self, size: int):
+        """Label documents up to `size`; segmented indexes keep appending new ones"""
+        with self._labels_lock:
+            start = len(self.department_labels)
+            if size <= start:
+                return
+            department_labels = np.full(size - start, -1, dtype=np.int64)
+            priority_labels = np.full(size - start, -1, dtype=np.int64)
+            for offset in range(size - start):
+                department, priority = canonical_labels(self.documents[start + offset])
+                if department:
+                    department_labels[offset] = self._department_index[department]
+                if priority:
+                    priority_labels[offset] = self._priority_index[priority]
+            # Priorities first: readers index both arrays with ids below len(department_labels)
+            self.priority_labels = np.concatenate([self.priority_labels, priority_labels])
+            self.department_labels = np.concatenate([self.department_labels, department_labels])
+
+    def kneighbors(self, query_embeddings: np.ndarray, k: Optional[int] = None,
+                   query_texts: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched top-k search; returns (indices, cosine scores) sorted by rank
+
+        ANN backends pad missing neighbours with index -1. Query texts are only
+        passed to indexes that also rank lexically (HybridRetriever).
+        """
+        k = max(1, min(k or self.k, len(self.documents)))
+        if query_texts is not None:
+            return self.index.search(query_embeddings, k, query_texts)
+        return self.index.search(query_embeddings, k)
+
+    @staticmethod
+    def _vote(labels: np.ndarray, weights: np.ndarray, n_classes: int) -> np.ndarray:
+        """Sum neighbour weights per class for every query row"""
+        votes = np.zeros((labels.shape[0], n_classes), dtype=np.float32)
+        rows, cols = np.nonzero(labels >= 0)
+        np.add.at(votes, (rows, labels[rows, cols]), weights[rows, cols])
+        return votes
+
+    def classify_batch(self, query_embeddings: np.ndarray, k: Optional[int] = None,
+                       query_texts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Classify a batch of complaint embeddings"""
+        indices, scores = self.kneighbors(query_embeddings, k, query_texts)
+        if indices.size and indices.max() >= len(self.department_labels):
+            self._extend_labels(int(indices.max()) + 1)
+        valid = indices >= 0
+        safe_indices = np.where(valid, indices, 0)
+        weights = np.where(valid, np.clip(scores, 0.0, None), 0.0)
+
+        department_labels = np.where(valid, self.department_labels[safe_indices], -1)
+        priority_labels = np.where(valid, self.priority_labels[safe_indices], -1)
+        department_votes = self._vote(department_labels, weights, len(self.departments))
+        priority_votes = self._vote(priority_labels, weights, len(PRIORITIES))
+
+        results = []
+        for row in range(indices.shape[0]):
+            dept_total = float(department_votes[row].sum())
+            prio_total = float(priority_votes[row].sum())
+
+            if dept_total > 0:
+                dept_idx = int(np.argmax(department_votes[row]))
+                department = self.departments[dept_idx]
+                vote_share = float(department_votes[row, dept_idx]) / dept_total
+            else:
+                department = None
+                vote_share = 0.0
+
+            if prio_total > 0:
+                priority = PRIORITIES[int(np.argmax(priority_votes[row]))]
+            else:
+                priority = None
+
+            results.append({
+                'department': department,
+                'category': DEPARTMENT_CATEGORIES.get(department, department) if department else None,
+                'priority': priority,
+                'vote_share': round(vote_share, 4),
+                'top_similarity': float(scores[row][valid[row]].max()) if valid[row].any() else 0.0,
+                'neighbors': [
+                    {
+                        'index': int(doc_idx),
+                        'score': float(score),
+                        'type': self.documents[doc_idx].metadata.get('type'),
+                        'department': self.departments[self.department_labels[doc_idx]] if self.department_labels[doc_idx] >= 0 else None,
+                        'content': self.documents[doc_idx].page_content[:200]
+                    }
+                    for doc_idx, score in zip(indices[row], scores[row])
+                    if doc_idx >= 0
+                ]
+            })
+        return results
+
+    def classify(self, query_embedding: np.ndarray, k: Optional[int] = None,
+                 query_text: Optional[str] = None) -> Dict[str, Any]:
+        """Classify a single complaint embedding"""
+        return self.classify_batch(query_embedding, k, [query_text] if query_text is not None else None)[0]
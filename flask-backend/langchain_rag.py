@@ -450,25 +450,39 @@ class SamadhanRAG:
     
     def add_document(self, content: str, metadata: Dict[str, Any] = None):
         """Add new document to the knowledge base"""
+        return self.add_documents([{'content': content, 'metadata': metadata or {}}])
+    
+    def add_documents(self, documents: List[Dict[str, Any]], persist: bool = True):
+        """Add a batch of documents, re-pickling the vector store once per batch instead of per document
+        
+        High-volume ingestion of resolved complaints should use the append-only
+        segments in index_segments.py, which never rewrite existing data.
+        """
         try:
             if not self.vector_store:
                 logger.warning("⚠️ Vector store not initialized")
                 return False
             
-            doc = Document(page_content=content, metadata=metadata or {})
-            self.vector_store.add_documents([doc])
+            docs = [Document(page_content=doc['content'], metadata=doc.get('metadata') or {}) for doc in documents]
+            self.vector_store.add_documents(docs)
             
-            # Save updated vector store
-            with open("vector_store.pkl", 'wb') as f:
-                pickle.dump(self.vector_store, f)
+            if persist:
+                self.persist()
             
-            logger.info("✅ Document added to knowledge base")
+            logger.info(f"✅ {len(docs)} documents added to knowledge base")
             return True
             
         except Exception as e:
-            logger.error(f"❌ Error adding document: {e}")
+            logger.error(f"❌ Error adding documents: {e}")
             return False
     
+    def persist(self):
+        """Save the vector store (atomically, so a crash never leaves a truncated pickle)"""
+        tmp_path = "vector_store.pkl.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.vector_store, f)
+        os.replace(tmp_path, "vector_store.pkl")
+    
     def search_similar_complaints(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Search for similar complaints in the knowledge base"""
         try:
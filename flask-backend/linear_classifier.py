@@ -0,0 +1,268 @@
+"""
+Hashing-Vectorizer Linear Classifier for Samadhan AI
+===================================================
+
+A CPU-only classification tier that needs no model download. Complaints are
+hashed into character n-gram features (HashingVectorizer, so there is no
+vocabulary to store) and scored by two multinomial logistic regression
+heads, one for the handling department and one for priority.
+
+Training runs offline on COMPLAINT_PATTERNS plus the department and priority
+keyword lists, and writes a small compressed .npz artifact holding only the
+weights of features seen in training. At load time those weights are
+scattered into a dense (n_features, n_classes) matrix, so inference for a
+whole batch is one gather of the rows of the features present plus a
+segmented sum.
+
+Usage:
+    python linear_classifier.py train --out models/complaint_linear.npz
+    python linear_classifier.py predict "Street lights not working for weeks"
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from knn_classifier import CATEGORY_DEPARTMENTS, DEPARTMENT_CATEGORIES, PRIORITIES, label_priority
+
+logger = logging.getLogger(__name__)
+
+SKLEARN_AVAILABLE = importlib.util.find_spec('sklearn') is not None
+if SKLEARN_AVAILABLE:
+    from sklearn.utils import murmurhash3_32
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent / 'models' / 'complaint_linear.npz'
+
+VECTORIZER_PARAMS = {
+    'analyzer': 'char_wb',
+    'ngram_range': (2, 4),
+    'n_features': 2 ** 16,
+    'alternate_sign': False,
+    'norm': 'l2',
+    'lowercase': True
+}
+
+# Distinct n-grams whose hashed column is remembered before the memo is reset
+FEATURE_CACHE_SIZE = 200000
+
+
+def make_vectorizer(params: Dict[str, Any]):
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(**{**params, 'ngram_range': tuple(params['ngram_range'])})
+
+
+def training_examples() -> Tuple[List[str], List[Optional[str]], List[Optional[str]]]:
+    """(texts, departments, priorities) from the dataset; None where a head has no label"""
+    from samadhan_dataset import COMPLAINT_PATTERNS, PRIORITY_KEYWORDS, UP_GOVERNMENT_DATASET
+
+    texts, departments, priorities = [], [], []
+    for category, patterns in COMPLAINT_PATTERNS.items():
+        for text in patterns:
+            texts.append(text)
+            departments.append(CATEGORY_DEPARTMENTS[category])
+            priorities.append(label_priority(text, category))
+
+    # Keyword lists cover the departments and urgency words the patterns never mention
+    for department, info in UP_GOVERNMENT_DATASET['departments'].items():
+        for keyword in info.get('priority_keywords', []):
+            texts.append(keyword)
+            departments.append(department)
+            priorities.append(None)
+    for priority, scopes in PRIORITY_KEYWORDS.items():
+        for keyword in {keyword for words in scopes.values() for keyword in words}:
+            texts.append(keyword)
+            departments.append(None)
+            priorities.append(priority)
+    return texts, departments, priorities
+
+
+class LinearHead:
+    """One multinomial logistic regression over hashed features"""
+
+    def __init__(self, classes: List[str], weights: np.ndarray, intercept: np.ndarray):
+        self.classes = classes
+        self.weights = weights  # (n_features, n_classes), dense so a feature's row is a direct lookup
+        self.intercept = intercept
+
+    @classmethod
+    def fit(cls, features, labels: List[str], c: float = 10.0) -> 'LinearHead':
+        from sklearn.linear_model import LogisticRegression
+        model = LogisticRegression(C=c, max_iter=2000)
+        model.fit(features, labels)
+        weights = np.ascontiguousarray(model.coef_.T, dtype=np.float32)
+        if weights.shape[1] == 1:
+            # Binary heads keep one weight column; expand to one column per class
+            weights = np.hstack([-weights / 2, weights / 2])
+        intercept = model.intercept_.astype(np.float32)
+        if intercept.size == 1:
+            intercept = np.array([-intercept[0] / 2, intercept[0] / 2], dtype=np.float32)
+        return cls(list(model.classes_), weights, intercept)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    return logits / logits.sum(axis=1, keepdims=True)
+
+
+class LinearComplaintClassifier:
+    """Department and priority heads sharing one hashing vectorizer"""
+
+    def __init__(self, vectorizer_params: Dict[str, Any], heads: Dict[str, LinearHead]):
+        self.vectorizer_params = vectorizer_params
+        self.vectorizer = make_vectorizer(vectorizer_params)
+        self.analyzer = self.vectorizer.build_analyzer()
+        self.heads = heads
+        self._feature_index: Dict[str, Tuple[int, float]] = {}
+        # Both heads side by side, so a batch gathers each present feature's weights once
+        self._weights = np.hstack([head.weights for head in heads.values()])
+        self._intercept = np.concatenate([head.intercept for head in heads.values()])
+        bounds = np.cumsum([0] + [len(head.classes) for head in heads.values()])
+        self._columns = {name: slice(bounds[i], bounds[i + 1]) for i, name in enumerate(heads)}
+
+    def _feature(self, ngram: str) -> Tuple[int, float]:
+        """Column and sign of an n-gram, exactly as HashingVectorizer hashes it (memoized)"""
+        feature = self._feature_index.get(ngram)
+        if feature is None:
+            h = murmurhash3_32(ngram, seed=0)
+            n_features = self.vectorizer_params['n_features']
+            index = (2147483647 - (n_features - 1)) % n_features if h == -2147483648 else abs(h) % n_features
+            sign = -1.0 if self.vectorizer_params.get('alternate_sign') and h < 0 else 1.0
+            if len(self._feature_index) >= FEATURE_CACHE_SIZE:
+                self._feature_index = {}
+            feature = self._feature_index[ngram] = (index, sign)
+        return feature
+
+    def transform(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """HashingVectorizer.transform as raw CSR arrays, without sklearn's per-call validation overhead"""
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for text in texts:
+            counts: Dict[int, float] = {}
+            for ngram in self.analyzer(text):
+                index, sign = self._feature(ngram)
+                counts[index] = counts.get(index, 0.0) + sign
+            norm = math.sqrt(sum(v * v for v in counts.values())) if self.vectorizer_params.get('norm') == 'l2' else 0.0
+            indices.extend(counts)
+            data.extend([v / norm for v in counts.values()] if norm else counts.values())
+            indptr.append(len(indices))
+        return (np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64),
+                np.asarray(data, dtype=np.float32))
+
+    @classmethod
+    def train(cls, texts: List[str], departments: List[Optional[str]], priorities: List[Optional[str]],
+              vectorizer_params: Optional[Dict[str, Any]] = None, c: float = 10.0) -> 'LinearComplaintClassifier':
+        params = dict(vectorizer_params or VECTORIZER_PARAMS)
+        features = make_vectorizer(params).transform(texts)
+        heads = {}
+        for name, labels in (('department', departments), ('priority', priorities)):
+            rows = [i for i, label in enumerate(labels) if label is not None]
+            heads[name] = LinearHead.fit(features[rows], [labels[i] for i in rows], c)
+        return cls(params, heads)
+
+    def save(self, path: str):
+        """Write only the weight rows of features that occur in training (compressed .npz)"""
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        metadata = {'vectorizer': self.vectorizer_params, 'heads': {}}
+        for name, head in self.heads.items():
+            feature_ids = np.flatnonzero(np.any(head.weights != 0, axis=1)).astype(np.int32)
+            arrays[f'{name}_feature_ids'] = feature_ids
+            arrays[f'{name}_weights'] = head.weights[feature_ids]
+            arrays[f'{name}_intercept'] = head.intercept
+            metadata['heads'][name] = head.classes
+        arrays['metadata'] = np.frombuffer(json.dumps(metadata).encode('utf-8'), dtype=np.uint8)
+        # Write then rename, so a worker never loads a half-written artifact
+        tmp_path = out.with_name(f'{out.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, out)
+
+    @classmethod
+    def load(cls, path: str) -> 'LinearComplaintClassifier':
+        with np.load(path) as archive:
+            metadata = json.loads(archive['metadata'].tobytes().decode('utf-8'))
+            n_features = metadata['vectorizer']['n_features']
+            heads = {}
+            for name, classes in metadata['heads'].items():
+                weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+                weights[archive[f'{name}_feature_ids']] = archive[f'{name}_weights']
+                heads[name] = LinearHead(classes, weights, archive[f'{name}_intercept'])
+        logger.info(f'✅ Linear complaint classifier loaded from {path}')
+        return cls(metadata['vectorizer'], heads)
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Department, category and priority with their probabilities for a batch of complaints"""
+        indptr, indices, data = self.transform(texts)
+        logits = np.tile(self._intercept, (len(texts), 1))
+        if len(indices):
+            nonempty = np.diff(indptr) > 0
+            logits[nonempty] += np.add.reduceat(self._weights[indices] * data[:, None], indptr[:-1][nonempty], axis=0)
+        department_head, priority_head = self.heads['department'], self.heads['priority']
+        department_probs = softmax(logits[:, self._columns['department']])
+        priority_probs = softmax(logits[:, self._columns['priority']])
+        department_idx = department_probs.argmax(axis=1)
+        priority_idx = priority_probs.argmax(axis=1)
+
+        results = []
+        for row in range(len(texts)):
+            department = department_head.classes[department_idx[row]]
+            results.append({
+                'department': department,
+                'category': DEPARTMENT_CATEGORIES.get(department, department),
+                'confidence': round(float(department_probs[row, department_idx[row]]), 4),
+                'priority': priority_head.classes[priority_idx[row]],
+                'priority_confidence': round(float(priority_probs[row, priority_idx[row]]), 4)
+            })
+        return results
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        return self.predict_batch([text])[0]
+
+
+def load_linear_classifier(path: Optional[str] = None) -> Optional[LinearComplaintClassifier]:
+    """Load the trained artifact, training it in place first if it is missing"""
+    if not SKLEARN_AVAILABLE:
+        logger.warning('⚠️ scikit-learn not available, linear classifier disabled')
+        return None
+    model_path = Path(path) if path else DEFAULT_MODEL_PATH
+    if not model_path.exists():
+        logger.info(f'🔄 Training linear complaint classifier (no artifact at {model_path})...')
+        LinearComplaintClassifier.train(*training_examples()).save(str(model_path))
+    return LinearComplaintClassifier.load(str(model_path))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Train or query the Samadhan AI linear complaint classifier')
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help='Train on COMPLAINT_PATTERNS and the keyword lists')
+    train.add_argument('--out', default=str(DEFAULT_MODEL_PATH))
+    train.add_argument('--c', type=float, default=10.0, help='Inverse L2 regularization strength')
+    predict = sub.add_parser('predict', help='Classify complaints with a trained artifact')
+    predict.add_argument('texts', nargs='+')
+    predict.add_argument('--model', default=str(DEFAULT_MODEL_PATH))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    if args.command == 'train':
+        texts, departments, priorities = training_examples()
+        classifier = LinearComplaintClassifier.train(texts, departments, priorities, c=args.c)
+        classifier.save(args.out)
+        print(f'✅ Trained on {len(texts)} examples, saved {Path(args.out).stat().st_size / 1024:.0f} KiB to {args.out}')
+    else:
+        classifier = LinearComplaintClassifier.load(args.model)
+        for text, result in zip(args.texts, classifier.predict_batch(args.texts)):
+            print(f'{text!r}: {json.dumps(result)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Dynamic Micro-Batching for Sentence Encoding
+===========================================
+
+Concurrent request threads each want one or two sentences encoded. The
+batcher queues them and waits up to a few milliseconds, until N texts are
+pending or every in-flight caller has joined the batch. It then sorts the
+texts by length to minimise padding, runs a single batched forward pass and
+hands each caller back its own rows.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Drop-in replacement for model.encode(texts) that coalesces concurrent calls"""
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: 'queue.Queue[tuple]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        self._in_flight = 0
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so each gunicorn worker starts its own
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, name='encode-micro-batcher', daemon=True).start()
+                self._worker_pid = os.getpid()
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Queue texts for the next batch and block until their embeddings are ready"""
+        if not texts:
+            return self.model.encode([], **kwargs)
+        self._ensure_worker()
+        future: Future = Future()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._queue.put((list(texts), future))
+            return future.result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            pending = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            # Stop waiting once every caller currently inside encode() is in the batch
+            while pending < self.max_batch_size and len(batch) < self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                pending += len(item[0])
+            self._process(batch)
+
+    def _process(self, batch: List[tuple]):
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        # Length-sorted batches pad less inside the transformer
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        try:
+            sorted_embeddings = np.asarray(self.model.encode([texts[i] for i in order], batch_size=len(texts)))
+            embeddings = np.empty_like(sorted_embeddings)
+            embeddings[order] = sorted_embeddings
+        except Exception as e:
+            logger.error(f'❌ Batched encode failed: {e}')
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(texts)
+        start = 0
+        for request_texts, future in batch:
+            future.set_result(embeddings[start:start + len(request_texts)])
+            start += len(request_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
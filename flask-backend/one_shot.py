@@ -0,0 +1,107 @@
+"""
+One-Shot Analysis and Response for Samadhan AI
+=============================================
+
+A chat turn used to cost two LLM round trips that restate the same
+complaint: the OpenRouter JSON analysis, then the WatsonX / OpenRouter
+citizen response. In one-shot mode a single OpenRouter call returns both
+in one JSON object. The response is written with {contact}, {emergency},
+{response_time} and {department} placeholders, filled from the department
+the analysis settles on, so the prompt needs no department data up front.
+
+validate_one_shot() checks the object against ONE_SHOT_SCHEMA field by
+field; the caller keeps the valid fields and takes each invalid one from
+the local tiers (analysis fields) or a separate response call (response),
+so one bad field costs no more than the old two-call flow. OneShotStats
+counts how often each field had to fall back.
+"""
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+CATEGORIES = ('Infrastructure', 'Utilities', 'Environment', 'Traffic', 'Healthcare', 'Education', 'Other')
+PRIORITIES = ('low', 'medium', 'high', 'critical')
+DEPARTMENTS = ('Public Works', 'Water Supply', 'Environment', 'Traffic Police', 'Healthcare', 'Education',
+               'General Services')
+SENTIMENTS = ('positive', 'neutral', 'negative')
+
+# Placeholders the one-shot response may use; filled from the final department's info
+RESPONSE_PLACEHOLDERS = ('department', 'contact', 'emergency', 'response_time')
+
+ONE_SHOT_SCHEMA = {
+    'category': {'enum': CATEGORIES},
+    'priority': {'enum': PRIORITIES},
+    'department': {'enum': DEPARTMENTS},
+    'sentiment': {'enum': SENTIMENTS},
+    'district': {'type': str, 'nullable': True},
+    'confidence': {'type': (int, float), 'min': 0.0, 'max': 1.0},
+    'response': {'type': str, 'min_length': 20, 'max_length': 1500}
+}
+
+
+def validate_field(value: Any, rule: Dict[str, Any]) -> Tuple[bool, Any]:
+    """(valid, normalized value) for one field; enum values match case-insensitively"""
+    if value is None:
+        return rule.get('nullable', False), None
+    if 'enum' in rule:
+        if not isinstance(value, str):
+            return False, None
+        canonical = {option.lower(): option for option in rule['enum']}.get(value.strip().lower())
+        return canonical is not None, canonical
+    if isinstance(value, bool) or not isinstance(value, rule['type']):
+        return False, None
+    if isinstance(value, str):
+        value = value.strip()
+        if not rule.get('min_length', 0) <= len(value) <= rule.get('max_length', len(value)):
+            return False, None
+    elif not rule.get('min', value) <= value <= rule.get('max', value):
+        return False, None
+    return True, value
+
+
+def validate_one_shot(payload: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """(valid fields, names of missing or invalid fields) of the model's JSON object"""
+    if not isinstance(payload, dict):
+        return {}, list(ONE_SHOT_SCHEMA)
+    valid, invalid = {}, []
+    for name, rule in ONE_SHOT_SCHEMA.items():
+        ok, value = validate_field(payload.get(name), rule)
+        if ok:
+            valid[name] = value
+        else:
+            invalid.append(name)
+    return valid, invalid
+
+
+class OneShotStats:
+    """Thread-safe counters: one-shot calls, fully valid answers and per-field fallbacks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.complete = 0
+        self.failed = 0
+        self.field_fallbacks = {name: 0 for name in ONE_SHOT_SCHEMA}
+
+    def record(self, invalid: List[str]):
+        with self._lock:
+            self.requests += 1
+            self.complete += not invalid
+            for name in invalid:
+                self.field_fallbacks[name] += 1
+
+    def record_failed(self):
+        """The call failed or returned no JSON object; every field fell back"""
+        with self._lock:
+            self.requests += 1
+            self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'complete': self.complete,
+                'complete_rate': round(self.complete / self.requests, 4) if self.requests else None,
+                'failed': self.failed,
+                'field_fallbacks': dict(self.field_fallbacks)
+            }
@@ -0,0 +1,242 @@
+"""
+LLM Response Cache for Samadhan AI
+=================================
+
+Identical analysis prompts and identical response prompts went to the paid,
+slow external models every time. ResponseCache keys a provider's answer on
+a hash of (provider, model, rendered prompt, generation params) and keeps it
+in two tiers:
+
+  memory  per-process LRU with a TTL (always on)
+  shared  optional, shared by all workers and restarts: a SQLite file (WAL,
+          oldest-used rows trimmed past max_size) or Redis (TTL per key,
+          size bounded by the server's maxmemory LRU policy)
+
+A shared hit is copied into the memory tier. Shared-tier errors are logged,
+counted and treated as misses, so a lost Redis never fails a request.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def response_cache_key(provider: str, model: Optional[str], prompt: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable hash of everything that determines a provider's answer"""
+    payload = json.dumps([provider, model, prompt, params or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TierStats:
+    """Hit / miss / error counters for one tier"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'errors': self.errors
+        }
+
+
+class MemoryTier:
+    """Thread-safe LRU of responses with a TTL"""
+
+    name = 'memory'
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 86400):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'size': len(self._entries), 'max_size': self.max_size, 'evictions': self.evictions}
+
+
+class SQLiteTier:
+    """Responses in a SQLite file shared by every worker on the host"""
+
+    name = 'sqlite'
+    TRIM_EVERY = 100  # puts between size checks
+
+    def __init__(self, path: str, max_size: int = 100000, ttl_seconds: float = 86400):
+        self.path = path
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._puts = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                         'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process (connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute('SELECT value, expires_at FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            return None
+        conn.execute('UPDATE responses SET used_at = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def put(self, key: str, value: str):
+        conn = self._connection()
+        now = time.time()
+        conn.execute('INSERT OR REPLACE INTO responses (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)',
+                     (key, value, now + self.ttl_seconds, now))
+        self._puts += 1
+        if self._puts % self.TRIM_EVERY == 0:
+            self.trim()
+
+    def trim(self):
+        """Drop expired rows, then the least recently used ones beyond max_size"""
+        conn = self._connection()
+        conn.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+        conn.execute('DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY used_at DESC '
+                     'LIMIT -1 OFFSET ?)', (self.max_size,))
+
+    def stats(self) -> Dict[str, Any]:
+        size = self._connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return {'size': size, 'max_size': self.max_size, 'path': self.path}
+
+
+class RedisTier:
+    """Responses in Redis (key TTL; size bounded by maxmemory-policy allkeys-lru)"""
+
+    name = 'redis'
+    PREFIX = 'samadhan:llm:'
+
+    def __init__(self, url: str, ttl_seconds: float = 86400):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError('redis package not installed')
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.PREFIX + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def put(self, key: str, value: str):
+        self.client.set(self.PREFIX + key, value.encode('utf-8'), ex=int(self.ttl_seconds))
+
+    def stats(self) -> Dict[str, Any]:
+        return {'url': self.url.split('@')[-1]}  # no credentials
+
+
+class ResponseCache:
+    """Memory LRU in front of an optional shared tier, with per-tier hit ratios"""
+
+    def __init__(self, memory: MemoryTier, shared=None):
+        self.memory = memory
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._stats = {memory.name: TierStats()}
+        if shared is not None:
+            self._stats[shared.name] = TierStats()
+
+    def _count(self, tier: str, field: str):
+        with self._lock:
+            setattr(self._stats[tier], field, getattr(self._stats[tier], field) + 1)
+
+    def get(self, *keys: str) -> Optional[str]:
+        """First cached value among keys (e.g. one per provider that could have answered); one lookup per tier"""
+        value = next((v for v in map(self.memory.get, keys) if v is not None), None)
+        self._count(self.memory.name, 'hits' if value is not None else 'misses')
+        if value is not None or self.shared is None:
+            return value
+
+        for key in keys:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f'⚠️ {self.shared.name} response cache read failed: {e}')
+                self._count(self.shared.name, 'errors')
+                break
+            if value is not None:
+                self.memory.put(key, value)
+                break
+        self._count(self.shared.name, 'hits' if value is not None else 'misses')
+        return value
+
+    def put(self, key: str, value: str):
+        self.memory.put(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.put(key, value)
+            except Exception as e:
+                logger.warning(f'⚠️ {self.shared.name} response cache write failed: {e}')
+                self._count(self.shared.name, 'errors')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = {name: stats.as_dict() for name, stats in self._stats.items()}
+        tiers[self.memory.name].update(self.memory.stats())
+        if self.shared is not None:
+            try:
+                tiers[self.shared.name].update(self.shared.stats())
+            except Exception as e:
+                tiers[self.shared.name]['status'] = f'unavailable: {e}'
+        lookups = tiers[self.memory.name]['hits'] + tiers[self.memory.name]['misses']
+        hits = sum(tier['hits'] for tier in tiers.values())
+        return {
+            'tiers': tiers,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0
+        }
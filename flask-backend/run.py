@@ -5,7 +5,7 @@ Production runner for Samadhan AI Flask Backend
 
 import os
 import sys
-from app import app
+from app import app, start_warmup
 
 if __name__ == '__main__':
     # Get port from environment or default to 5000
@@ -17,6 +17,10 @@ if __name__ == '__main__':
     print(f"🚀 Starting Samadhan AI Flask Backend on port {port}")
     print(f"🔧 Debug mode: {debug}")
     
+    # With debug on, only the reloader's serving child loads the models
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warmup()
+    
     # Run the application
     app.run(
         host='0.0.0.0',
@@ -0,0 +1,197 @@
+"""
+Semantic Response Cache for Samadhan AI
+======================================
+
+During an outage hundreds of citizens report the same problem in their own
+words ("no water supply in Gomti Nagar for 3 days", "paani nahi aa raha 3
+din se Gomti Nagar"), and each one used to trigger a fresh WatsonX /
+OpenRouter generation. The exact-prompt cache (response_cache.py) never
+matches them; this one matches on meaning.
+
+A response is stored as a template under (category, priority, language)
+with the complaint's embedding (the same MiniLM vectors the kNN tier uses).
+A later complaint in the same partition whose cosine similarity to a stored
+one reaches the threshold reuses its response:
+
+  - contact fields (contact, emergency, email, head, response time) and the
+    district are placeholders, re-filled from the new request
+  - every other word the response shares with its complaint, in any
+    script (a locality like "Gomti Nagar" or "गोमती नगर", a count like the
+    3 in "3 days"), must also appear in the new complaint, or the entry is
+    rejected, so one neighbourhood's answer is not sent to another;
+    function words are exempt
+
+Entries live in one fixed-size matrix (LRU eviction, TTL expiry). stats()
+reports the hit rate and the distribution of best-match similarities, to
+tune the threshold against real traffic; the app keeps the cache off
+(SEMANTIC_CACHE_ENABLED) until that has been done.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, FrozenSet, Hashable, Optional, Set, Tuple
+
+import numpy as np
+
+SIMILARITY_BUCKETS = (0.5, 0.7, 0.8, 0.85, 0.9, 0.95)
+
+# \w alone splits Devanagari at its vowel signs; the block's letters and marks, without the dandas
+_WORD = re.compile('[\\wऀ-ॣ०-ॿ]+')
+_PLACEHOLDER = re.compile(r'\{\w+\}')
+
+# Words any two complaints may share without being about the same place or event
+FUNCTION_WORDS = frozenset(
+    'a an the and or of in on at to for from with by is are was were be been has have had will shall can '
+    'please this that these those it its we our us you your they their he she his her i my me not no '
+    'hai hain se me mein ka ki ke ko aur par bhi ye yeh wo woh hum aap ne to hi tha thi '
+    'है हैं से में का की के को और पर भी यह वह हम आप ने तो ही था थी'.split()
+)
+
+
+def tokens(text: str) -> Set[str]:
+    return set(_WORD.findall(text.casefold()))
+
+
+def make_template(response: str, complaint_text: str, fields: Dict[str, Optional[str]]) -> Tuple[str, FrozenSet[str]]:
+    """(template, required terms) for a response generated for complaint_text
+
+    Field values become {name} placeholders. Required terms are the words (any script) and numbers
+    the rest of the response shares with the complaint, function words aside.
+    """
+    template = response
+    for name, value in fields.items():
+        if value and len(value) > 1:
+            template = re.sub(rf'(?<!\w){re.escape(value)}(?!\w)', '{' + name + '}', template,
+                              flags=re.IGNORECASE)
+
+    shared = tokens(_PLACEHOLDER.sub(' ', template)) & tokens(complaint_text)
+    required = {term for term in shared if term not in FUNCTION_WORDS and (len(term) > 1 or term.isdigit())}
+    return template, frozenset(required)
+
+
+def fill_template(template: str, fields: Dict[str, Optional[str]]) -> Optional[str]:
+    """The template with every placeholder filled, or None when a field it uses is missing"""
+    for name, value in fields.items():
+        placeholder = '{' + name + '}'
+        if placeholder in template:
+            if not value:
+                return None
+            template = template.replace(placeholder, value)
+    return template
+
+
+class SemanticResponseCache:
+    """Thread-safe nearest-neighbour response cache, partitioned by (category, priority, language)"""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 21600, threshold: float = 0.9,
+                 window: int = 1000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim), allocated on the first put
+        self._partition = np.full(max_entries, -1, dtype=np.int32)  # -1: free slot
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._entries: Dict[int, Tuple[str, FrozenSet[str]]] = {}
+        self._lru: 'OrderedDict[int, None]' = OrderedDict()
+        self._partition_ids: Dict[Hashable, int] = {}
+        self._similarities = deque(maxlen=window)
+        self.lookups = 0
+        self.hits = 0
+        self.rejected = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _free(self, slots: np.ndarray):
+        # Caller holds the lock
+        for slot in slots.tolist():
+            self._partition[slot] = -1
+            self._entries.pop(slot, None)
+            self._lru.pop(slot, None)
+
+    def get(self, partition: Hashable, vector: np.ndarray, complaint_text: str,
+            fields: Dict[str, Optional[str]]) -> Optional[Tuple[str, float]]:
+        """(response, similarity) of the closest stored complaint at or above the threshold, or None"""
+        with self._lock:
+            self.lookups += 1
+            pid = self._partition_ids.get(partition)
+            if pid is None or self._vectors is None:
+                return None
+            slots = np.flatnonzero(self._partition == pid)
+            expired = slots[self._expires_at[slots] < time.monotonic()]
+            if len(expired):
+                self._free(expired)
+                self.expirations += len(expired)
+                slots = np.setdiff1d(slots, expired, assume_unique=True)
+            if not len(slots):
+                return None
+
+            similarities = self._vectors[slots] @ np.asarray(vector, dtype=np.float32).ravel()
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            self._similarities.append(similarity)
+            if similarity < self.threshold:
+                return None
+
+            slot = int(slots[best])
+            template, required = self._entries[slot]
+            response = fill_template(template, fields) if required <= tokens(complaint_text) else None
+            if response is None:
+                self.rejected += 1
+                return None
+            self._lru.move_to_end(slot)
+            self.hits += 1
+            return response, similarity
+
+    def put(self, partition: Hashable, vector: np.ndarray, response: str, complaint_text: str,
+            fields: Dict[str, Optional[str]]):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        template, required = make_template(response, complaint_text, fields)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            pid = self._partition_ids.setdefault(partition, len(self._partition_ids))
+
+            free = np.flatnonzero(self._partition == -1)
+            if len(free):
+                slot = int(free[0])
+            else:
+                slot = next(iter(self._lru))
+                self._free(np.array([slot]))
+                self.evictions += 1
+
+            self._vectors[slot] = vector
+            self._partition[slot] = pid
+            self._expires_at[slot] = time.monotonic() + self.ttl_seconds
+            self._entries[slot] = (template, required)
+            self._lru[slot] = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = np.fromiter(self._similarities, dtype=np.float64)
+            counts = np.histogram(samples, bins=(-1.0,) + SIMILARITY_BUCKETS + (1.01,))[0] if len(samples) else None
+            edges = ([f'<{SIMILARITY_BUCKETS[0]}']
+                     + [f'{low}-{high}' for low, high in zip(SIMILARITY_BUCKETS, SIMILARITY_BUCKETS[1:])]
+                     + [f'>={SIMILARITY_BUCKETS[-1]}'])
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'threshold': self.threshold,
+                'partitions': len(self._partition_ids),
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_ratio': round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                'rejected': self.rejected,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'similarity': {
+                    'samples': len(samples),
+                    'p10': round(float(np.percentile(samples, 10)), 4),
+                    'p50': round(float(np.percentile(samples, 50)), 4),
+                    'p90': round(float(np.percentile(samples, 90)), 4),
+                    'histogram': dict(zip(edges, counts.tolist()))
+                } if len(samples) else None
+            }
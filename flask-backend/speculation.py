@@ -0,0 +1,57 @@
+"""
+Speculative Response Generation for Samadhan AI
+==============================================
+
+/api/ai/chat and /api/ai/analyze used to wait for the LLM analysis
+(OpenRouter) before starting the response (WatsonX, then OpenRouter), so a
+citizen waited for two or three LLM round trips in series. The pipeline now
+starts the response right away from the local tiers' category and priority
+guess. The response is kept when the LLM analysis resolves to the same
+department and priority, because it quotes that department's contacts and,
+when urgent, its emergency line. A mismatch cancels the speculative
+response and regenerates it after the analysis.
+
+SpeculationStats records how often the guess held and how much latency the
+overlap saved, for /health.
+"""
+
+import threading
+from typing import Any, Dict
+
+
+class SpeculationStats:
+    """Thread-safe outcome counters for speculative responses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.matched = 0
+        self.regenerated = 0
+        self.skipped = 0
+        self.saved_ms = 0.0
+
+    def record(self, matched: bool, analysis_ms: float, response_ms: float, total_ms: float):
+        """One speculative request; serial latency would have been analysis_ms + response_ms"""
+        with self._lock:
+            if matched:
+                self.matched += 1
+                self.saved_ms += max(0.0, analysis_ms + response_ms - total_ms)
+            else:
+                self.regenerated += 1
+
+    def record_skipped(self):
+        """No free speculation slot; the request ran serially"""
+        with self._lock:
+            self.skipped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            speculated = self.matched + self.regenerated
+            return {
+                'speculated': speculated,
+                'matched': self.matched,
+                'regenerated': self.regenerated,
+                'skipped': self.skipped,
+                'match_rate': self.matched / speculated if speculated else None,
+                'saved_ms_total': round(self.saved_ms, 1),
+                'saved_ms_avg': round(self.saved_ms / speculated, 1) if speculated else None
+            }
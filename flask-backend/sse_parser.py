@@ -0,0 +1,119 @@
+"""
+Incremental SSE Parser for Samadhan AI
+=====================================
+
+WatsonX streams its answer as OpenAI-style server-sent events:
+
+    data: {"choices": [{"delta": {"content": "..."}}]}
+
+    data: [DONE]
+
+SSEDeltaParser takes the raw response bytes in whatever chunks the socket
+delivers and returns the content deltas of the events completed so far.
+Chunks are appended to one bytearray, and only the bytes not searched yet
+are scanned for the last line end. The complete lines before it are
+decoded in one call straight out of the buffer (through a memoryview) and
+split; the incomplete tail stays behind as bytes. So an event spanning
+many chunks is not re-split on each one, and a multi-byte character cut
+by a chunk boundary is never decoded half.
+
+Events follow the SSE rules: lines end in \\n or \\r\\n, a blank line ends
+an event, and several `data:` lines in one event are joined with \\n.
+Servers that leave out the blank line between events still work: a joined
+payload that is not one JSON document is parsed line by line instead.
+`[DONE]` ends the stream; everything after it is ignored.
+"""
+
+import json
+from typing import Iterable, Iterator, List, Optional
+
+DONE = '[DONE]'
+
+_decode_json = json.JSONDecoder().decode
+
+
+def delta_content(payload: str) -> Optional[str]:
+    """Text of one `data:` payload (choices[0].delta.content), or None"""
+    try:
+        choices = _decode_json(payload).get('choices', [])
+        return choices[0].get('delta', {}).get('content') if choices else None
+    except (json.JSONDecodeError, AttributeError, IndexError, KeyError, TypeError):
+        return None
+
+
+class SSEDeltaParser:
+    """Incremental parser: feed() raw chunks, get back the content deltas of the events they complete"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scanned = 0  # buffer bytes already searched for a line end
+        self._data: List[str] = []  # data lines of the event in progress
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[str]:
+        if self.done or not chunk:
+            return []
+        buffer = self._buffer
+        buffer += chunk
+        end = buffer.rfind(b'\n', self._scanned)
+        if end < 0:
+            self._scanned = len(buffer)
+            return []
+        with memoryview(buffer) as view:
+            lines = str(view[:end], 'utf-8', 'replace').split('\n')
+        del buffer[:end + 1]
+        self._scanned = len(buffer)
+
+        deltas = []
+        data = self._data
+        for line in lines:
+            if line.startswith('data:'):
+                line = line[6:] if line[5:6] == ' ' else line[5:]  # one optional space after the colon
+                data.append(line[:-1] if line[-1:] == '\r' else line)
+            elif not line or line == '\r':
+                if data:
+                    self._dispatch(deltas)
+                    if self.done:
+                        break
+            # event:, id:, retry: and `:` comment lines carry nothing we use
+        return deltas
+
+    def close(self) -> List[str]:
+        """Deltas of an unterminated last line or event once the stream has ended"""
+        deltas = []
+        if not self.done:
+            deltas = self.feed(b'\n\n')
+        self._buffer.clear()
+        self._data.clear()
+        self.done = True
+        return deltas
+
+    def _dispatch(self, deltas: List[str]):
+        data = self._data
+        payload = data[0] if len(data) == 1 else '\n'.join(data)
+        if payload.strip() == DONE:
+            self.done = True
+        else:
+            content = delta_content(payload)
+            if content is None and len(data) > 1:
+                # No blank line between events: each data line is its own payload
+                for line in data:
+                    if line.strip() == DONE:
+                        self.done = True
+                        break
+                    content = delta_content(line)
+                    if content:
+                        deltas.append(content)
+            elif content:
+                deltas.append(content)
+        data.clear()
+
+
+def iter_sse_deltas(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Content deltas of an SSE byte stream, as they are completed; stops at [DONE]"""
+    parser = SSEDeltaParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
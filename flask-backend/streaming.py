@@ -0,0 +1,76 @@
+"""
+Streaming Responses for Samadhan AI
+==================================
+
+/api/ai/chat/stream sends the chat turn as server-sent events instead of
+one JSON body, so the citizen sees the answer while WatsonX is still
+generating it:
+
+  event: analysis  the complaint analysis, as soon as it is known
+  event: token     {"text": ...} cleaned response text, piece by piece
+  event: done      {"response": ...} the full response; authoritative, since
+                   a provider failing midway is replaced by the fallback
+  event: error     {"error": ..., "response": ...} the turn failed
+
+StreamingCleaner applies clean_ai_response to a token stream: text is
+released once it is settled (complete words, no unclosed markdown span),
+so markdown split across tokens is still stripped and nothing already sent
+has to be taken back.
+"""
+
+import json
+from typing import Any, Callable, Dict
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'  # nginx: pass events through unbuffered
+}
+
+_PAIRED_MARKERS = ('`', '*')
+
+
+def sse_event(event: str, payload: Dict[str, Any], dumps: Callable[[Any], str] = json.dumps) -> str:
+    """One server-sent event with a JSON payload"""
+    return f'event: {event}\ndata: {dumps(payload)}\n\n'
+
+
+class StreamingCleaner:
+    """Incremental clean_ai_response: feed() raw deltas, get back the newly settled cleaned text"""
+
+    def __init__(self, clean: Callable[[str], str]):
+        self.clean = clean
+        self.raw = ''
+        self.sent = ''
+
+    def _settled(self) -> str:
+        # Complete words only, and nothing from an unclosed `code` / *emphasis* / [link]( on
+        end = max(self.raw.rfind(' '), self.raw.rfind('\n'))
+        text = self.raw[:end] if end > 0 else ''
+        for marker in _PAIRED_MARKERS:
+            if text.count(marker) % 2:
+                text = text[:text.rfind(marker)]
+        opened = text.rfind('[')
+        if opened >= 0 and ')' not in text[opened:]:
+            text = text[:opened]
+        return text
+
+    def _release(self, text: str) -> str:
+        cleaned = self.clean(text)
+        if not cleaned.startswith(self.sent):
+            return ''  # cleaning rewrote sent text; the done event carries the final version
+        piece = cleaned[len(self.sent):]
+        self.sent = cleaned
+        return piece
+
+    def feed(self, delta: str) -> str:
+        self.raw += delta
+        return self._release(self._settled())
+
+    def finish(self) -> str:
+        """Whatever is left once the stream has ended"""
+        return self._release(self.raw)
+
+    @property
+    def text(self) -> str:
+        """The full cleaned response so far"""
+        return self.clean(self.raw)
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from circuit_breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, ProviderError,
+                             counts_as_failure)
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = dict(max_timeout=30.0, min_timeout=1.0, window=10, min_calls=4, failure_rate=0.5, open_seconds=0.05)
+    options.update(kwargs)
+    return CircuitBreaker('test', **options)
+
+
+def call(breaker: CircuitBreaker, error: Exception = None):
+    with breaker.guard():
+        if error:
+            raise error
+
+
+def fail(breaker: CircuitBreaker, times: int = 1):
+    for _ in range(times):
+        with pytest.raises(ProviderError):
+            call(breaker, ProviderError('upstream 503', 503))
+
+
+def trip(breaker: CircuitBreaker):
+    fail(breaker, breaker.min_calls)
+    assert breaker.state == OPEN
+
+
+def test_opens_once_the_window_reaches_the_failure_rate():
+    breaker = make_breaker()
+    fail(breaker, 3)
+    assert breaker.state == CLOSED  # below min_calls
+
+    breaker = make_breaker()
+    for _ in range(5):
+        call(breaker)
+    fail(breaker, 4)
+    assert breaker.state == CLOSED  # 4 failures in 9
+    fail(breaker)
+    assert breaker.state == OPEN  # 5 failures in 10
+
+
+def test_opens_at_the_failure_rate_and_fails_fast():
+    breaker = make_breaker()
+    trip(breaker)
+    with pytest.raises(CircuitOpenError):
+        call(breaker)
+    assert breaker.rejected == 1
+    assert breaker.times_opened == 1
+
+
+def test_half_open_admits_a_single_trial():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    with breaker.guard():
+        with pytest.raises(CircuitOpenError):
+            call(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_failed_trial_reopens():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(0.06)
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_calls_admitted_before_a_transition_do_not_count_after_it():
+    breaker = make_breaker()
+    with breaker.guard():
+        trip(breaker)
+        time.sleep(0.06)
+        assert breaker.state == HALF_OPEN
+    # The old call's success must not close the breaker; only the trial decides
+    assert breaker.state == HALF_OPEN
+
+
+def test_client_errors_and_open_circuits_are_not_provider_failures():
+    assert not counts_as_failure(ProviderError('bad key', 401))
+    assert not counts_as_failure(CircuitOpenError('open'))
+    assert counts_as_failure(ProviderError('rate limited', 429))
+    assert counts_as_failure(ConnectionError('reset'))
+
+    breaker = make_breaker()
+    for _ in range(6):
+        with pytest.raises(ProviderError):
+            call(breaker, ProviderError('bad key', 401))
+    assert breaker.state == CLOSED
+
+
+def test_timeout_follows_recent_latencies():
+    breaker = make_breaker(min_calls=3, timeout_multiplier=3.0)
+    assert breaker.timeout() == 30.0
+    for _ in range(3):
+        with breaker.guard() as timer:
+            timer.started -= 2.0  # a 2 s call
+    assert breaker.timeout() == pytest.approx(6.0, abs=0.05)
+
+    fast = make_breaker(min_calls=3)
+    for _ in range(3):
+        call(fast)
+    assert fast.timeout() == 1.0  # clamped to min_timeout
@@ -0,0 +1,55 @@
+import pytest
+
+from district_extractor import DistrictExtractor
+
+
+@pytest.fixture(scope='module')
+def extractor() -> DistrictExtractor:
+    return DistrictExtractor.from_dataset()
+
+
+@pytest.mark.parametrize('text, district', [
+    ('Street lights not working in Lucknow', 'Lucknow'),
+    ('लखनऊ में पानी नहीं आ रहा', 'Lucknow'),
+    ('Road broken near the station, Prayagraj', 'Allahabad'),
+    ('Garbage everywhere in Noida sector 62', 'Gautam Buddha Nagar'),
+    ('Gaziabad me bijli nahi hai', 'Ghaziabad'),
+    ('Hospital in Siddharth Nagar has no doctor', 'Siddharthnagar'),
+    ('Water logging in Rae Bareli', 'Raebareli'),
+    ('Banda district me sadak tooti hai', 'Banda'),
+    ('जिला बस्ती में नाली बंद है', 'Basti'),
+    ('Transformer burnt, district LKO', 'Lucknow'),
+    ('GKP dist. me paani nahi', 'Gorakhpur'),
+    ('जिला GKP', 'Gorakhpur')
+])
+def test_finds_the_district(extractor, text, district):
+    assert extractor.extract(text) == district
+
+
+@pytest.mark.parametrize('text', [
+    'hamari basti me kachra nahi uthaya gaya',
+    'ek banda roz raat ko shor karta hai',
+    'AUR BHI PROBLEM HAI, SADAK TOOTI HAI',
+    'DOR to DOR garbage collection band hai',
+    'ETH wallet scam, please register my cyber complaint',
+    'LKO is where I work',
+    'Street lights not working for two weeks'
+])
+def test_ordinary_words_and_bare_codes_are_not_districts(extractor, text):
+    assert extractor.extract(text) is None
+
+
+def test_most_mentioned_district_wins_then_the_earliest(extractor):
+    assert extractor.extract('Moved from Agra to Meerut; Meerut office ignores me') == 'Meerut'
+    assert extractor.extract('Agra and Meerut both') == 'Agra'
+
+
+def test_name_inside_a_longer_name_is_dropped(extractor):
+    assert [match.district for match in extractor.find_all('Rae Bareli')] == ['Raebareli']
+
+
+def test_district_info_merges_major_district_contacts(extractor):
+    info = extractor.district_info('Kanpur')
+    assert info['district'] == 'Kanpur Nagar'
+    assert 'dm_contact' in info
+    assert extractor.district_info('nowhere') == {}
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from embedding_cache import CachedEncoder, EmbeddingCache, normalize_complaint_text
+
+
+class CountingModel:
+    """Deterministic stand-in for the sentence encoder that records what it was asked to encode"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.mark.parametrize('variant', [
+    'Street lights not working',
+    '  street   LIGHTS not\tworking\n',
+    'ＳＴＲＥＥＴ lights not working',  # full-width letters (NFKC)
+    'Street\u00a0lights not working'  # no-break space
+])
+def test_variants_share_one_key(variant):
+    assert normalize_complaint_text(variant) == 'street lights not working'
+
+
+def test_devanagari_digits_and_casefold():
+    assert normalize_complaint_text('वार्ड १२ में ४ दिन से पानी नहीं') == 'वार्ड 12 में 4 दिन से पानी नहीं'
+    assert normalize_complaint_text('Straße') == 'strasse'
+    assert normalize_complaint_text(None) == ''
+
+
+def test_encoder_reuses_vectors_for_normalized_duplicates():
+    model = CountingModel()
+    encoder = CachedEncoder(model, EmbeddingCache(max_size=10))
+    first = encoder.encode(['Garbage not collected', 'GARBAGE  not collected'])
+    assert model.calls == [['garbage not collected']]
+    np.testing.assert_array_equal(first[0], first[1])
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-6)
+
+    encoder.encode(['garbage not collected'])
+    assert len(model.calls) == 1
+
+
+def test_store_false_reads_but_does_not_fill_the_cache():
+    model = CountingModel()
+    cache = EmbeddingCache(max_size=10)
+    encoder = CachedEncoder(model, cache)
+    encoder.encode(['ingested complaint'], store=False)
+    encoder.encode(['ingested complaint'], store=False)
+    assert len(model.calls) == 2 and cache.stats()['size'] == 0
+
+
+def test_lru_eviction_and_ttl():
+    cache = EmbeddingCache(max_size=2, ttl_seconds=3600)
+    for key in 'abc':
+        cache.put(key, np.ones(3))
+    assert cache.get('a') is None and cache.evictions == 1
+
+    expired = EmbeddingCache(max_size=2, ttl_seconds=-1)
+    expired.put('a', np.ones(3))
+    assert expired.get('a') is None and expired.expirations == 1
+
+
+def test_cached_vectors_are_read_only():
+    cache = EmbeddingCache()
+    cache.put('a', np.ones(3))
+    with pytest.raises(ValueError):
+        cache.get('a')[0] = 2.0
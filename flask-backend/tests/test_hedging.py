@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+import app
+from hedging import PRIMARY, SECONDARY, HedgePolicy
+
+
+def test_fixed_delay_until_enough_samples():
+    policy = HedgePolicy(initial_delay_ms=2000, min_samples=3)
+    policy.record_first_token(100)
+    policy.record_first_token(120)
+    assert policy.delay_ms() == 2000
+
+
+def test_delay_is_a_clamped_percentile():
+    policy = HedgePolicy(percentile=50, min_delay_ms=250, max_delay_ms=1000, min_samples=3)
+    for elapsed in (400, 500, 600):
+        policy.record_first_token(elapsed)
+    assert policy.delay_ms() == pytest.approx(500)
+    for elapsed in (5000, 6000, 7000, 8000):
+        policy.record_first_token(elapsed)
+    assert policy.delay_ms() == 1000
+
+
+def test_outcome_counters():
+    policy = HedgePolicy()
+    policy.record(False, PRIMARY)
+    policy.record(True, SECONDARY)
+    policy.record(True)
+    stats = policy.stats()
+    assert (stats['requests'], stats['hedged'], stats['primary_wins'], stats['secondary_wins'], stats['failed']) \
+        == (3, 2, 1, 1, 1)
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Fake WatsonX / OpenRouter calls for app.generate_hedged_response; set the attributes to shape them"""
+    fake = type('Providers', (), {})()
+    fake.watsonx_delay, fake.watsonx_error, fake.openrouter_delay = 0.0, None, 0.0
+    fake.openrouter_calls = 0
+    fake.watsonx_cancelled = threading.Event()
+
+    def call_watsonx_streaming(request_body, on_first_token=None, cancel=None):
+        deadline = time.perf_counter() + fake.watsonx_delay
+        while time.perf_counter() < deadline:
+            if cancel is not None and cancel.is_set():
+                fake.watsonx_cancelled.set()
+                return ''
+            time.sleep(0.005)
+        if fake.watsonx_error:
+            raise fake.watsonx_error
+        if on_first_token:
+            on_first_token()
+        return 'watsonx answer'
+
+    def call_openrouter_api(prompt, model=None, max_tokens=500):
+        fake.openrouter_calls += 1
+        time.sleep(fake.openrouter_delay)
+        return 'openrouter answer'
+
+    monkeypatch.setattr(app, 'call_watsonx_streaming', call_watsonx_streaming)
+    monkeypatch.setattr(app, 'call_openrouter_api', call_openrouter_api)
+    monkeypatch.setattr(app, 'hedge_policy', HedgePolicy(initial_delay_ms=50))
+    return fake
+
+
+def test_fast_primary_is_not_hedged(providers):
+    assert app.generate_hedged_response({}, 'prompt') == ('watsonx', 'watsonx answer')
+    assert providers.openrouter_calls == 0
+    assert app.hedge_policy.stats()['hedged'] == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled_when_the_secondary_wins(providers):
+    providers.watsonx_delay = 1.0
+    assert app.generate_hedged_response({}, 'prompt') == ('openrouter', 'openrouter answer')
+    assert providers.watsonx_cancelled.wait(1.0)
+    assert app.hedge_policy.stats()['secondary_wins'] == 1
+
+
+def test_failed_primary_falls_back_without_waiting_for_the_delay(providers, monkeypatch):
+    providers.watsonx_error = ConnectionError('reset')
+    monkeypatch.setattr(app, 'hedge_policy', HedgePolicy(initial_delay_ms=5000))
+    started = time.perf_counter()
+    assert app.generate_hedged_response({}, 'prompt') == ('openrouter', 'openrouter answer')
+    assert time.perf_counter() - started < 1.0
+
+
+def test_caller_cancel_returns_nothing(providers):
+    providers.watsonx_delay = 1.0
+    providers.openrouter_delay = 1.0
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    assert app.generate_hedged_response({}, 'prompt', cancel) is None
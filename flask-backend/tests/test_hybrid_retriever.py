@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+import pytest
+
+from hybrid_retriever import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCUMENTS = [
+    'Transformer burnt in the village, no electricity for three days',
+    'Garbage not collected from the colony for a week',
+    'No doctor at the district hospital, dengue patients waiting',
+    'Electricity bill is wrong, electricity department not responding'
+]
+
+
+def reference_bm25(query: str, doc_id: int, k1: float = 1.5, b: float = 0.75) -> float:
+    documents = [tokenize(text) for text in DOCUMENTS]
+    avg_length = sum(map(len, documents)) / len(documents)
+    score = 0.0
+    for term in set(tokenize(query)):
+        df = sum(term in tokens for tokens in documents)
+        tf = documents[doc_id].count(term)
+        if not tf:
+            continue
+        idf = math.log1p((len(documents) - df + 0.5) / (df + 0.5))
+        score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(documents[doc_id]) / avg_length))
+    return score
+
+
+def test_tokenize_drops_stopwords_and_keeps_devanagari():
+    assert tokenize('No water in the बस्ती since Monday') == ['water', 'बस्ती', 'monday']
+
+
+def test_bm25_ranks_exact_terms_first():
+    index = BM25Index.build(DOCUMENTS)
+    ids, scores = index.search(['dengue patients', 'electricity'], k=2)
+    assert ids[0, 0] == 2
+    assert ids[0, 1] == -1 and scores[0, 1] == 0
+    # Two occurrences in a comparable document outrank one
+    assert list(ids[1]) == [3, 0]
+
+
+def test_bm25_scores_match_the_okapi_formula():
+    index = BM25Index.build(DOCUMENTS)
+    query = 'electricity transformer village'
+    ids, scores = index.search([query], k=len(DOCUMENTS))
+    for doc_id, score in zip(ids[0], scores[0]):
+        if doc_id >= 0:
+            assert score == pytest.approx(reference_bm25(query, doc_id), rel=1e-5)
+
+
+def test_bm25_query_without_known_terms_is_padding():
+    index = BM25Index.build(DOCUMENTS)
+    ids, scores = index.search(['the and of', 'xyzzy'], k=3)
+    assert (ids == -1).all() and (scores == 0).all()
+
+
+def test_bm25_k_is_clipped_to_the_corpus():
+    index = BM25Index.build(DOCUMENTS)
+    ids, _ = index.search(['electricity'], k=50)
+    assert ids.shape == (1, len(DOCUMENTS))
+
+
+def test_rrf_prefers_documents_ranked_by_both_legs():
+    dense = np.array([5, 7, 9])
+    sparse = np.array([7, 1, -1])
+    ids, scores = reciprocal_rank_fusion([dense, sparse], k=4, rrf_k=60)
+    assert ids[0] == 7
+    assert scores[0] == pytest.approx(1 / 62 + 1 / 61)
+    assert list(ids[1:]) == [5, 1, 9]
+    assert scores[1] == pytest.approx(1 / 61) and scores[2] == pytest.approx(1 / 62)
+
+
+def test_rrf_pads_when_fewer_candidates_than_k():
+    ids, scores = reciprocal_rank_fusion([np.array([3, -1]), np.array([-1, -1])], k=3)
+    assert list(ids) == [3, -1, -1]
+    assert scores[1:].tolist() == [0, 0]
+
+
+def test_rrf_of_empty_rankings():
+    ids, scores = reciprocal_rank_fusion([np.array([-1]), np.array([], dtype=np.int64)], k=2)
+    assert list(ids) == [-1, -1] and not scores.any()
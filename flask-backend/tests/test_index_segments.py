@@ -0,0 +1,43 @@
+import random
+
+from index_segments import plan_merge
+
+
+def merge(counts, plan):
+    start, end = plan
+    return counts[:start] + [sum(counts[start:end])] + counts[end:]
+
+
+def test_no_merge_within_the_segment_budget():
+    assert plan_merge([100, 10, 10], max_segments=3) is None
+    assert plan_merge([5], max_segments=0) is None
+
+
+def test_merges_a_full_run_of_one_size_class():
+    assert plan_merge([1000, 10, 10, 10, 10], max_segments=2) == (1, 5)
+
+
+def test_lowest_size_class_first():
+    assert plan_merge([10, 10, 10, 10, 1, 1, 1, 1], max_segments=4) == (4, 8)
+
+
+def test_without_a_run_merges_the_cheapest_window():
+    # Classes 4, 3, 2: no run of 4. Merging [200, 50] rewrites 250 documents per segment removed,
+    # [1000, 200] 1200 and all three 625
+    assert plan_merge([1000, 200, 50], max_segments=2) == (1, 3)
+
+
+def test_compaction_always_reaches_the_budget():
+    rng = random.Random(7)
+    counts, merges = [], 0
+    for _ in range(500):
+        counts.append(rng.choice([1, 5, 20, 200]))
+        plan = plan_merge(counts, max_segments=6)
+        while plan is not None:
+            total = sum(counts)
+            counts = merge(counts, plan)
+            assert sum(counts) == total
+            merges += 1
+            plan = plan_merge(counts, max_segments=6)
+        assert len(counts) <= 6
+    assert merges < 500
@@ -0,0 +1,61 @@
+from keyword_engine import KeywordAutomaton, KeywordEngine
+
+DEPARTMENTS = {
+    'Electricity': {'priority_keywords': ['transformer', 'power cut', 'electricity']},
+    'Food and Civil Supplies': {'priority_keywords': ['ration', 'pds']},
+    'Urban Development': {'priority_keywords': ['street light', 'garbage', 'tree']}
+}
+
+PRIORITY_KEYWORDS = {
+    'critical': {'general': ['fire', 'accident']},
+    'high': {'general': ['urgent'], 'electricity': ['transformer']},
+    'low': {'general': ['suggestion']}
+}
+
+
+def make_engine() -> KeywordEngine:
+    return KeywordEngine(DEPARTMENTS, PRIORITY_KEYWORDS)
+
+
+def test_keywords_start_on_a_word_boundary():
+    hits = make_engine().analyze('Declaration form updates pending near the streets')
+    assert hits.department_scores == {}
+
+
+def test_keywords_may_end_inside_a_word():
+    hits = make_engine().analyze('Street lights off, urgently need help after two accidents')
+    assert hits.keywords('department') == ['street light']
+    assert hits.priority() == 'critical'
+
+
+def test_longest_keyword_and_its_prefixes_both_match():
+    automaton = KeywordAutomaton.build([('power', 'short'), ('power cut', 'long')])
+    assert automaton.scan('Power  cut since morning') == {('short', 'power'), ('long', 'power cut')}
+
+
+def test_whole_words_requires_a_boundary_at_the_end():
+    automaton = KeywordAutomaton.build([('agra', 'Agra')], whole_words=True)
+    assert automaton.scan('agra me') == {('Agra', 'agra')}
+    assert automaton.scan('agrawal colony') == set()
+
+
+def test_best_department_counts_distinct_keywords_and_breaks_ties_by_order():
+    engine = make_engine()
+    assert engine.best_department(engine.analyze('Transformer blew, power cut all night')) == 'Electricity'
+    assert engine.best_department(engine.analyze('garbage near the ration shop')) == 'Food and Civil Supplies'
+    assert engine.best_department(engine.analyze('nothing relevant')) is None
+
+
+def test_priority_scopes_and_default():
+    engine = make_engine()
+    assert engine.analyze('transformer sparking').priority('electricity') == 'high'
+    assert engine.analyze('transformer sparking').priority() == 'medium'
+    assert engine.analyze('a suggestion for the park').priority() == 'low'
+    assert engine.analyze('fire and urgent').priority() == 'critical'
+
+
+def test_sentiment():
+    engine = make_engine()
+    assert engine.analyze('Worst service, I am furious').sentiment() == 'negative'
+    assert engine.analyze('Thank you, very satisfied').sentiment() == 'positive'
+    assert engine.analyze('Thank you but worst service').sentiment() == 'neutral'
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from ann_index import ExactIndex
+from knn_classifier import KNNVotingClassifier, canonical_labels
+
+
+class Document:
+    def __init__(self, page_content: str, metadata: dict):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+def unit(*values) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+DOCUMENTS = [
+    Document('Potholes on the main road. This should be handled by Public Works',
+             {'type': 'complaint_example', 'category': 'Infrastructure'}),
+    Document('No doctor at the PHC', {'type': 'resolved_complaint', 'department': 'Healthcare', 'priority': 'high'}),
+    Document('Hospital has no medicines', {'type': 'resolved_complaint', 'department': 'Healthcare',
+                                            'priority': 'urgent-ish'}),
+    Document('CM Helpline 1076', {'type': 'helpline'})
+]
+
+VECTORS = np.vstack([unit(1, 0, 0), unit(0, 1, 0), unit(0, 1, 0.2), unit(0, 0, 1)])
+
+
+def make_classifier(k: int = 3) -> KNNVotingClassifier:
+    return KNNVotingClassifier(ExactIndex(VECTORS), DOCUMENTS, k=k)
+
+
+def test_canonical_labels():
+    assert canonical_labels(DOCUMENTS[0]) == ('Public Works', 'medium')
+    assert canonical_labels(DOCUMENTS[1]) == ('Healthcare', 'high')
+    assert canonical_labels(DOCUMENTS[2]) == ('Healthcare', None)  # unknown priority abstains
+    assert canonical_labels(DOCUMENTS[3]) == (None, None)
+    unknown = Document('x', {'type': 'complaint_example', 'category': 'Astrology'})
+    assert canonical_labels(unknown) == (None, None)
+
+
+def test_similarity_weighted_vote():
+    result = make_classifier().classify(unit(0.1, 1, 0.1)[None, :])
+    assert result['department'] == 'Healthcare'
+    assert result['category'] == 'Healthcare'
+    assert result['priority'] == 'high'
+    assert 0.5 < result['vote_share'] < 1.0
+    assert result['top_similarity'] == pytest.approx(float((VECTORS @ unit(0.1, 1, 0.1)).max()), rel=1e-5)
+
+
+def test_department_maps_back_to_the_pattern_category():
+    result = make_classifier(k=1).classify(unit(1, 0.05, 0)[None, :])
+    assert (result['department'], result['category'], result['vote_share']) == ('Public Works', 'Infrastructure', 1.0)
+
+
+def test_abstaining_neighbours_give_no_answer():
+    result = make_classifier(k=1).classify(unit(0, 0, 1)[None, :])
+    assert result['department'] is None and result['priority'] is None and result['vote_share'] == 0.0
+    assert result['neighbors'][0]['type'] == 'helpline'
+
+
+def test_negative_similarities_do_not_vote():
+    result = make_classifier(k=4).classify(unit(-1, 0, 0)[None, :])
+    assert result['department'] is None
+
+
+def test_batch_matches_single_queries():
+    classifier = make_classifier()
+    queries = np.vstack([unit(1, 0.1, 0), unit(0, 1, 0)])
+    batch = classifier.classify_batch(queries)
+    assert [row['department'] for row in batch] == [classifier.classify(q[None, :])['department'] for q in queries]
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+
+import app  # noqa: E402
+from linear_classifier import (VECTORIZER_PARAMS, LinearComplaintClassifier, make_vectorizer,  # noqa: E402
+                               training_examples)
+
+TEXTS = ['Street lights not working for weeks', 'पानी नहीं आ रहा', '', 'Doctor absent at PHC, dengue cases rising']
+
+
+@pytest.fixture(scope='module')
+def classifier() -> LinearComplaintClassifier:
+    return LinearComplaintClassifier.train(*training_examples())
+
+
+def test_transform_matches_the_hashing_vectorizer(classifier):
+    indptr, indices, data = classifier.transform(TEXTS)
+    expected = make_vectorizer(VECTORIZER_PARAMS).transform(TEXTS).toarray()
+    actual = np.zeros_like(expected)
+    for row in range(len(TEXTS)):
+        span = slice(indptr[row], indptr[row + 1])
+        actual[row, indices[span]] = data[span]
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-7)
+
+
+def test_predicts_obvious_departments(classifier):
+    assert classifier.predict('Potholes all over the main road, road is broken')['department'] == 'Public Works'
+    assert classifier.predict('No doctor in the government hospital')['department'] == 'Healthcare'
+    assert classifier.predict('No water supply, pipeline leaking')['department'] == 'Water Supply'
+
+
+def test_batch_and_empty_text(classifier):
+    results = classifier.predict_batch(TEXTS)
+    assert [result['department'] for result in results] == [classifier.predict(text)['department'] for text in TEXTS]
+    assert 0 < results[2]['confidence'] <= 1
+
+
+def test_save_and_load_round_trip(classifier, tmp_path):
+    path = tmp_path / 'complaint_linear.npz'
+    classifier.save(str(path))
+    loaded = LinearComplaintClassifier.load(str(path))
+    assert loaded.predict_batch(TEXTS) == classifier.predict_batch(TEXTS)
+
+
+def test_app_takes_the_priority_from_the_rules(classifier, monkeypatch):
+    monkeypatch.setattr(app, 'linear_classifier', classifier)
+    text = 'Transformer burst, fire in the market, urgent help needed'
+    analysis = app.classify_with_linear(text)
+    assert analysis['source'] == 'samadhan_ai_linear_classifier'
+    assert analysis['priority'] == app.get_fallback_analysis(text)['priority']
@@ -0,0 +1,64 @@
+import pytest
+
+import app
+from circuit_breaker import OPEN, CircuitBreaker, ProviderError
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Both providers configured, caches and hedging off, no network"""
+    monkeypatch.setattr(app.config, 'WATSONX_API_KEY', 'key')
+    monkeypatch.setattr(app.config, 'WATSONX_DEPLOYMENT_ID', 'deployment')
+    monkeypatch.setattr(app.config, 'OPENROUTER_API_KEY', 'key')
+    monkeypatch.setattr(app.config, 'HEDGING_ENABLED', False)
+    monkeypatch.setattr(app.config, 'LLM_CACHE_ENABLED', False)
+    monkeypatch.setattr(app.config, 'SEMANTIC_CACHE_ENABLED', False)
+    monkeypatch.setattr(app, 'get_ibm_cloud_token', lambda: 'token')
+    calls = []
+
+    def call_openrouter_api(prompt, model=None, max_tokens=500):
+        calls.append(prompt)
+        return '**Your complaint is registered.**'
+
+    monkeypatch.setattr(app, 'call_openrouter_api', call_openrouter_api)
+    return calls
+
+
+def open_breaker(monkeypatch, name: str) -> CircuitBreaker:
+    breaker = CircuitBreaker(name, max_timeout=1.0, min_calls=1, open_seconds=60)
+    with pytest.raises(ProviderError):
+        with breaker.guard():
+            raise ProviderError('upstream 503', 503)
+    assert breaker.state == OPEN
+    monkeypatch.setitem(app.provider_breakers, name, breaker)
+    return breaker
+
+
+def test_open_watsonx_breaker_fails_over_to_openrouter(providers, monkeypatch):
+    breaker = open_breaker(monkeypatch, 'watsonx')
+
+    def unreachable(*args, **kwargs):
+        raise AssertionError('WatsonX must not be contacted while its breaker is open')
+
+    monkeypatch.setattr(app.provider_sessions, 'get', unreachable)
+    response = app.generate_ai_response('Street lights not working', 'Infrastructure', 'medium')
+    assert response == 'Your complaint is registered.'
+    assert len(providers) == 1
+    assert breaker.rejected == 1
+
+
+def test_both_providers_down_gives_the_category_response(providers, monkeypatch):
+    open_breaker(monkeypatch, 'watsonx')
+
+    def openrouter_down(prompt, model=None, max_tokens=500):
+        raise ConnectionError('reset')
+
+    monkeypatch.setattr(app, 'call_openrouter_api', openrouter_down)
+    response = app.generate_ai_response('Street lights not working', 'Infrastructure', 'medium')
+    assert response == app.get_category_fallback_response('Infrastructure', 'medium')
+
+
+def test_stream_fails_over_as_a_single_token(providers, monkeypatch):
+    open_breaker(monkeypatch, 'watsonx')
+    events = list(app.stream_ai_response('Street lights not working', 'Infrastructure', 'medium'))
+    assert events == [('token', 'Your complaint is registered.'), ('done', 'Your complaint is registered.')]
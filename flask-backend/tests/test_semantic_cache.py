@@ -0,0 +1,62 @@
+import numpy as np
+
+from semantic_cache import SemanticResponseCache, fill_template, make_template
+
+FIELDS = {'contact': '1800-180-5555', 'head': 'Executive Engineer', 'district': 'Lucknow'}
+NEXT_FIELDS = {'contact': '1800-200-1111', 'head': 'Executive Engineer', 'district': 'Kanpur Nagar'}
+
+COMPLAINT = 'No water supply in Gomti Nagar for 3 days'
+RESPONSE = ('We are sorry there has been no water in Gomti Nagar for 3 days. The Executive Engineer, Lucknow '
+            '(1800-180-5555) will restore supply within 24 hours.')
+
+
+def unit(*values) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_template_replaces_fields_and_requires_shared_terms():
+    template, required = make_template(RESPONSE, COMPLAINT, FIELDS)
+    assert '{contact}' in template and '{head}' in template and '{district}' in template
+    assert '1800-180-5555' not in template
+    assert required == {'water', 'supply', 'gomti', 'nagar', '3', 'days'}
+
+
+def test_fill_template_needs_every_used_field():
+    assert fill_template('Call {contact}', NEXT_FIELDS) == 'Call 1800-200-1111'
+    assert fill_template('Call {contact}', {'contact': None}) is None
+
+
+def test_similar_complaint_gets_the_response_refilled():
+    cache = SemanticResponseCache(max_entries=4, threshold=0.9)
+    cache.put(('Water Supply', 'high', 'en'), unit(1, 0, 0), RESPONSE, COMPLAINT, FIELDS)
+    hit = cache.get(('Water Supply', 'high', 'en'), unit(1, 0.1, 0),
+                    'Gomti Nagar me 3 days se water supply nahi', NEXT_FIELDS)
+    assert hit is not None
+    response, similarity = hit
+    assert '1800-200-1111' in response and 'Kanpur Nagar' in response and similarity > 0.9
+
+
+def test_other_locality_or_partition_or_dissimilar_complaint_misses():
+    cache = SemanticResponseCache(max_entries=4, threshold=0.9)
+    cache.put(('Water Supply', 'high', 'en'), unit(1, 0, 0), RESPONSE, COMPLAINT, FIELDS)
+    assert cache.get(('Water Supply', 'high', 'en'), unit(1, 0, 0), 'No water supply in Aliganj for 3 days',
+                     NEXT_FIELDS) is None
+    assert cache.rejected == 1
+    assert cache.get(('Water Supply', 'critical', 'en'), unit(1, 0, 0), COMPLAINT, NEXT_FIELDS) is None
+    assert cache.get(('Water Supply', 'high', 'en'), unit(0, 1, 0), COMPLAINT, NEXT_FIELDS) is None
+
+
+def test_lru_eviction_and_ttl():
+    cache = SemanticResponseCache(max_entries=2)
+    for axis in range(3):
+        vector = np.eye(3, dtype=np.float32)[axis]
+        cache.put('p', vector, f'response {axis}', f'complaint {axis}', {})
+    assert cache.evictions == 1
+    assert cache.get('p', np.eye(3, dtype=np.float32)[0], 'complaint 0', {}) is None
+    assert cache.get('p', np.eye(3, dtype=np.float32)[2], 'complaint 2', {})[0] == 'response 2'
+
+    expired = SemanticResponseCache(max_entries=2, ttl_seconds=-1)
+    expired.put('p', unit(1, 0), 'response', 'complaint', {})
+    assert expired.get('p', unit(1, 0), 'complaint', {}) is None
+    assert expired.expirations == 1
@@ -0,0 +1,82 @@
+import json
+import threading
+
+import pytest
+
+import app
+from speculation import SpeculationStats
+
+
+def test_speculation_matches_on_department_and_priority():
+    guess = {'category': 'Infrastructure', 'priority': 'high'}
+    assert app.speculation_matches(guess, {'category': 'Infrastructure', 'priority': 'high'})
+    assert not app.speculation_matches(guess, {'category': 'Infrastructure', 'priority': 'critical'})
+    assert not app.speculation_matches(guess, {'category': 'Healthcare', 'priority': 'high'})
+
+
+def test_stats_count_saved_latency_only_for_kept_responses():
+    stats = SpeculationStats()
+    stats.record(True, analysis_ms=300, response_ms=500, total_ms=550)
+    stats.record(False, analysis_ms=300, response_ms=500, total_ms=800)
+    stats.record_skipped()
+    assert stats.stats() == {'speculated': 2, 'matched': 1, 'regenerated': 1, 'skipped': 1, 'match_rate': 0.5,
+                             'saved_ms_total': 250.0, 'saved_ms_avg': 125.0}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Local guess Infrastructure/medium; the LLM analysis (fake.llm_category) waits for the guess's response"""
+    fake = type('Pipeline', (), {})()
+    fake.llm_category = 'Infrastructure'
+    fake.responses = []  # (category, cancel event) per generate_ai_response call
+    speculating = threading.Event()
+    monkeypatch.setattr(app.config, 'SPECULATIVE_RESPONSE_ENABLED', True)
+    monkeypatch.setattr(app.config, 'ONE_SHOT_ENABLED', False)
+    monkeypatch.setattr(app.config, 'OPENROUTER_API_KEY', 'key')
+    monkeypatch.setattr(app.config, 'LLM_CACHE_ENABLED', False)
+    monkeypatch.setattr(app, 'speculation_stats', SpeculationStats())
+    monkeypatch.setattr(app, 'local_tier_analysis',
+                        lambda text: ({'category': 'Infrastructure', 'priority': 'medium'}, False))
+
+    def call_openrouter_api(prompt, model=None, max_tokens=500):
+        assert speculating.wait(1.0)
+        return json.dumps({'category': fake.llm_category, 'priority': 'medium'})
+
+    def generate_ai_response(complaint_text, category, priority, language='en', cancel=None):
+        fake.responses.append((category, cancel))
+        if cancel is None:
+            return f'{category} response'
+        speculating.set()
+        return '' if cancel.wait(0.5) else f'{category} response'
+
+    monkeypatch.setattr(app, 'call_openrouter_api', call_openrouter_api)
+    monkeypatch.setattr(app, 'generate_ai_response', generate_ai_response)
+    return fake
+
+
+def test_matching_guess_keeps_the_speculative_response(pipeline):
+    analysis, response = app.analyze_and_respond('Potholes on the main road')
+    assert (analysis['category'], response) == ('Infrastructure', 'Infrastructure response')
+    assert len(pipeline.responses) == 1
+    assert app.speculation_stats.stats()['matched'] == 1
+
+
+def test_wrong_guess_cancels_the_speculative_response(pipeline):
+    pipeline.llm_category = 'Healthcare'
+    analysis, response = app.analyze_and_respond('No doctor at the PHC')
+    assert (analysis['category'], response) == ('Healthcare', 'Healthcare response')
+    (guessed, cancel), (regenerated, _) = pipeline.responses
+    assert (guessed, regenerated) == ('Infrastructure', 'Healthcare')
+    assert cancel.is_set()
+    assert app.speculation_stats.stats()['regenerated'] == 1
+
+
+def test_speculation_slots_are_released(pipeline):
+    for category in ('Infrastructure', 'Healthcare'):
+        pipeline.llm_category = category
+        app.analyze_and_respond('Potholes on the main road')
+    # Each slot comes back from the speculative future's done callback
+    slots = [app.speculation_slots.acquire(timeout=1.0) for _ in range(app.config.SPECULATIVE_RESPONSE_WORKERS)]
+    for _ in filter(None, slots):
+        app.speculation_slots.release()
+    assert all(slots)
@@ -0,0 +1,59 @@
+import json
+
+from sse_parser import SSEDeltaParser, delta_content, iter_sse_deltas
+
+
+def event(content: str) -> bytes:
+    return f'data: {json.dumps({"choices": [{"delta": {"content": content}}]}, ensure_ascii=False)}\n\n'.encode('utf-8')
+
+
+def test_deltas_in_order():
+    stream = event('Hello') + event(' world') + b'data: [DONE]\n\n'
+    assert list(iter_sse_deltas([stream])) == ['Hello', ' world']
+
+
+def test_event_split_across_chunks():
+    stream = event('Namaste') + event('!')
+    chunks = [stream[i:i + 3] for i in range(0, len(stream), 3)]
+    assert list(iter_sse_deltas(chunks)) == ['Namaste', '!']
+
+
+def test_multibyte_character_cut_by_chunk_boundary():
+    stream = event('पानी नहीं')
+    cut = stream.index('न'.encode('utf-8')) + 1
+    assert list(iter_sse_deltas([stream[:cut], stream[cut:]])) == ['पानी नहीं']
+
+
+def test_crlf_line_ends():
+    stream = event('a').replace(b'\n', b'\r\n') + event('b').replace(b'\n', b'\r\n')
+    assert list(iter_sse_deltas([stream])) == ['a', 'b']
+
+
+def test_done_ends_the_stream():
+    parser = SSEDeltaParser()
+    assert parser.feed(event('kept') + b'data: [DONE]\n\n' + event('ignored')) == ['kept']
+    assert parser.done
+    assert parser.feed(event('ignored')) == []
+
+
+def test_missing_blank_line_between_events():
+    stream = event('one')[:-1] + event('two')[:-1] + b'data: [DONE]\n\n'
+    assert list(iter_sse_deltas([stream])) == ['one', 'two']
+
+
+def test_comments_and_other_fields_are_skipped():
+    stream = b': keep-alive\n\nevent: message\nid: 7\n' + event('text')
+    assert list(iter_sse_deltas([stream])) == ['text']
+
+
+def test_unterminated_last_event_is_flushed_on_close():
+    parser = SSEDeltaParser()
+    assert parser.feed(event('tail')[:-2]) == []
+    assert parser.close() == ['tail']
+
+
+def test_delta_content_ignores_malformed_payloads():
+    assert delta_content('not json') is None
+    assert delta_content('{"choices": []}') is None
+    assert delta_content('[1, 2]') is None
+    assert delta_content('{"choices": [{"delta": {}}]}') is None
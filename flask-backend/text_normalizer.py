@@ -0,0 +1,267 @@
+"""
+Hindi / Hinglish Normalization for Samadhan AI
+=============================================
+
+Every keyword of the dataset is English, so complaints written in
+Devanagari ("सड़क टूटी है") or in romanized Hindi ("paani nahi aa raha")
+found no department or priority keyword and fell through to 'Other'.
+
+This stage runs in front of the local classifier tiers:
+
+1. Script detection (Latin, Devanagari or mixed).
+2. Devanagari-to-Latin transliteration, with the usual Hindi schwa
+   deletion so "बिजली" reads "bijli" and "कचरा" reads "kachra".
+3. A spelling skeleton that folds the common romanization variants
+   together (paani/pani, nahee/nahi, gaddha/gadha, kooda/kuda).
+4. A Hindi synonym table, compiled into one whole-word KeywordAutomaton,
+   that glosses Hindi words and phrases with the dataset's English
+   keywords ("pani nahi aa raha" -> "no water supply").
+
+The glosses are appended to the (transliterated) complaint, so the keyword
+engine, the linear classifier and the encoder need no Hindi vocabulary of
+their own. English-only complaints come back unchanged.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from keyword_engine import KeywordAutomaton
+
+# English dataset keyword -> Hindi / Hinglish words and phrases (either script)
+HINDI_SYNONYMS: Dict[str, List[str]] = {
+    # Public Works
+    'road': ['sadak', 'sarak', 'rasta', 'marg', 'सड़क', 'रास्ता', 'मार्ग'],
+    'road damage': ['sadak tuti', 'sadak tuta', 'sadak kharab', 'sadak tooti hai', 'सड़क टूटी', 'सड़क खराब'],
+    'bridge': ['pul tuta', 'pul tuti', 'पुल टूटा'],
+    'pothole': ['gaddha', 'gadda', 'gaddhe', 'गड्ढा', 'गड्ढे'],
+    'drainage': ['nali', 'naali', 'naala', 'nala', 'नाली', 'नाला'],
+    'drainage blocked': ['nali band', 'nali jam', 'nala jam', 'nali chok', 'नाली बंद', 'नाली जाम'],
+    'street light': ['batti', 'khambe ki batti', 'street batti', 'बत्ती'],
+    'street lights not working': ['batti nahi jal rahi', 'batti nahi jalti', 'batti band', 'बत्ती नहीं जल रही', 'बत्ती बंद'],
+    'footpath': ['patri', 'पटरी'],
+    'repair': ['marammat', 'mistri', 'मरम्मत'],
+    'construction': ['nirman', 'निर्माण'],
+    'electricity': ['bijli', 'बिजली'],
+    'live wire': ['nanga taar', 'khula taar', 'नंगा तार', 'खुला तार'],
+    # Water Supply
+    'water': ['paani', 'pani', 'पानी'],
+    'no water supply': ['pani nahi aa raha', 'pani nahi aa rahi', 'pani nahi aata', 'pani nahi', 'पानी नहीं आ रहा', 'पानी नहीं'],
+    'no water for days': ['kai din se pani nahi', 'कई दिन से पानी नहीं'],
+    'dirty water': ['ganda pani', 'गंदा पानी'],
+    'contaminated water': ['dushit pani', 'दूषित पानी'],
+    'water shortage': ['pani ki kami', 'पानी की कमी'],
+    'pipe': ['paip', 'nal', 'पाइप', 'नल'],
+    'leak': ['risav', 'tapak', 'rishav', 'रिसाव', 'टपक'],
+    'sewage': ['sivar', 'gutter', 'सीवर', 'गटर'],
+    'sewage overflow': ['sivar ubal', 'gutter ubal', 'gutter bhar', 'सीवर उबल', 'गटर उबल'],
+    'tanker': ['tanki', 'टैंकर', 'टंकी'],
+    # Traffic Police
+    'traffic': ['yatayat', 'यातायात'],
+    'traffic congestion': ['bahut jaam', 'lamba jaam', 'बहुत जाम', 'लंबा जाम'],
+    'accident': ['durghatna', 'hadsa', 'takkar', 'दुर्घटना', 'हादसा', 'टक्कर'],
+    'vehicle': ['gaadi', 'gadi', 'vahan', 'गाड़ी', 'वाहन'],
+    'signal not working': ['signal kharab', 'signal band', 'सिग्नल खराब', 'सिग्नल बंद'],
+    # Environment
+    'garbage': ['kachra', 'kuda', 'kooda', 'kuda karkat', 'gandagi', 'कचरा', 'कूड़ा', 'गंदगी'],
+    'garbage not collected': ['kachra nahi uthaya', 'kachra nahi utha', 'kuda nahi uthaya', 'कचरा नहीं उठाया', 'कूड़ा नहीं उठाया'],
+    'pollution': ['pradushan', 'प्रदूषण'],
+    'air pollution': ['vayu pradushan', 'hava kharab', 'वायु प्रदूषण'],
+    'noise': ['shor', 'shorgul', 'शोर'],
+    'smoke': ['dhuan', 'dhuaan', 'धुआं', 'धुआँ'],
+    'tree': ['ped', 'vriksh', 'पेड़', 'वृक्ष'],
+    'tree cutting': ['ped kat', 'ped katai', 'पेड़ कट', 'पेड़ कटाई'],
+    'illegal dumping': ['kachra phenk', 'कचरा फेंक'],
+    # Healthcare
+    'hospital': ['aspatal', 'haspatal', 'chikitsalay', 'अस्पताल', 'चिकित्सालय'],
+    'doctor': ['daktar', 'vaidya', 'डॉक्टर', 'डाक्टर'],
+    'doctor not available': ['doctor nahi', 'daktar nahi', 'doctor nahi hai', 'डॉक्टर नहीं'],
+    'medicine': ['dawa', 'dava', 'dawai', 'davai', 'दवा', 'दवाई'],
+    'medicine not available': ['dawa nahi mil', 'davai nahi mil', 'dawai nahi', 'दवा नहीं मिल', 'दवाई नहीं'],
+    'patient': ['marij', 'mariz', 'mareez', 'rogi', 'मरीज', 'मरीज़', 'रोगी'],
+    'disease': ['bimari', 'rog', 'बीमारी', 'रोग'],
+    'vaccination': ['tika', 'teeka', 'tikakaran', 'टीका', 'टीकाकरण'],
+    'ambulance not coming': ['ambulance nahi aayi', 'ambulance nahi aa rahi', 'एम्बुलेंस नहीं आई'],
+    'epidemic': ['mahamari', 'महामारी'],
+    # Education
+    'school': ['vidyalaya', 'pathshala', 'विद्यालय', 'पाठशाला', 'स्कूल'],
+    'teacher': ['shikshak', 'adhyapak', 'masterji', 'guruji', 'शिक्षक', 'अध्यापक'],
+    'teacher absent': ['shikshak nahi aate', 'master nahi aate', 'शिक्षक नहीं आते'],
+    'student': ['chhatra', 'vidyarthi', 'छात्र', 'विद्यार्थी'],
+    'exam': ['pariksha', 'परीक्षा'],
+    'book': ['kitab', 'pustak', 'किताब', 'पुस्तक'],
+    'meal': ['bhojan', 'khana', 'भोजन', 'खाना'],
+    'scholarship': ['chhatravritti', 'वजीफा', 'छात्रवृत्ति', 'vajifa'],
+    # Revenue
+    'land': ['zameen', 'jameen', 'bhumi', 'ज़मीन', 'जमीन', 'भूमि'],
+    'record': ['khasra', 'khatauni', 'खसरा', 'खतौनी'],
+    'mutation': ['dakhil kharij', 'दाखिल खारिज'],
+    'property': ['sampatti', 'संपत्ति'],
+    # Agriculture
+    'crop': ['fasal', 'फसल'],
+    'fertilizer': ['khad', 'urvarak', 'खाद', 'उर्वरक'],
+    'seed': ['beej', 'बीज'],
+    'irrigation': ['sinchai', 'सिंचाई'],
+    'farmer': ['kisan', 'किसान'],
+    # Food & Civil Supplies
+    'ration': ['rashan', 'राशन'],
+    'grain': ['anaj', 'anaaj', 'gehun', 'chawal', 'अनाज', 'गेहूं', 'चावल'],
+    'ration shop': ['kotedar', 'rashan dukan', 'कोटेदार', 'राशन दुकान'],
+    # Social Welfare
+    'pension': ['पेंशन'],
+    'old age': ['vridha', 'vriddha', 'budhapa', 'वृद्धा', 'बुढ़ापा'],
+    'disability': ['viklang', 'divyang', 'विकलांग', 'दिव्यांग'],
+    'widow': ['vidhva', 'vidhwa', 'विधवा'],
+    'women': ['mahila', 'aurat', 'महिला', 'औरत'],
+    'child': ['bachcha', 'bachche', 'baccha', 'बच्चा', 'बच्चे'],
+    'scheme': ['yojana', 'योजना'],
+    # Priority
+    'urgent': ['turant', 'jaldi', 'tatkal', 'foran', 'तुरंत', 'जल्दी', 'तत्काल'],
+    'danger': ['khatra', 'khatarnak', 'खतरा', 'खतरनाक'],
+    'fire': ['aag', 'आग'],
+    'death': ['maut', 'mrityu', 'mar gaya', 'मौत', 'मृत्यु'],
+    'flood': ['baadh', 'badh', 'बाढ़'],
+    'collapse': ['gir gaya', 'gir gayi', 'dhah', 'गिर गया', 'ढह'],
+    'serious': ['gambhir', 'गंभीर'],
+    'broken': ['tuta', 'tuti', 'toota', 'tooti', 'toote', 'टूटा', 'टूटी', 'टूटे'],
+    'not working': ['nahi aa raha', 'nahi aa rahi', 'kaam nahi kar', 'band pada', 'kharab', 'नहीं आ रहा', 'काम नहीं कर', 'खराब'],
+    'problem': ['samasya', 'dikkat', 'pareshani', 'समस्या', 'दिक्कत', 'परेशानी'],
+    'complaint': ['shikayat', 'शिकायत'],
+    # Sentiment
+    'frustrated': ['pareshan', 'परेशान'],
+    'angry': ['gussa', 'naraz', 'गुस्सा', 'नाराज़'],
+    'terrible': ['bahut bura', 'bekar', 'बहुत बुरा', 'बेकार'],
+    'thank': ['dhanyavad', 'dhanyawad', 'shukriya', 'धन्यवाद', 'शुक्रिया'],
+    'good': ['accha', 'achha', 'badhiya', 'अच्छा', 'बढ़िया']
+}
+
+VIRAMA = '्'
+NUKTA = '़'
+SCHWA = None  # vowel slot of a consonant still carrying its inherent 'a'
+
+DEVANAGARI_CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'n',
+    'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh', 'ञ': 'n',
+    'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n',
+    'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm',
+    'य': 'y', 'र': 'r', 'ल': 'l', 'व': 'v', 'श': 'sh', 'ष': 'sh', 'स': 's', 'ह': 'h',
+    # Precomposed nukta letters U+0958-U+095F: qa, khha, ghha, za, dddha, rha, fa, yya
+    **dict(zip(map(chr, range(0x0958, 0x0960)), ['q', 'kh', 'g', 'z', 'd', 'dh', 'f', 'y']))
+}
+# Consonant + combining nukta, for text that is not NFC-composed
+NUKTA_FORMS = {'k': 'q', 'j': 'z', 'ph': 'f'}
+DEVANAGARI_VOWELS = {
+    'अ': 'a', 'आ': 'a', 'इ': 'i', 'ई': 'i', 'उ': 'u', 'ऊ': 'u', 'ऋ': 'ri',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au', 'ऑ': 'o'
+}
+DEVANAGARI_MATRAS = {
+    'ा': 'a', 'ि': 'i', 'ी': 'i', 'ु': 'u', 'ू': 'u', 'ृ': 'ri',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au', 'ॉ': 'o'
+}
+DEVANAGARI_SIGNS = {'ं': 'n', 'ँ': 'n', 'ः': 'h'}
+DEVANAGARI_OTHER = {'।': '.', '॥': '.', **{chr(0x0966 + d): str(d) for d in range(10)}}
+
+DEVANAGARI_RE = re.compile('[ऀ-ॿ]+')
+LATIN_RE = re.compile('[A-Za-z]')
+SKELETON_RE = re.compile(r'ee|oo|ph|\bnahin\b|([a-z])\1+')
+SKELETON_CHARS = str.maketrans({'w': 'v', 'z': 'j', 'q': 'k'})
+SKELETON_RUNS = {'ee': 'i', 'oo': 'u', 'ph': 'f', 'nahin': 'nahi'}
+
+
+def detect_script(text: str) -> str:
+    """'latin', 'devanagari' or 'mixed' by the letters present"""
+    if text.isascii():
+        return 'latin'
+    has_devanagari = DEVANAGARI_RE.search(text) is not None
+    has_latin = LATIN_RE.search(text) is not None
+    if has_devanagari and has_latin:
+        return 'mixed'
+    return 'devanagari' if has_devanagari else 'latin'
+
+
+def _transliterate_word(word: str) -> str:
+    # [consonant, vowel, trailing sign]; vowel is SCHWA for an inherent 'a', '' after a virama
+    units: List[list] = []
+    for char in word:
+        if char in DEVANAGARI_CONSONANTS:
+            units.append([DEVANAGARI_CONSONANTS[char], SCHWA, ''])
+        elif char == NUKTA and units:
+            units[-1][0] = NUKTA_FORMS.get(units[-1][0], units[-1][0])
+        elif char in DEVANAGARI_MATRAS and units and units[-1][1] is SCHWA:
+            units[-1][1] = DEVANAGARI_MATRAS[char]
+        elif char == VIRAMA and units:
+            units[-1][1] = ''
+        elif char in DEVANAGARI_VOWELS:
+            units.append(['', DEVANAGARI_VOWELS[char], ''])
+        elif char in DEVANAGARI_SIGNS and units:
+            units[-1][2] += DEVANAGARI_SIGNS[char]
+        else:
+            units.append([DEVANAGARI_OTHER.get(char, ''), '', ''])
+
+    # Schwa deletion: drop the word-final inherent vowel, then (right to left) any
+    # inherent vowel between a vowel and a consonant that keeps its own vowel
+    if len(units) > 1 and units[-1][1] is SCHWA and units[-1][0] and not units[-1][2]:
+        units[-1][1] = ''
+    for i in range(len(units) - 2, 0, -1):
+        consonant, vowel, sign = units[i]
+        if (vowel is SCHWA and consonant and not sign and units[i - 1][1] != ''
+                and units[i + 1][0] and units[i + 1][1] != ''):
+            units[i][1] = ''
+    return ''.join(consonant + ('a' if vowel is SCHWA else vowel) + sign for consonant, vowel, sign in units)
+
+
+def transliterate(text: str) -> str:
+    """Devanagari runs to plain Latin letters; everything else is left as is"""
+    if text.isascii():
+        return text
+    return DEVANAGARI_RE.sub(lambda m: _transliterate_word(m.group()), text)
+
+
+def skeleton(text: str) -> str:
+    """Fold romanization variants: lowercase, ee->i, oo->u, ph->f, w->v, z->j, q->k, nahin->nahi, no doubled letters"""
+    text = text.lower().translate(SKELETON_CHARS)
+    return SKELETON_RE.sub(lambda m: m.group(1) or SKELETON_RUNS[m.group()], text)
+
+
+class NormalizedText:
+    """A complaint after normalization: text for the local tiers, detected script and English glosses"""
+
+    def __init__(self, original: str, text: str, script: str, glosses: List[str]):
+        self.original = original
+        self.text = text
+        self.script = script
+        self.glosses = glosses
+
+    @property
+    def is_hindi(self) -> bool:
+        return self.script != 'latin' or bool(self.glosses)
+
+
+class TextNormalizer:
+    """Transliteration plus the Hindi synonym automaton, compiled once"""
+
+    def __init__(self, synonyms: Optional[Dict[str, List[str]]] = None):
+        keywords = []
+        for english, variants in (synonyms or HINDI_SYNONYMS).items():
+            keywords += [(skeleton(transliterate(variant)), english) for variant in variants]
+        self.automaton = KeywordAutomaton.build(keywords, whole_words=True)
+
+    def normalize(self, text: str) -> NormalizedText:
+        script = detect_script(text)
+        latin = text if script == 'latin' else transliterate(text)
+        found = {english for english, _ in self.automaton.scan(skeleton(latin))}
+        glosses = sorted(found)
+        if glosses:
+            latin = f"{latin} ({', '.join(glosses)})"
+        return NormalizedText(text, latin, script, glosses)
+
+
+_default_normalizer = None
+
+
+def get_text_normalizer() -> TextNormalizer:
+    """Process-wide normalizer built on first use"""
+    global _default_normalizer
+    if _default_normalizer is None:
+        _default_normalizer = TextNormalizer()
+    return _default_normalizer
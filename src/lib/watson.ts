@@ -53,6 +53,72 @@ class WatsonXAssistant {
     }
   }
 
+  // Same turn as sendMessage, but the response arrives as server-sent events:
+  // onToken gets each cleaned piece as it is generated, the promise resolves
+  // with the full response from the final `done` event.
+  async streamMessage(
+    message: string,
+    language: string = 'en',
+    onToken: (text: string) => void = () => {}
+  ): Promise<string> {
+    try {
+      const response = await fetch(`${this.backendUrl}/api/ai/chat/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          message,
+          language
+        }),
+      });
+
+      if (!response.ok || !response.body) {
+        console.error('❌ Backend AI stream error:', response.status);
+        return this.sendMessage(message, language);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let finalResponse = '';
+
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary: number;
+        while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+          const block = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const event = block.match(/^event: (.*)$/m)?.[1];
+          const data = block.match(/^data: (.*)$/m)?.[1];
+          if (!event || !data) continue;
+
+          const payload = JSON.parse(data);
+          if (event === 'token') {
+            onToken(payload.text);
+          } else if (event === 'done' || event === 'error') {
+            finalResponse = payload.response || '';
+          }
+        }
+      }
+
+      if (!finalResponse) {
+        console.warn('⚠️ No response from backend AI stream');
+        return this.getFallbackResponse(message, language);
+      }
+
+      console.log('✅ Backend AI stream completed');
+      return finalResponse;
+
+    } catch (error) {
+      console.error('❌ Backend AI stream communication error:', error);
+      return this.getFallbackResponse(message, language);
+    }
+  }
+
   async generateComplaintResponse(
     complaintText: string,
     category: string,